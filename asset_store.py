@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+AI工具导入系统 - 本地图片资源库
+每个图片（logo、截图）只下载一次，按内容哈希去重存储，并用Pillow生成压缩后的WebP/PNG缩略图（SVG原样保存），
+生成的本地路径记录到工具数据的local_assets字段中，导入时由WordPressImporter上传到媒体库
+"""
+
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import requests
+from config import config
+from logger import logger
+from json_cache import load_json_file, save_json_file
+
+# 图片字段 -> 缩略图规格 {变体名: (最大宽度, 最大高度, 格式)}
+ASSET_VARIANTS = {
+    'logo_img_url': {
+        'logo_128': (128, 128, 'WEBP'),
+        'logo_64': (64, 64, 'PNG')
+    },
+    'overview_img_url': {
+        'overview_1200': (1200, 800, 'WEBP'),
+        'overview_400': (400, 300, 'WEBP')
+    }
+}
+
+# 图片字段 -> 上传到媒体库的变体（SVG等无法生成缩略图的图片上传原文件）
+UPLOAD_VARIANTS = {
+    'logo_img_url': 'logo_128',
+    'overview_img_url': 'overview_1200'
+}
+
+# 单个图片的最大下载字节数
+MAX_DOWNLOAD_BYTES = 10 * 1024 * 1024
+
+class AssetStore:
+    """内容寻址的本地图片资源库"""
+
+    def __init__(self):
+        self.enabled = config.ENABLE_ASSET_STORE
+        self.store_dir = config.ASSET_STORE_DIR
+        self.index_path = os.path.join(self.store_dir, 'index.json')
+        self.index_lock = threading.Lock()
+        self.url_index = {}
+        self.key_locks = {}
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+        self.timeout = config.REQUEST_TIMEOUT
+
+        if self.enabled:
+            try:
+                from PIL import Image
+                self.Image = Image
+                # 图片URL -> 内容哈希（无法识别为图片的URL记录为空字符串，不再重复下载）
+                self.url_index = load_json_file(self.index_path, {}) or {}
+            except ImportError:
+                logger.error("Pillow未安装，本地图片资源库已禁用。请运行: pip install Pillow")
+                self.enabled = False
+
+    def is_enabled(self) -> bool:
+        """检查资源库是否启用"""
+        return self.enabled
+
+    def _hash_dir(self, content_hash: str) -> str:
+        """内容哈希对应的存储目录（按前两位分片）"""
+        return os.path.join(self.store_dir, content_hash[:2], content_hash)
+
+    def _variant_path(self, content_hash: str, name: str, image_format: str) -> str:
+        """缩略图文件路径"""
+        return os.path.join(self._hash_dir(content_hash), f"{name}.{image_format.lower()}")
+
+    def _original_svg_path(self, content_hash: str) -> str:
+        """原样保存的SVG文件路径"""
+        return os.path.join(self._hash_dir(content_hash), 'original.svg')
+
+    def _is_svg(self, content: bytes) -> bool:
+        """检查内容是否为SVG（矢量图无需也无法用Pillow生成缩略图）"""
+        head = content[:2048].lstrip().lower()
+        return head.startswith((b'<svg', b'<?xml', b'<!doctype svg')) and b'<svg' in head
+
+    def _store_svg(self, content: bytes, content_hash: str) -> Dict[str, str]:
+        """按内容哈希原样保存SVG"""
+        path = self._original_svg_path(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        return {'original': path}
+
+    def _get_lock(self, key: str) -> threading.Lock:
+        """同一URL只下载一次、同一内容的缩略图只由一个线程生成"""
+        with self.index_lock:
+            return self.key_locks.setdefault(key, threading.Lock())
+
+    def _download(self, url: str) -> Optional[bytes]:
+        """下载图片内容（限制大小）"""
+        response = None
+        try:
+            response = self.session.get(url, timeout=self.timeout, stream=True)
+            if response.status_code != 200:
+                logger.debug(f"下载图片失败 {url}: HTTP {response.status_code}")
+                return None
+
+            content = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                content.extend(chunk)
+                if len(content) > MAX_DOWNLOAD_BYTES:
+                    logger.warning(f"图片超过大小限制，跳过: {url}")
+                    return None
+            return bytes(content)
+        except Exception as e:
+            logger.debug(f"下载图片异常 {url}: {e}")
+            return None
+        finally:
+            if response is not None:
+                response.close()
+
+    def _build_variants(self, content: bytes, content_hash: str, variants: Dict) -> Dict[str, str]:
+        """生成缩略图（已存在的变体直接复用）"""
+        paths = {}
+        image = None
+
+        for name, (width, height, image_format) in variants.items():
+            path = self._variant_path(content_hash, name, image_format)
+            if not os.path.exists(path):
+                if image is None:
+                    image = self.Image.open(io.BytesIO(content))
+                    image.load()
+                    image = image.convert('RGBA')
+
+                thumbnail = image.copy()
+                thumbnail.thumbnail((width, height), self.Image.LANCZOS)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+
+                tmp_path = f"{path}.tmp"
+                if image_format == 'WEBP':
+                    thumbnail.save(tmp_path, format='WEBP', quality=80, method=6)
+                else:
+                    thumbnail.save(tmp_path, format='PNG', optimize=True)
+                os.replace(tmp_path, path)
+            paths[name] = path
+
+        return paths
+
+    def store_image(self, url: str, variants: Dict) -> Dict[str, str]:
+        """下载（如需要）并生成图片缩略图，返回 {变体名: 本地路径}"""
+        with self._get_lock(f"url:{url}"):
+            with self.index_lock:
+                content_hash = self.url_index.get(url)
+
+            # 之前下载的内容无法识别为图片
+            if content_hash == '':
+                return {}
+
+            # 已下载过的URL且所有变体（或SVG原文件）都存在时无需任何网络请求
+            if content_hash and os.path.exists(self._original_svg_path(content_hash)):
+                return {'original': self._original_svg_path(content_hash)}
+            if content_hash and all(
+                os.path.exists(self._variant_path(content_hash, name, spec[2])) for name, spec in variants.items()
+            ):
+                return {name: self._variant_path(content_hash, name, spec[2]) for name, spec in variants.items()}
+
+            content = self._download(url)
+            if not content:
+                return {}
+
+            content_hash = hashlib.sha256(content).hexdigest()
+            try:
+                with self._get_lock(f"hash:{content_hash}"):
+                    if self._is_svg(content):
+                        paths = self._store_svg(content, content_hash)
+                    else:
+                        paths = self._build_variants(content, content_hash, variants)
+            except Exception as e:
+                logger.warning(f"生成缩略图失败 {url}: {e}")
+                with self.index_lock:
+                    self.url_index[url] = ''
+                return {}
+
+            with self.index_lock:
+                self.url_index[url] = content_hash
+            return paths
+
+    def get_upload_path(self, tool_data: Dict, field: str) -> Optional[str]:
+        """获取图片字段应上传的本地文件（图片URL已变化或文件不存在时返回None）"""
+        assets = (tool_data.get('local_assets') or {}).get(field)
+        if not assets or assets.get('source_url') != tool_data.get(field):
+            return None
+
+        path = assets.get(UPLOAD_VARIANTS.get(field)) or assets.get('original')
+        return path if path and os.path.exists(path) else None
+
+    def process_tool(self, tool_data: Dict) -> Dict:
+        """为单个工具的logo和截图生成本地缩略图"""
+        local_assets = dict(tool_data.get('local_assets') or {})
+
+        for field, variants in ASSET_VARIANTS.items():
+            url = tool_data.get(field)
+            if not url:
+                continue
+
+            paths = self.store_image(url, variants)
+            if paths:
+                local_assets[field] = {'source_url': url, **paths}
+
+        if local_assets:
+            tool_data['local_assets'] = local_assets
+        return tool_data
+
+    def process_tools(self, tools: List[Dict], max_workers: int = 4) -> List[Dict]:
+        """批量处理工具图片并保存URL索引"""
+        if not self.is_enabled():
+            return tools
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(self.process_tool, tools))
+
+        with self.index_lock:
+            save_json_file(self.index_path, self.url_index)
+
+        stored_count = sum(1 for tool in tools if tool.get('local_assets'))
+        logger.success(f"本地图片资源处理完成: {stored_count}/{len(tools)} 个工具")
+        return tools
+
+# 全局实例
+asset_store = AssetStore()
@@ -0,0 +1,96 @@
+"""
+AI工具导入系统 - 分类级候选工具池缓存
+每个分类只生成一次相关工具候选池，各工具的alternative_tools、featured_matches和other_tools从池中派生
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+from config import config
+from logger import logger
+from json_cache import JsonFileCache
+
+class CategoryPoolCache:
+    """分类级候选工具池缓存"""
+
+    def __init__(self):
+        self.cache = JsonFileCache('category_pools.json', ttl=config.CATEGORY_POOL_TTL_HOURS * 3600)
+        self.lock = threading.Lock()
+        self.category_locks = {}
+
+    def _get_category_lock(self, category: str) -> threading.Lock:
+        """获取分类级锁，保证同一分类的池只生成一次"""
+        with self.lock:
+            if category not in self.category_locks:
+                self.category_locks[category] = threading.Lock()
+            return self.category_locks[category]
+
+    def get_pool(self, category: str, generator: Callable[[str], Optional[Dict]]) -> Optional[Dict]:
+        """获取分类候选池，缓存未命中或过期时调用generator生成"""
+        if not category:
+            return None
+
+        pool = self.cache.get(category)
+        if pool:
+            return pool
+
+        with self._get_category_lock(category):
+            # 等待锁期间可能已被其他线程生成
+            pool = self.cache.get(category)
+            if pool:
+                return pool
+
+            logger.info(f"生成分类候选工具池: {category}")
+            pool = generator(category)
+            if not pool:
+                return None
+
+            self.cache.set(category, pool)
+            return pool
+
+    def derive_tool_lists(self, pool: Dict, tool_data: Dict) -> Dict[str, List[Dict]]:
+        """从候选池派生当前工具的推荐列表（排除工具自身）"""
+        same_category = self._exclude_self(pool.get('same_category', []), tool_data)
+        complementary = self._exclude_self(pool.get('complementary', []), tool_data)
+
+        return {
+            'alternative_tools': same_category[:5],
+            'other_tools': same_category[5:9] or same_category[:4],
+            'featured_matches': complementary[:4]
+        }
+
+    def _exclude_self(self, tools: List[Dict], tool_data: Dict) -> List[Dict]:
+        """排除与当前工具同名或同域名的候选"""
+        name = self._normalize_name(tool_data.get('product_name', ''))
+        domain = self._get_domain(tool_data.get('product_url', ''))
+
+        result = []
+        for tool in tools:
+            if not isinstance(tool, dict):
+                continue
+            if name and self._normalize_name(tool.get('product_name', '')) == name:
+                continue
+            if domain and self._get_domain(tool.get('product_url', '')) == domain:
+                continue
+            result.append(tool)
+        return result
+
+    def _normalize_name(self, name: str) -> str:
+        """规范化工具名称"""
+        return ''.join(ch for ch in str(name or '').lower() if ch.isalnum())
+
+    def _get_domain(self, url: str) -> str:
+        """提取去掉www前缀的域名"""
+        if not url:
+            return ''
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        netloc = urlparse(url).netloc.lower()
+        return netloc[4:] if netloc.startswith('www.') else netloc
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计"""
+        return self.cache.get_stats()
+
+# 全局实例
+category_pool_cache = CategoryPoolCache()
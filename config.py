@@ -41,6 +41,8 @@ class Config:
         self.ENABLE_FIRECRAWL = self._get_bool('ENABLE_FIRECRAWL', False)
         self.ENABLE_GEMINI_ENHANCEMENT = self._get_bool('ENABLE_GEMINI_ENHANCEMENT', True)
         self.ENABLE_VIDEO_SEARCH = self._get_bool('ENABLE_VIDEO_SEARCH', False)
+        self.ENABLE_LOCAL_SIMILARITY = self._get_bool('ENABLE_LOCAL_SIMILARITY', True)
+        self.ENABLE_ASSET_STORE = self._get_bool('ENABLE_ASSET_STORE', False)
         self.DEBUG_MODE = self._get_bool('DEBUG_MODE', True)
         
         # === 处理参数 ===
@@ -48,13 +50,51 @@ class Config:
         self.SCRAPE_DELAY = self._get_float('SCRAPE_DELAY', 3.0)
         self.IMPORT_DELAY = self._get_float('IMPORT_DELAY', 1.0)
         self.REQUEST_TIMEOUT = self._get_int('REQUEST_TIMEOUT', 30)
+        self.WP_POOL_SIZE = self._get_int('WP_POOL_SIZE', 10)
+        self.WP_MAX_RETRIES = self._get_int('WP_MAX_RETRIES', 3)
+        self.WP_IMPORT_CHUNK_SIZE = self._get_int('WP_IMPORT_CHUNK_SIZE', 25)
+        self.WP_USE_BATCH_API = self._get_bool('WP_USE_BATCH_API', False)
+        self.WP_IMPORT_WORKERS = self._get_int('WP_IMPORT_WORKERS', 4)
+        self.WP_MAX_IN_FLIGHT = self._get_int('WP_MAX_IN_FLIGHT', 6)
         self.FIRECRAWL_TIMEOUT = self._get_int('FIRECRAWL_TIMEOUT', 30)
+        self.GEMINI_QUOTA_COOLDOWN = self._get_int('GEMINI_QUOTA_COOLDOWN', 300)
+        self.CATEGORY_POOL_TTL_HOURS = self._get_float('CATEGORY_POOL_TTL_HOURS', 168.0)
+        self.SIMILARITY_FEATURES = self._get_int('SIMILARITY_FEATURES', 2048)
+        self.POPULARITY_SEED = self._get_int('POPULARITY_SEED', 0)
+        self.FAVICON_CACHE_TTL_DAYS = self._get_float('FAVICON_CACHE_TTL_DAYS', 30.0)
+        self.FAVICON_NEGATIVE_TTL_HOURS = self._get_float('FAVICON_NEGATIVE_TTL_HOURS', 24.0)
+        self.FAVICON_RACE_TIMEOUT = self._get_float('FAVICON_RACE_TIMEOUT', 8.0)
+        self.SCREENSHOT_HEDGE_DELAY = self._get_float('SCREENSHOT_HEDGE_DELAY', 1.5)
+        self.SCREENSHOT_PROVIDER_MAX_FAILURES = self._get_int('SCREENSHOT_PROVIDER_MAX_FAILURES', 3)
+        self.SCREENSHOT_PROVIDER_PROBE_MINUTES = self._get_float('SCREENSHOT_PROVIDER_PROBE_MINUTES', 30.0)
+        self.SCREENSHOT_DEFER_VERIFY = self._get_bool('SCREENSHOT_DEFER_VERIFY', False)
+        self.SCREENSHOT_VERIFY_WORKERS = self._get_int('SCREENSHOT_VERIFY_WORKERS', 4)
+        self.PAGE_CACHE_PERSIST = self._get_bool('PAGE_CACHE_PERSIST', False)
+        self.PAGE_CACHE_TTL_HOURS = self._get_float('PAGE_CACHE_TTL_HOURS', 24.0)
+        self.PAGE_MAX_BYTES = self._get_int('PAGE_MAX_BYTES', 2 * 1024 * 1024)
+        self.PAGE_CACHE_MEMORY_BYTES = self._get_int('PAGE_CACHE_MEMORY_BYTES', 64 * 1024 * 1024)
+        self.VIDEO_PATH_CONCURRENCY = self._get_int('VIDEO_PATH_CONCURRENCY', 4)
+        self.VERIFIED_VIDEO_MATCH_THRESHOLD = self._get_float('VERIFIED_VIDEO_MATCH_THRESHOLD', 0.5)
+        self.SITEMAP_MAX_DEPTH = self._get_int('SITEMAP_MAX_DEPTH', 2)
+        self.SITEMAP_MAX_BYTES = self._get_int('SITEMAP_MAX_BYTES', 20 * 1024 * 1024)
+        self.SITEMAP_CACHE_TTL_HOURS = self._get_float('SITEMAP_CACHE_TTL_HOURS', 168.0)
+        self.VIDEO_OUTCOME_TTL_DAYS = self._get_float('VIDEO_OUTCOME_TTL_DAYS', 30.0)
+        self.VIDEO_NEGATIVE_TTL_HOURS = self._get_float('VIDEO_NEGATIVE_TTL_HOURS', 168.0)
+        self.VIDEO_ERROR_TTL_HOURS = self._get_float('VIDEO_ERROR_TTL_HOURS', 6.0)
+        self.VIDEO_VALIDATION_WORKERS = self._get_int('VIDEO_VALIDATION_WORKERS', 8)
+        self.VIDEO_VALIDATION_TTL_DAYS = self._get_float('VIDEO_VALIDATION_TTL_DAYS', 7.0)
+        self.VIDEO_OEMBED_STUB_URL = os.getenv('VIDEO_OEMBED_STUB_URL', '')
+        self.JSON_CACHE_FLUSH_INTERVAL = self._get_float('JSON_CACHE_FLUSH_INTERVAL', 5.0)
+        self.JSON_CACHE_FLUSH_BATCH = self._get_int('JSON_CACHE_FLUSH_BATCH', 50)
         
         # === 文件路径 ===
         self.INPUT_CSV_FILE = 'AI工具汇总-工作表2.csv'
         self.SCHEMA_FILE = 'ai_tool_firecrawl_schema.json'
         self.OUTPUT_JSON_FILE = 'processed_tools_data.json'
+        self.VERIFIED_VIDEOS_FILE = 'verified_tool_videos.json'
         self.LOG_FILE = 'import_log.txt'
+        self.CACHE_DIR = os.getenv('CACHE_DIR', 'cache')
+        self.ASSET_STORE_DIR = os.getenv('ASSET_STORE_DIR', 'assets')
     
     def _get_bool(self, key, default=False):
         """从环境变量获取布尔值"""
@@ -109,6 +149,8 @@ class Config:
         print(f"Firecrawl API: {'已配置' if self.FIRECRAWL_API_KEY else '未配置'}")
         print(f"Gemini增强: {'启用' if self.ENABLE_GEMINI_ENHANCEMENT else '禁用'}")
         print(f"视频搜索: {'启用' if self.ENABLE_VIDEO_SEARCH else '禁用'}")
+        print(f"本地相似度推荐: {'启用' if self.ENABLE_LOCAL_SIMILARITY else '禁用'}")
+        print(f"本地图片资源库: {'启用' if self.ENABLE_ASSET_STORE else '禁用'}")
         print(f"WordPress: {self.WP_API_BASE_URL or '未配置'}")
         print(f"处理限制: {self.MAX_TOOLS_TO_PROCESS or '无限制'}")
         print(f"调试模式: {'开启' if self.DEBUG_MODE else '关闭'}")
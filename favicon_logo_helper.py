@@ -3,62 +3,237 @@
 AI工具导入系统 - Favicon和Logo获取助手
 """
 
+import re
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from urllib.parse import urlparse, urljoin
 from config import config
 from logger import logger
+from json_cache import JsonFileCache
+from page_cache import page_cache
+from html_utils import parse_html, ICON_STRAINER
+from url_utils import get_hostname
+
+# 图标格式评分（矢量图最优）
+ICON_FORMAT_SCORES = {'svg': 60, 'png': 40, 'webp': 35, 'ico': 20, 'gif': 10, 'jpg': 10, 'jpeg': 10}
+
+# 达到该评分（约等于180px的官方PNG图标）即视为最佳结果，立即结束竞速
+GOOD_ENOUGH_SCORE = 240
+
+CONTENT_TYPE_FORMATS = {
+    'image/svg+xml': 'svg', 'image/png': 'png', 'image/webp': 'webp',
+    'image/x-icon': 'ico', 'image/vnd.microsoft.icon': 'ico',
+    'image/gif': 'gif', 'image/jpeg': 'jpg'
+}
 
 class FaviconHelper:
     """Favicon和Logo获取助手"""
-    
+
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         self.timeout = config.REQUEST_TIMEOUT
-    
+        self.probe_timeout = 5
+        self.race_timeout = config.FAVICON_RACE_TIMEOUT
+
+        # 按主机名缓存探测结果（包括"无favicon"的否定结果），缓存键与探测的主机一致，子域名各自探测
+        self.cache = JsonFileCache('favicon_host_cache.json', ttl=config.FAVICON_CACHE_TTL_DAYS * 86400)
+        self.negative_ttl = config.FAVICON_NEGATIVE_TTL_HOURS * 3600
+
     def get_favicon_url(self, website_url):
-        """获取网站的favicon URL"""
+        """获取网站的favicon URL（优先使用主机级缓存）"""
         if not website_url:
             return None
-            
+
+        cache_key = get_hostname(website_url)
+        cached = self.cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            logger.debug(f"favicon缓存命中: {cache_key} -> {cached.get('url') or '无favicon'}")
+            return cached.get('url')
+
         try:
-            # 标准化URL
-            if not website_url.startswith(('http://', 'https://')):
-                website_url = 'https://' + website_url
-                
-            parsed_url = urlparse(website_url)
-            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-            domain = parsed_url.netloc
-            
-            logger.debug(f"获取favicon: {website_url}")
-            
-            # 方法1: 尝试标准favicon路径
-            standard_favicon = urljoin(base_url, '/favicon.ico')
-            if self._check_url_exists(standard_favicon):
-                logger.debug(f"找到标准favicon: {standard_favicon}")
-                return standard_favicon
-            
-            # 方法2: 使用第三方服务
-            fallback_services = [
-                f"https://www.google.com/s2/favicons?domain={domain}&sz=64",
-                f"https://favicon.yandex.net/favicon/{domain}",
-                f"https://icons.duckduckgo.com/ip3/{domain}.ico"
-            ]
-            
-            for service_url in fallback_services:
-                if self._check_url_exists(service_url):
-                    logger.debug(f"使用第三方服务: {service_url}")
-                    return service_url
-            
-            logger.warning(f"未找到favicon: {website_url}")
-            return None
-            
+            favicon_url = self._probe_favicon_url(website_url)
         except Exception as e:
             logger.error(f"获取favicon失败: {e}")
             return None
-    
+
+        if cache_key:
+            self.cache.set(cache_key, {'url': favicon_url}, ttl=None if favicon_url else self.negative_ttl)
+        return favicon_url
+
+    def _probe_favicon_url(self, website_url):
+        """并行探测所有favicon候选地址，返回评分最高的有效图标"""
+        # 标准化URL
+        if not website_url.startswith(('http://', 'https://')):
+            website_url = 'https://' + website_url
+
+        parsed_url = urlparse(website_url)
+        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        domain = parsed_url.netloc
+
+        logger.debug(f"获取favicon: {website_url}")
+
+        # 标准favicon路径和第三方服务
+        candidates = [
+            self._make_candidate(urljoin(base_url, '/favicon.ico'), 32, 'ico', True),
+            self._make_candidate(f"https://www.google.com/s2/favicons?domain={domain}&sz=64", 64, 'png', False),
+            self._make_candidate(f"https://favicon.yandex.net/favicon/{domain}", 16, 'ico', False),
+            self._make_candidate(f"https://icons.duckduckgo.com/ip3/{domain}.ico", 32, 'ico', False),
+        ]
+
+        best = None
+        finished = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=8)
+        try:
+            # 首页解析（<link rel="icon">、apple-touch-icon、manifest）与候选检查同时进行
+            pending = {executor.submit(self._discover_page_icons, base_url, finished): 'discover'}
+            for candidate in candidates:
+                pending[executor.submit(self._check_icon, candidate, finished)] = 'check'
+
+            deadline = time.time() + self.race_timeout
+            while pending:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    logger.debug(f"favicon竞速超时，使用当前最佳结果: {domain}")
+                    break
+
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind = pending.pop(future)
+                    result = future.result() if not future.exception() else None
+                    if not result:
+                        continue
+
+                    if kind == 'discover':
+                        # 页面声明的图标加入竞速
+                        for candidate in result:
+                            pending[executor.submit(self._check_icon, candidate, finished)] = 'check'
+                    elif not best or result['score'] > best['score']:
+                        best = result
+
+                if best and best['score'] >= GOOD_ENOUGH_SCORE:
+                    break
+        finally:
+            # 取消排队中的探测并通知进行中的探测尽早退出（不再发起后续请求、不读取图标正文）；
+            # 已发出的单个请求无法中断，最长在probe_timeout内结束，此处不等待
+            finished.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if best:
+            logger.debug(f"选择favicon: {best['url']} (格式: {best['format']}, 尺寸: {best['size']}, 评分: {best['score']})")
+            return best['url']
+
+        logger.warning(f"未找到favicon: {website_url}")
+        return None
+
+    def _make_candidate(self, url, size, icon_format, first_party):
+        """创建图标候选"""
+        return {'url': url, 'size': size, 'format': icon_format, 'first_party': first_party}
+
+    def _score_candidate(self, candidate):
+        """按尺寸和格式为图标评分，官方图标优先"""
+        size = 256 if candidate['format'] == 'svg' else min(candidate.get('size') or 16, 256)
+        score = size + ICON_FORMAT_SCORES.get(candidate['format'], 0)
+        if candidate.get('first_party'):
+            score += 20
+        return score
+
+    def _guess_format(self, url, icon_type=''):
+        """根据type属性或URL扩展名猜测图标格式"""
+        if icon_type in CONTENT_TYPE_FORMATS:
+            return CONTENT_TYPE_FORMATS[icon_type]
+        match = re.search(r'\.(svg|png|webp|ico|gif|jpe?g)(?:$|\?)', urlparse(url).path + '?', re.IGNORECASE)
+        return match.group(1).lower() if match else 'png'
+
+    def _parse_sizes(self, sizes):
+        """解析sizes属性（如"32x32 180x180"或"any"），返回最大边长"""
+        if not sizes:
+            return 0
+        if 'any' in sizes.lower():
+            return 256
+        dimensions = [int(width) for width, _ in re.findall(r'(\d+)[xX](\d+)', sizes)]
+        return max(dimensions) if dimensions else 0
+
+    def _discover_page_icons(self, base_url, finished):
+        """
+        请求一次首页（与视频提取共享页面缓存），解析页面声明的图标和Web Manifest图标
+        首页正文随后还会用于视频提取，因此竞速结束后仍读取完毕，只跳过解析和manifest请求
+        """
+        response = page_cache.get(base_url, session=self.session, timeout=self.probe_timeout)
+        if finished.is_set() or response is None or response.status_code != 200:
+            return []
+
+        soup = parse_html(response.content, ICON_STRAINER)
+        candidates = []
+        manifest_url = None
+
+        for link in soup.find_all('link', href=True):
+            rel = ' '.join(link.get('rel') or []).lower()
+            href = urljoin(response.url, link['href'])
+
+            if 'manifest' in rel:
+                manifest_url = href
+            elif 'apple-touch-icon' in rel:
+                size = self._parse_sizes(link.get('sizes')) or 180
+                candidates.append(self._make_candidate(href, size, self._guess_format(href, link.get('type', '')), True))
+            elif 'icon' in rel and 'mask-icon' not in rel:
+                size = self._parse_sizes(link.get('sizes')) or 32
+                candidates.append(self._make_candidate(href, size, self._guess_format(href, link.get('type', '')), True))
+
+        if manifest_url and not finished.is_set():
+            candidates.extend(self._parse_manifest_icons(manifest_url))
+
+        logger.debug(f"页面声明图标: {len(candidates)} 个 ({base_url})")
+        return candidates
+
+    def _parse_manifest_icons(self, manifest_url):
+        """解析Web Manifest中的图标"""
+        try:
+            response = page_cache.get(manifest_url, session=self.session, timeout=self.probe_timeout)
+            if response is None or response.status_code != 200:
+                return []
+
+            candidates = []
+            for icon in response.json().get('icons', []):
+                if not isinstance(icon, dict) or not icon.get('src'):
+                    continue
+                href = urljoin(manifest_url, icon['src'])
+                size = self._parse_sizes(icon.get('sizes')) or 192
+                candidates.append(self._make_candidate(href, size, self._guess_format(href, icon.get('type', '')), True))
+            return candidates
+        except Exception as e:
+            logger.debug(f"解析manifest失败 {manifest_url}: {e}")
+            return []
+
+    def _check_icon(self, candidate, finished):
+        """验证图标候选是否可访问，返回带评分的候选或None（竞速已结束时不再发起请求）"""
+        if finished.is_set():
+            return None
+
+        try:
+            response = page_cache.head(candidate['url'], session=self.session, timeout=self.probe_timeout)
+            if response is not None and response.status_code == 405 and not finished.is_set():
+                # 部分服务器不支持HEAD，改用GET（只读取响应头，不下载图标正文）
+                with self.session.get(candidate['url'], timeout=self.probe_timeout, stream=True) as response:
+                    pass
+            if response is None or response.status_code != 200:
+                return None
+
+            content_type = response.headers.get('content-type', '').split(';')[0].strip().lower()
+            if content_type and not content_type.startswith('image/') and content_type != 'application/octet-stream':
+                return None
+
+            result = dict(candidate)
+            result['format'] = CONTENT_TYPE_FORMATS.get(content_type, candidate['format'])
+            result['score'] = self._score_candidate(result)
+            return result
+        except Exception:
+            return None
+
     def _check_url_exists(self, url):
         """检查URL是否存在"""
         try:
@@ -66,7 +241,7 @@ class FaviconHelper:
             return response.status_code == 200
         except Exception:
             return False
-    
+
     def enhance_tool_with_favicon(self, tool_data):
         """为工具数据添加favicon"""
         if not tool_data.get('logo_img_url'):
@@ -74,8 +249,12 @@ class FaviconHelper:
             if favicon_url:
                 tool_data['logo_img_url'] = favicon_url
                 logger.debug(f"添加favicon: {favicon_url}")
-        
+
         return tool_data
 
+    def get_cache_stats(self):
+        """获取favicon缓存命中统计"""
+        return self.cache.get_stats()
+
 # 全局实例
-favicon_helper = FaviconHelper() 
\ No newline at end of file
+favicon_helper = FaviconHelper()
@@ -2,11 +2,16 @@
 AI工具导入系统 - Gemini AI数据增强器
 """
 
+import argparse
 import json
+import random
 import time
 from typing import Dict, List, Optional
 from config import config
 from logger import logger
+from heuristic_enhancer import heuristic_enhancer
+from category_pool_cache import category_pool_cache
+from similarity_engine import similarity_engine
 
 class GeminiEnhancer:
     """Gemini AI数据增强器"""
@@ -15,6 +20,8 @@ class GeminiEnhancer:
         self.api_key = config.GEMINI_API_KEY
         self.enabled = config.ENABLE_GEMINI_ENHANCEMENT
         self.client = None
+        self.quota_cooldown = config.GEMINI_QUOTA_COOLDOWN
+        self.quota_exhausted_until = 0
         
         if self.is_enabled():
             try:
@@ -32,10 +39,18 @@ class GeminiEnhancer:
         """检查Gemini增强是否启用且配置正确"""
         return self.enabled and self.api_key and self.api_key != 'your_gemini_api_key'
     
+    def is_quota_exhausted(self) -> bool:
+        """检查Gemini配额是否处于耗尽冷却期"""
+        return time.time() < self.quota_exhausted_until
+    
     def _call_gemini_api(self, prompt: str) -> Optional[str]:
         """调用Gemini API"""
         if not self.is_enabled() or not self.client:
             return None
+        
+        # 配额耗尽冷却期内直接返回，由启发式增强器接管
+        if self.is_quota_exhausted():
+            return None
             
         try:
             # 添加延迟避免配额限制 (每分钟10次请求，安全起见每次等待8秒)
@@ -53,10 +68,10 @@ class GeminiEnhancer:
             
         except Exception as e:
             logger.error(f"Gemini API call failed: {e}")
-            # 如果遇到配额限制错误，等待更长时间
+            # 如果遇到配额限制错误，进入冷却期并切换到启发式增强，不再阻塞等待
             if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
-                logger.warning("API quota exceeded, waiting 60 seconds...")
-                time.sleep(60)
+                self.quota_exhausted_until = time.time() + self.quota_cooldown
+                logger.warning(f"API quota exceeded, switching to heuristic enhancement for {self.quota_cooldown} seconds")
             return None
     
     def enhance_tool_data(self, tool_data: Dict) -> Dict:
@@ -70,6 +85,14 @@ class GeminiEnhancer:
         enhanced_data = tool_data.copy()
         
         try:
+            # 配额耗尽时跳过所有LLM步骤，直接使用启发式增强
+            if self.is_quota_exhausted():
+                logger.info(f"Gemini quota exhausted, using heuristic enhancement: {tool_data.get('product_name', 'Unknown')}")
+                enhanced_data = heuristic_enhancer.fill_missing_fields(enhanced_data)
+                enhanced_data = self._enhance_ratings(enhanced_data)
+                enhanced_data = self._enhance_pricing(enhanced_data)
+                return self._fill_required_fields(enhanced_data)
+            
             # 0. 首先处理关键空字段
             enhanced_data = self._enhance_critical_empty_fields(enhanced_data)
             
@@ -100,7 +123,11 @@ class GeminiEnhancer:
             # 9. 增强功能特性
             enhanced_data = self._enhance_features(enhanced_data)
             
-            # 10. 填充所有必需的默认字段
+            # 10. 处理过程中配额耗尽时，用启发式增强填充剩余空字段
+            if self.is_quota_exhausted():
+                enhanced_data = heuristic_enhancer.fill_missing_fields(enhanced_data)
+            
+            # 11. 填充所有必需的默认字段
             enhanced_data = self._fill_required_fields(enhanced_data)
             
             logger.success(f"Completed Gemini enhancement: {enhanced_data.get('product_name', 'Unknown')}")
@@ -110,6 +137,52 @@ class GeminiEnhancer:
         
         return enhanced_data
     
+    def backfill_tool_data(self, tool_data: Dict) -> Dict:
+        """配额恢复后，用LLM重新生成启发式填充的字段"""
+        backfill_fields = tool_data.get('llm_backfill_fields')
+        if not backfill_fields or not self.is_enabled() or self.is_quota_exhausted():
+            return tool_data
+        
+        logger.info(f"LLM backfill for {tool_data.get('product_name', 'Unknown')}: {', '.join(backfill_fields)}")
+        
+        pending_data = {k: v for k, v in tool_data.items() if k not in backfill_fields and k != 'llm_backfill_fields'}
+        enhanced_data = self.enhance_tool_data(pending_data)
+        
+        # 只采用LLM实际生成的非空值；调用失败（网络错误、JSON无效、配额再次耗尽）的字段保留原启发式值和回填标记
+        heuristic_fields = set(enhanced_data.get('llm_backfill_fields', []))
+        remaining_fields = [field for field in backfill_fields
+                            if not enhanced_data.get(field) or field in heuristic_fields]
+        for field in remaining_fields:
+            if field in tool_data:
+                enhanced_data[field] = tool_data[field]
+        if 'alternative_tools' in remaining_fields and enhanced_data.get('alternative_tools'):
+            enhanced_data['alternatives_count_text'] = f"See {len(enhanced_data['alternative_tools'])} alternatives"
+        
+        remaining_fields = sorted(heuristic_fields | set(remaining_fields))
+        if remaining_fields:
+            enhanced_data['llm_backfill_fields'] = remaining_fields
+            logger.warning(f"LLM backfill incomplete for {tool_data.get('product_name', 'Unknown')}: {', '.join(remaining_fields)}")
+        else:
+            enhanced_data.pop('llm_backfill_fields', None)
+        return enhanced_data
+    
+    def backfill_tools(self, tools: List[Dict]) -> List[Dict]:
+        """回填所有带llm_backfill_fields的工具，配额再次耗尽时停止（剩余工具保留原数据）"""
+        pending = [index for index, tool in enumerate(tools) if tool.get('llm_backfill_fields')]
+        if not pending or not self.is_enabled():
+            return tools
+        
+        backfilled_count = 0
+        for index in pending:
+            if self.is_quota_exhausted():
+                logger.warning(f"Gemini quota still exhausted, {len(pending) - backfilled_count} tools left for backfill")
+                break
+            tools[index] = self.backfill_tool_data(tools[index])
+            backfilled_count += 1
+        
+        logger.info(f"LLM backfill completed: {backfilled_count}/{len(pending)} tools")
+        return tools
+    
     def _enhance_critical_empty_fields(self, tool_data: Dict) -> Dict:
         """专门处理关键的空字段"""
         product_name = tool_data.get('product_name', '')
@@ -388,12 +461,20 @@ Requirements:
     
     def _enhance_alternatives(self, tool_data: Dict) -> Dict:
         """增强替代工具 - 生成对象格式"""
-        if tool_data.get('alternative_tools'):
+        # 启用本地相似度引擎时，推荐关系在全部工具处理完后统一计算
+        if tool_data.get('alternative_tools') or similarity_engine.is_enabled():
             return tool_data
             
         product_name = tool_data.get('product_name', '')
         category = tool_data.get('category', '')
         
+        # 优先从分类候选池派生，避免每个工具单独调用
+        pool_lists = self.get_category_pool_lists(tool_data)
+        if pool_lists and pool_lists['alternative_tools']:
+            self._set_alternatives(tool_data, pool_lists['alternative_tools'])
+            logger.debug(f"Enhanced alternatives from category pool for {product_name}")
+            return tool_data
+        
         prompt = f"""List 5 alternative AI tools to "{product_name}" in the {category} category.
 
 Return format (valid JSON only):
@@ -427,32 +508,96 @@ Requirements:
                 cleaned_response = self._clean_json_response(response)
                 alternatives_data = json.loads(cleaned_response)
                 if isinstance(alternatives_data, dict) and 'alternative_tools' in alternatives_data:
-                    alternatives = alternatives_data['alternative_tools']
-                    tool_data['alternative_tools'] = alternatives
-                    tool_data['alternatives_count_text'] = f"See {len(alternatives)} alternatives"
-                    tool_data['view_more_alternatives_text'] = "View more alternatives"
-                    tool_data['if_you_liked_text'] = f"If you liked {product_name}, you might also like:"
+                    self._set_alternatives(tool_data, alternatives_data['alternative_tools'])
                     logger.debug(f"Enhanced alternatives for {product_name}")
             except json.JSONDecodeError as e:
                 logger.warning(f"Invalid alternatives JSON format: {e}")
         
         return tool_data
     
+    def _set_alternatives(self, tool_data: Dict, alternatives: List[Dict]):
+        """设置替代工具及相关文本"""
+        product_name = tool_data.get('product_name', '')
+        tool_data['alternative_tools'] = alternatives
+        tool_data['alternatives_count_text'] = f"See {len(alternatives)} alternatives"
+        tool_data['view_more_alternatives_text'] = "View more alternatives"
+        tool_data['if_you_liked_text'] = f"If you liked {product_name}, you might also like:"
+    
+    def get_category_pool_lists(self, tool_data: Dict) -> Optional[Dict[str, List[Dict]]]:
+        """从分类候选池派生当前工具的推荐列表（也供本地相似度引擎补足候选不足的列表）"""
+        pool = category_pool_cache.get_pool(tool_data.get('category', ''), self._generate_category_pool)
+        if not pool:
+            return None
+        return category_pool_cache.derive_tool_lists(pool, tool_data)
+    
+    def _generate_category_pool(self, category: str) -> Optional[Dict]:
+        """为分类生成一次候选工具池（同类工具 + 互补工具）"""
+        prompt = f"""List well-known AI tools related to the {category} category.
+
+Return format (valid JSON only):
+{{
+  "same_category": [
+    {{
+      "product_name": "Tool Name",
+      "product_url": "https://example.com",
+      "short_introduction": "Brief description of the tool",
+      "category": "{category}",
+      "logo_img_url": "https://example.com/favicon.ico",
+      "overview_img_url": "https://example.com/preview.jpg",
+      "general_price_tag": "Free",
+      "average_rating": 4.3,
+      "popularity_score": 75000,
+      "demo_video_url": "https://www.youtube.com/watch?v=example"
+    }}
+  ],
+  "complementary": [
+    {{
+      "product_name": "Tool Name",
+      "product_url": "https://example.com",
+      "short_introduction": "Brief description of the tool",
+      "category": "Tool Category",
+      "logo_img_url": "https://example.com/favicon.ico",
+      "overview_img_url": "https://example.com/preview.jpg",
+      "general_price_tag": "Freemium",
+      "average_rating": 4.5,
+      "popularity_score": 85000,
+      "demo_video_url": "https://www.youtube.com/watch?v=example"
+    }}
+  ]
+}}
+
+Requirements:
+1. "same_category": 12 popular and emerging tools in the {category} category
+2. "complementary": 6 tools from other categories that work well together with {category} tools
+3. Include realistic URLs and data
+4. Return only valid JSON, no explanations"""
+        
+        response = self._call_gemini_api(prompt)
+        if not response:
+            return None
+        
+        try:
+            pool = json.loads(self._clean_json_response(response))
+            if isinstance(pool, dict) and isinstance(pool.get('same_category'), list):
+                pool.setdefault('complementary', [])
+                return pool
+        except json.JSONDecodeError as e:
+            logger.warning(f"Invalid category pool JSON format: {e}")
+        
+        return None
+    
     def _enhance_ratings(self, tool_data: Dict) -> Dict:
         """增强评分信息"""
-        # 生成合理的评分数据
-        import random
+        # 生成合理的评分数据：由产品URL确定随机数，重复运行结果一致（否则内容哈希每次都会变化）
+        rng = random.Random(f"ratings:{tool_data.get('product_url') or tool_data.get('product_name', '')}")
         
         if not tool_data.get('user_ratings_count'):
-            tool_data['user_ratings_count'] = random.randint(50, 1000)
+            tool_data['user_ratings_count'] = rng.randint(50, 1000)
         
         if not tool_data.get('average_rating'):
-            tool_data['average_rating'] = round(random.uniform(3.8, 4.8), 1)
+            tool_data['average_rating'] = round(rng.uniform(3.8, 4.8), 1)
         
-        # 智能生成popularity_score - 基于访问量模拟
-        if not tool_data.get('popularity_score') or tool_data.get('popularity_score') == 0:
-            tool_data['popularity_score'] = self._calculate_popularity_score(tool_data)
-            logger.debug(f"Generated popularity_score: {tool_data['popularity_score']} for {tool_data.get('product_name', 'Unknown')}")
+        # popularity_score由批量评分器在全部工具处理完后统一计算 (popularity_scorer.score_missing)
         
         # 确保评分相关的文本存在
         tool_data['how_would_you_rate_text'] = tool_data.get('how_would_you_rate_text', 'How would you rate this tool?')
@@ -580,6 +725,23 @@ Requirements:
                 except json.JSONDecodeError as e:
                     logger.warning(f"Invalid features JSON format: {e}")
         
+        # 启用本地相似度引擎时，推荐关系在全部工具处理完后统一计算
+        if similarity_engine.is_enabled():
+            return tool_data
+        
+        # featured_matches和other_tools优先从分类候选池派生
+        needs_matches = not tool_data.get('featured_matches') or len(tool_data.get('featured_matches', [])) < 2
+        needs_other_tools = not tool_data.get('other_tools') or len(tool_data.get('other_tools', [])) < 3
+        if needs_matches or needs_other_tools:
+            pool_lists = self.get_category_pool_lists(tool_data)
+            if pool_lists:
+                if needs_matches and len(pool_lists['featured_matches']) >= 2:
+                    tool_data['featured_matches'] = pool_lists['featured_matches']
+                    logger.debug(f"Enhanced featured_matches from category pool for {product_name}")
+                if needs_other_tools and len(pool_lists['other_tools']) >= 3:
+                    tool_data['other_tools'] = pool_lists['other_tools']
+                    logger.debug(f"Enhanced other_tools from category pool for {product_name}")
+        
         # 增强featured_matches - 生成对象格式
         if not tool_data.get('featured_matches') or len(tool_data.get('featured_matches', [])) < 2:
             prompt = f"""Suggest 3-4 tools that work well together with "{product_name}" for enhanced productivity.
@@ -755,107 +917,6 @@ Requirements:
         
         return tool_data
     
-    def _calculate_popularity_score(self, tool_data: Dict) -> int:
-        """
-        智能计算工具的热门度分数 (20-100)
-        基于工具知名度、分类、评分等因素模拟访问量
-        """
-        import random
-        from datetime import datetime
-        
-        product_name = tool_data.get('product_name', '').lower()
-        category = tool_data.get('category', '')
-        average_rating = float(tool_data.get('average_rating', 4.0))
-        user_ratings_count = int(tool_data.get('user_ratings_count', 100))
-        
-        # 知名工具的基础分数映射
-        famous_tools_scores = {
-            'chatgpt': 95, 'gpt': 90, 'openai': 85,
-            'claude': 80, 'anthropic': 75,
-            'gemini': 82, 'google': 78, 'bard': 75,
-            'midjourney': 85, 'dall-e': 80, 'dalle': 80,
-            'stable diffusion': 75, 'stablediffusion': 75,
-            'copilot': 88, 'github copilot': 90, 'microsoft': 75,
-            'notion': 70, 'figma': 72, 'canva': 68,
-            'adobe': 70, 'photoshop': 72,
-            'visual search': 65, 'character ai': 60,
-            'jasper': 58, 'copy.ai': 55, 'copyai': 55,
-            'grammarly': 70, 'writesonic': 52,
-            'perplexity': 62, 'you.com': 45
-        }
-        
-        # 分类基础分数
-        category_scores = {
-            'AI Writing Assistant': 70, 'AI Chatbot': 75,
-            'AI Image Generator': 80, 'AI Code Assistant': 85,
-            'AI Search Engine': 60, 'AI Video Generator': 65,
-            'AI Audio Generator': 55, 'AI Design Tool': 60,
-            'AI Productivity': 65, 'AI Analysis': 50,
-            'Generative AI': 75, 'Machine Learning': 55
-        }
-        
-        # 基础分数 (30-60)
-        base_score = random.randint(35, 60)
-        
-        # 知名度加分 (0-40)
-        fame_bonus = 0
-        for famous_tool, score in famous_tools_scores.items():
-            if famous_tool in product_name:
-                fame_bonus = max(fame_bonus, score - 50)  # 转换为加分值
-                break
-        
-        # 分类加分 (0-30)
-        category_bonus = category_scores.get(category, 45) - 45
-        
-        # 评分影响 (0-15)
-        rating_bonus = int((average_rating - 3.5) * 10)  # 3.5分以上的部分转换为加分
-        rating_bonus = max(0, min(15, rating_bonus))
-        
-        # 用户评分数量影响 (0-10)
-        if user_ratings_count > 500:
-            popularity_bonus = 10
-        elif user_ratings_count > 200:
-            popularity_bonus = 8
-        elif user_ratings_count > 100:
-            popularity_bonus = 5
-        else:
-            popularity_bonus = 2
-        
-        # 时间因素 - 模拟新工具的热度
-        try:
-            creation_date = tool_data.get('date_created', '')
-            if creation_date:
-                created = datetime.fromisoformat(creation_date.replace('Z', '+00:00'))
-                days_old = (datetime.now() - created.replace(tzinfo=None)).days
-                if days_old < 30:  # 最近30天
-                    time_bonus = 15
-                elif days_old < 90:  # 最近90天
-                    time_bonus = 10
-                elif days_old < 180:  # 最近180天
-                    time_bonus = 5
-                else:
-                    time_bonus = 0
-            else:
-                time_bonus = random.randint(0, 8)  # 无日期信息时随机
-        except:
-            time_bonus = random.randint(0, 8)
-        
-        # 随机波动 (-5 到 +8)
-        random_factor = random.randint(-5, 8)
-        
-        # 计算最终分数
-        final_score = base_score + fame_bonus + category_bonus + rating_bonus + popularity_bonus + time_bonus + random_factor
-        
-        # 确保分数在合理范围内 (25-100)
-        final_score = max(25, min(100, final_score))
-        
-        logger.debug(f"Popularity calculation for {tool_data.get('product_name', 'Unknown')}: "
-                    f"base={base_score}, fame={fame_bonus}, category={category_bonus}, "
-                    f"rating={rating_bonus}, popularity={popularity_bonus}, time={time_bonus}, "
-                    f"random={random_factor} -> final={final_score}")
-        
-        return final_score
-    
     def _clean_json_response(self, response: str) -> str:
         """清理Gemini响应为有效JSON"""
         cleaned = response.strip()
@@ -872,4 +933,22 @@ Requirements:
         return cleaned.strip()
 
 # 全局实例
-gemini_enhancer = GeminiEnhancer() 
\ No newline at end of file
+gemini_enhancer = GeminiEnhancer()
+
+def main():
+    """配额恢复后，回填已处理工具数据中由启发式增强生成的字段"""
+    parser = argparse.ArgumentParser(description='用Gemini回填启发式生成的工具字段')
+    parser.add_argument('input_file', nargs='?', default=config.OUTPUT_JSON_FILE, help='工具数据JSON文件')
+    args = parser.parse_args()
+
+    with open(args.input_file, 'r', encoding='utf-8') as f:
+        tools = json.load(f)
+
+    gemini_enhancer.backfill_tools(tools)
+
+    with open(args.input_file, 'w', encoding='utf-8') as f:
+        json.dump(tools, f, ensure_ascii=False, indent=2)
+    print(f"已保存回填结果: {args.input_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+AI工具导入系统 - 启发式数据增强器
+Gemini配额耗尽时的降级方案：使用确定性生成器（与WordPress插件中的PHP默认生成器一致）和本地工具库数据填充字段
+"""
+
+import json
+import os
+from typing import Dict, List
+from config import config
+from logger import logger
+from similarity_engine import build_tool_object
+
+class HeuristicEnhancer:
+    """启发式数据增强器（无需调用LLM）"""
+
+    # 知名工具 -> 公司名称（对应PHP的_guess_company_name）
+    COMMON_COMPANIES = {
+        'ChatGPT': 'OpenAI',
+        'Claude': 'Anthropic',
+        'Gemini': 'Google',
+        'Copilot': 'Microsoft',
+        'Midjourney': 'Midjourney Inc.',
+        'DALL-E': 'OpenAI',
+        'Stable Diffusion': 'Stability AI'
+    }
+
+    # 分类 -> 主要任务（对应PHP的_guess_primary_task，补充CSV中的分类）
+    TASK_MAPPING = {
+        'AI Writing Assistant': 'Text Generation',
+        'AI Image Generator': 'Image Creation',
+        'AI Code Assistant': 'Code Generation',
+        'AI Search Engine': 'Search & Discovery',
+        'AI Chatbot': 'Conversation',
+        'AI ChatBots': 'Conversation',
+        'AI Video Generator': 'Video Creation',
+        'AI Audio Generator': 'Audio Creation',
+        'AI Character Generator': 'Character Creation',
+        'AI Presentation Maker': 'Presentation Design',
+        'AI Image Editor': 'Image Editing',
+        'AI Image Enhancer': 'Image Enhancement',
+        'AI Video Editing': 'Video Editing',
+        'AI Music Generator': 'Music Creation'
+    }
+
+    # 分类 -> 默认功能特性（对应PHP的_generate_default_features）
+    FEATURES_BY_CATEGORY = {
+        'AI Writing Assistant': [
+            'Natural language processing',
+            'Grammar and style checking',
+            'Content generation',
+            'Multiple language support',
+            'Real-time suggestions'
+        ],
+        'AI Image Generator': [
+            'Text-to-image generation',
+            'Style customization',
+            'High-resolution output',
+            'Batch processing',
+            'Multiple art styles'
+        ],
+        'AI Search Engine': [
+            'Visual search capabilities',
+            'Advanced filtering',
+            'Real-time results',
+            'Multi-format support',
+            'Intelligent recommendations'
+        ]
+    }
+    DEFAULT_FEATURES = [
+        'AI-powered processing',
+        'User-friendly interface',
+        'Fast performance',
+        'Reliable results',
+        'Easy integration'
+    ]
+
+    # 分类 -> 默认优点（对应PHP的_generate_default_pros）
+    PROS_BY_CATEGORY = {
+        'AI Writing Assistant': ['Improves writing efficiency', 'Accurate grammar checking', 'Multi-language support', 'Real-time suggestions'],
+        'AI Image Generator': ['High creation efficiency', 'Good image quality', 'Diverse styles', 'Easy to operate'],
+        'AI Search Engine': ['Precise search', 'Comprehensive results', 'Fast response', 'User-friendly interface'],
+        'AI ChatBots': ['Natural conversations', 'Strong understanding', 'Quick responses', 'Rich features'],
+        'AI Code Assistant': ['Fast code generation', 'Accurate error detection', 'Multi-language support', 'Low learning curve'],
+        'AI Video Generator': ['High video quality', 'Strong editing features', 'Rich templates', 'Multiple export formats'],
+        'AI Audio Generator': ['Clear audio quality', 'Diverse styles', 'Fast generation', 'Easy to use'],
+        'AI Image Editor': ['Precise editing', 'Comprehensive features', 'Fast processing', 'Natural effects'],
+        'AI Presentation Maker': ['Beautiful templates', 'Efficient creation', 'Great presentation effects', 'Convenient collaboration'],
+        'AI Music Generator': ['High music quality', 'Rich styles', 'Flexible creation', 'Clear copyright']
+    }
+    DEFAULT_PROS = ['Powerful features', 'Easy to use', 'Good results', 'Great value']
+
+    # 分类 -> 默认缺点（对应PHP的_generate_default_cons）
+    CONS_BY_CATEGORY = {
+        'AI Writing Assistant': ['May produce incorrect information', 'Requires internet connection', 'Limited free features'],
+        'AI Image Generator': ['Free version limitations', 'Long generation time', 'Copyright concerns'],
+        'AI Search Engine': ['Results may be incomplete', 'Accuracy needs verification', 'Privacy protection needs improvement'],
+        'AI ChatBots': ['May have understanding biases', 'Limited context memory', 'Sometimes repetitive answers'],
+        'AI Code Assistant': ['Code needs verification', 'Limited language support', 'Complex logic handling limitations'],
+        'AI Video Generator': ['Advanced features require payment', 'Long processing time', 'File size limitations'],
+        'AI Audio Generator': ['Unstable audio quality', 'Commercial use requires payment', 'Limited format support'],
+        'AI Image Editor': ['Insufficient fine editing', 'Batch processing limitations', 'Missing professional features'],
+        'AI Presentation Maker': ['Limited customization options', 'Slow template updates', 'Limited export formats'],
+        'AI Music Generator': ['Questionable originality', 'Style limitations', 'Insufficient professional production']
+    }
+    DEFAULT_CONS = ['Feature limitations', 'Requires payment', 'Learning curve']
+
+    # 需要LLM生成、降级时由启发式填充的字段
+    LLM_FIELDS = [
+        'short_introduction', 'product_story', 'author_company', 'initial_release_date',
+        'primary_task', 'message', 'pros_list', 'cons_list', 'related_tasks',
+        'job_impacts', 'alternative_tools', 'faq', 'features', 'featured_matches',
+        'other_tools', 'releases'
+    ]
+
+    def __init__(self):
+        self.catalog_file = config.OUTPUT_JSON_FILE
+        self.catalog = self._load_catalog()
+
+    def _load_catalog(self) -> Dict[str, Dict]:
+        """加载本地工具库（上一次运行的处理结果），按规范化名称索引"""
+        catalog = {}
+        if not os.path.exists(self.catalog_file):
+            return catalog
+
+        try:
+            with open(self.catalog_file, 'r', encoding='utf-8') as f:
+                tools = json.load(f)
+            for tool in tools if isinstance(tools, list) else []:
+                name = self._normalize_name(tool.get('product_name', ''))
+                if name:
+                    catalog[name] = tool
+            logger.debug(f"启发式增强器加载本地工具库: {len(catalog)} 个工具")
+        except Exception as e:
+            logger.warning(f"加载本地工具库失败: {e}")
+
+        return catalog
+
+    def _normalize_name(self, name: str) -> str:
+        """规范化工具名称"""
+        return ' '.join(str(name or '').lower().split())
+
+    def guess_company_name(self, product_name: str) -> str:
+        """猜测公司名称"""
+        product_lower = product_name.lower()
+        for tool, company in self.COMMON_COMPANIES.items():
+            if tool.lower() in product_lower:
+                return company
+
+        return f"{product_name[:1].upper()}{product_name[1:].lower()} Team"
+
+    def guess_primary_task(self, category: str) -> str:
+        """猜测主要任务"""
+        return self.TASK_MAPPING.get(category, 'AI Processing')
+
+    def generate_default_features(self, category: str) -> List[str]:
+        """生成默认功能特性"""
+        return list(self.FEATURES_BY_CATEGORY.get(category, self.DEFAULT_FEATURES))
+
+    def generate_default_pros(self, category: str) -> List[str]:
+        """生成默认优点"""
+        return list(self.PROS_BY_CATEGORY.get(category, self.DEFAULT_PROS))
+
+    def generate_default_cons(self, category: str) -> List[str]:
+        """生成默认缺点"""
+        return list(self.CONS_BY_CATEGORY.get(category, self.DEFAULT_CONS))
+
+    def generate_default_faq(self, product_name: str, category: str) -> List[Dict]:
+        """生成默认FAQ"""
+        return [
+            {
+                'question': f"What is {product_name}?",
+                'answer': f"{product_name} is an {category} tool that helps users with AI-powered tasks."
+            },
+            {
+                'question': f"How do I use {product_name}?",
+                'answer': f"Simply visit the website, create an account if needed, and start using the {category} features."
+            },
+            {
+                'question': f"Is {product_name} free?",
+                'answer': f"{product_name} may offer both free and premium plans. Check their pricing page for details."
+            },
+            {
+                'question': "What are the main features?",
+                'answer': f"{product_name} offers advanced {category} capabilities with user-friendly interface and reliable performance."
+            },
+            {
+                'question': f"Who should use {product_name}?",
+                'answer': f"{product_name} is suitable for professionals, students, and anyone who needs {category} assistance."
+            }
+        ]
+
+    def generate_related_tasks(self, category: str) -> List[str]:
+        """根据主要任务生成相关任务"""
+        task = self.guess_primary_task(category)
+        return [f"{task} for personal projects", f"{task} for business", f"{task} automation"]
+
+    def get_catalog_tools(self, category: str, exclude_name: str = '', limit: int = 5) -> List[Dict]:
+        """从本地工具库获取同分类工具对象"""
+        exclude = self._normalize_name(exclude_name)
+        tools = []
+        for name, tool in self.catalog.items():
+            if name == exclude or tool.get('category') != category:
+                continue
+            tools.append(build_tool_object(tool))
+            if len(tools) >= limit:
+                break
+        return tools
+
+    def _generate_field(self, field: str, tool_data: Dict):
+        """为单个字段生成启发式值，无法生成时返回None"""
+        product_name = tool_data.get('product_name', '')
+        category = tool_data.get('category', '')
+
+        generators = {
+            'short_introduction': lambda: f"{product_name} is an {category} tool.",
+            'product_story': lambda: f"{product_name} is an {category} tool focused on {self.guess_primary_task(category).lower()}.",
+            'author_company': lambda: self.guess_company_name(product_name),
+            'initial_release_date': lambda: '2023',
+            'primary_task': lambda: self.guess_primary_task(category),
+            'message': lambda: f"Try {product_name}",
+            'pros_list': lambda: self.generate_default_pros(category),
+            'cons_list': lambda: self.generate_default_cons(category),
+            'related_tasks': lambda: self.generate_related_tasks(category),
+            'faq': lambda: self.generate_default_faq(product_name, category),
+            'features': lambda: self.generate_default_features(category),
+            'alternative_tools': lambda: self.get_catalog_tools(category, product_name, 5),
+            'other_tools': lambda: self.get_catalog_tools(category, product_name, 4),
+        }
+
+        generator = generators.get(field)
+        return generator() if generator else None
+
+    def fill_missing_fields(self, tool_data: Dict) -> Dict:
+        """
+        填充仍为空的LLM字段
+        优先复用本地工具库中同名工具的已有数据，否则使用确定性生成器；
+        使用生成器填充（或仍为空、或复用的值在工具库中仍待回填）的字段记录到llm_backfill_fields，供配额恢复后由LLM回填
+        """
+        product_name = tool_data.get('product_name', '')
+        cached_tool = self.catalog.get(self._normalize_name(product_name), {})
+        backfill_fields = set(tool_data.get('llm_backfill_fields', []))
+
+        for field in self.LLM_FIELDS:
+            if tool_data.get(field):
+                continue
+
+            if cached_tool.get(field):
+                tool_data[field] = cached_tool[field]
+                # 上次运行中也是启发式填充的值，同样需要LLM回填
+                if field in cached_tool.get('llm_backfill_fields', []):
+                    backfill_fields.add(field)
+                continue
+
+            value = self._generate_field(field, tool_data)
+            if value:
+                tool_data[field] = value
+            backfill_fields.add(field)
+
+        if tool_data.get('alternative_tools'):
+            tool_data['alternatives_count_text'] = f"See {len(tool_data['alternative_tools'])} alternatives"
+
+        if backfill_fields:
+            tool_data['llm_backfill_fields'] = sorted(backfill_fields)
+            logger.debug(f"启发式填充 {product_name}: {len(backfill_fields)} 个字段待LLM回填")
+
+        return tool_data
+
+# 全局实例
+heuristic_enhancer = HeuristicEnhancer()
@@ -0,0 +1,38 @@
+"""
+AI工具导入系统 - HTML解析工具函数
+安装了lxml时使用lxml后端，否则使用内置的html.parser；支持用SoupStrainer只解析相关标签
+"""
+
+from importlib.util import find_spec
+from bs4 import BeautifulSoup, SoupStrainer
+
+HTML_PARSER = 'lxml' if find_spec('lxml') else 'html.parser'
+
+class RegionStrainer(SoupStrainer):
+    """
+    按标签名保留标签，另外保留属性满足match_attrs的标签（连同全部子节点，用于保留页面区域）
+    同时实现bs4 4.12（search_tag）和4.13+（allow_tag_creation）的解析期过滤接口
+    """
+
+    def __init__(self, tag_names, match_attrs):
+        super().__init__(list(tag_names))
+        self.tag_names = set(tag_names)
+        self.match_attrs = match_attrs
+
+    def _allows(self, name, attrs) -> bool:
+        return name in self.tag_names or self.match_attrs(attrs or {})
+
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return self._allows(name, attrs)
+
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        if isinstance(markup_name, str):
+            return markup_name if self._allows(markup_name, markup_attrs) else None
+        return super().search_tag(markup_name, markup_attrs)
+
+# favicon相关的标签（视频提取的过滤器依赖视频区域定义，见video_helper.VIDEO_STRAINER）
+ICON_STRAINER = SoupStrainer('link')
+
+def parse_html(content, parse_only: SoupStrainer = None) -> BeautifulSoup:
+    """解析HTML，parse_only指定时只构建匹配的标签"""
+    return BeautifulSoup(content, HTML_PARSER, parse_only=parse_only)
@@ -0,0 +1,160 @@
+"""
+AI工具导入系统 - JSON文件缓存
+带TTL的持久化键值缓存，供各增强器和助手共享
+"""
+
+import atexit
+import json
+import os
+import time
+import threading
+from typing import Any, Dict, Optional
+from config import config
+from logger import logger
+
+def load_json_file(path: str, default=None):
+    """读取JSON文件，不存在或损坏时返回默认值"""
+    if not os.path.exists(path):
+        return default
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"读取缓存文件失败 {path}: {e}")
+        return default
+
+def save_json_file(path: str, data) -> bool:
+    """原子写入JSON文件（先写临时文件再替换）"""
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        logger.warning(f"写入缓存文件失败 {path}: {e}")
+        return False
+
+class JsonFileCache:
+    """
+    带TTL的JSON文件缓存（线程安全）
+    写入只标记为脏数据，累计JSON_CACHE_FLUSH_BATCH次修改或距上次写盘超过JSON_CACHE_FLUSH_INTERVAL秒时
+    才在锁外写入快照，进程退出时写入剩余修改
+    """
+
+    def __init__(self, filename: str, ttl: Optional[float] = None, persist: bool = True):
+        self.path = os.path.join(config.CACHE_DIR, filename)
+        self.ttl = ttl
+        self.persist = persist
+        self.lock = threading.RLock()
+        self.entries = (load_json_file(self.path, {}) or {}) if persist else {}
+        self.hits = 0
+        self.misses = 0
+        self.pending_changes = 0
+        self.last_flush = time.time()
+        self.flush_lock = threading.Lock()  # 保证快照按顺序写盘
+
+        if persist:
+            atexit.register(self.flush)
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取未过期的缓存值，未命中返回None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or self._is_expired(entry):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return entry.get('value')
+
+    def get_entry(self, key: str) -> Optional[Dict]:
+        """获取未过期的完整缓存条目（包含时间戳），不计入命中统计"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or self._is_expired(entry):
+                return None
+            return dict(entry)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """写入缓存值，ttl为None时使用默认TTL"""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        with self.lock:
+            self.entries[key] = {
+                'value': value,
+                'cached_at': now,
+                'expires_at': now + ttl if ttl else None
+            }
+            flush_due = self._mark_dirty()
+
+        if flush_due:
+            self.flush()
+
+    def delete(self, key: str):
+        """删除缓存值"""
+        with self.lock:
+            flush_due = self.entries.pop(key, None) is not None and self._mark_dirty()
+
+        if flush_due:
+            self.flush()
+
+    def purge_expired(self) -> int:
+        """清理过期条目，返回清理数量"""
+        with self.lock:
+            expired = [key for key, entry in self.entries.items() if self._is_expired(entry)]
+            for key in expired:
+                del self.entries[key]
+            if expired:
+                self._mark_dirty()
+
+        if expired:
+            self.flush()
+        return len(expired)
+
+    def flush(self):
+        """把未写盘的修改写入磁盘（在缓存锁外序列化和写入快照）"""
+        if not self.persist:
+            return
+
+        with self.flush_lock:
+            with self.lock:
+                if not self.pending_changes:
+                    return
+                snapshot = dict(self.entries)
+                self.pending_changes = 0
+                self.last_flush = time.time()
+
+            if not save_json_file(self.path, snapshot):
+                with self.lock:
+                    self.pending_changes += 1
+
+    def get_stats(self) -> Dict:
+        """获取缓存命中统计"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+    def _is_expired(self, entry: Dict) -> bool:
+        """检查条目是否过期"""
+        expires_at = entry.get('expires_at')
+        return expires_at is not None and time.time() >= expires_at
+
+    def _mark_dirty(self) -> bool:
+        """记录一次未写盘的修改（需持有锁），返回是否应立即写盘"""
+        if not self.persist:
+            return False
+
+        self.pending_changes += 1
+        return (self.pending_changes >= config.JSON_CACHE_FLUSH_BATCH or
+                time.time() - self.last_flush >= config.JSON_CACHE_FLUSH_INTERVAL)
@@ -3,6 +3,7 @@ AI工具导入系统 - 日志管理
 """
 
 import datetime
+import threading
 from config import config
 
 class Logger:
@@ -11,21 +12,23 @@ class Logger:
     def __init__(self):
         self.log_file = config.LOG_FILE
         self.debug_mode = config.DEBUG_MODE
+        self.lock = threading.Lock()  # 多线程导入时避免日志行交错
     
     def log(self, message, level="INFO"):
         """记录日志消息"""
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_entry = f"[{timestamp}] [{level}] {message}"
         
-        # 输出到控制台
-        print(log_entry)
-        
-        # 写入日志文件
-        try:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(log_entry + "\n")
-        except Exception as e:
-            print(f"写入日志文件失败: {e}")
+        with self.lock:
+            # 输出到控制台
+            print(log_entry)
+            
+            # 写入日志文件
+            try:
+                with open(self.log_file, "a", encoding="utf-8") as f:
+                    f.write(log_entry + "\n")
+            except Exception as e:
+                print(f"写入日志文件失败: {e}")
     
     def info(self, message):
         """信息日志"""
@@ -18,6 +18,10 @@ from gemini_enhancer import gemini_enhancer
 from favicon_logo_helper import favicon_helper
 from screenshot_helper import screenshot_helper
 from video_helper import video_helper
+from similarity_engine import similarity_engine
+from popularity_scorer import popularity_scorer
+from page_cache import page_cache
+from asset_store import asset_store
 from wordpress_importer import WordPressImporter
 
 class AsyncToolProcessor:
@@ -249,6 +253,26 @@ def main():
             
             logger.success(f"完成 {len(enhanced_tools)} 个工具的基础处理")
         
+        # 等待后台截图验证完成（延迟验证模式），失败的记录已在本地修补
+        if screenshot_helper.defer_verify:
+            patched_count = screenshot_helper.wait_for_verifications()
+            logger.info(f"截图后台验证完成，修补 {patched_count} 条记录")
+        
+        # Gemini配额在处理过程中恢复时，回填启发式增强生成的字段
+        if config.ENABLE_GEMINI_ENHANCEMENT:
+            enhanced_tools = gemini_enhancer.backfill_tools(enhanced_tools)
+        
+        # 一次批量计算所有工具的热门度分数（需在计算推荐关系之前，推荐对象会复制该分数）
+        enhanced_tools = popularity_scorer.score_missing(enhanced_tools)
+        
+        # 下载logo和截图并生成本地缩略图
+        if asset_store.is_enabled():
+            enhanced_tools = asset_store.process_tools(enhanced_tools)
+        
+        # 基于本地工具库计算推荐关系（替代工具、推荐搭配、其他工具），本地候选不足时由分类候选池补足
+        if similarity_engine.is_enabled():
+            enhanced_tools = similarity_engine.apply_relations(enhanced_tools, gemini_enhancer.get_category_pool_lists)
+        
         # 5. 保存处理结果
         logger.info("\n步骤4: 保存处理结果")
         try:
@@ -278,6 +302,16 @@ def main():
         logger.info(f"处理成功率: {successful_processes/total_tools*100:.1f}%")
         logger.info(f"导入成功率: {successful_imports/total_tools*100:.1f}%")
         
+        favicon_stats = favicon_helper.get_cache_stats()
+        logger.info(f"Favicon缓存: 命中 {favicon_stats['hits']}/{favicon_stats['hits'] + favicon_stats['misses']} (命中率 {favicon_stats['hit_rate']*100:.1f}%)")
+        
+        page_stats = page_cache.get_stats()
+        logger.info(f"页面缓存: 命中 {page_stats['hits']}/{page_stats['hits'] + page_stats['misses']}, 合并并发请求 {page_stats['coalesced']} 次")
+        
+        for provider, stats in screenshot_helper.get_provider_stats().items():
+            status = " (已跳过)" if stats['failing'] else ""
+            logger.info(f"截图服务 {provider}: 成功率 {stats['success_rate']*100:.1f}%, p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s{status}")
+        
         if successful_imports > 0:
             logger.success(f"🎉 成功导入 {successful_imports} 个AI工具!")
             logger.info("请登录WordPress后台查看aihub文章类型")
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+AI工具导入系统 - 共享网页请求缓存
+按规范化URL缓存HTTP响应（状态码、响应头和正文），同一URL的并发请求合并为一次网络请求（single-flight），
+供VideoHelper、FaviconHelper和截图验证共用，每个页面每次运行只下载一次
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Optional
+import requests
+from requests.structures import CaseInsensitiveDict
+from config import config
+from logger import logger
+from json_cache import JsonFileCache
+from url_utils import normalize_url
+
+def is_cacheable_status(status_code: int) -> bool:
+    """只缓存成功和重定向响应，以及表示页面不存在的404/410；429和5xx等临时错误不缓存"""
+    return 200 <= status_code < 400 or status_code in (404, 410)
+
+class CachedResponse:
+    """缓存的HTTP响应（与requests.Response的常用属性一致）"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict, content: bytes = b'', encoding: Optional[str] = None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+class PageCache:
+    """带single-flight的HTTP响应缓存（线程安全）"""
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        })
+        self.timeout = config.REQUEST_TIMEOUT
+        self.max_bytes = config.PAGE_MAX_BYTES
+        self.persist = config.PAGE_CACHE_PERSIST
+        self.body_dir = os.path.join(config.CACHE_DIR, 'pages')
+
+        # 响应元数据（默认只在本次运行内有效，开启持久化后正文另存为文件）
+        self.cache = JsonFileCache('page_cache.json', ttl=config.PAGE_CACHE_TTL_HOURS * 3600, persist=self.persist)
+
+        # 内存中的正文按LRU淘汰，总字节数不超过PAGE_CACHE_MEMORY_BYTES
+        self.bodies = OrderedDict()
+        self.body_bytes = 0
+        self.max_memory = config.PAGE_CACHE_MEMORY_BYTES
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.coalesced = 0
+
+    def get(self, url: str, session: Optional[requests.Session] = None, timeout: Optional[float] = None) -> Optional[CachedResponse]:
+        """GET请求（优先使用缓存），网络错误返回None；正文超过PAGE_MAX_BYTES的部分被截断"""
+        return self._fetch('GET', url, session, timeout)
+
+    def head(self, url: str, session: Optional[requests.Session] = None, timeout: Optional[float] = None) -> Optional[CachedResponse]:
+        """HEAD请求；已缓存同一URL的GET响应时直接复用其状态码和响应头"""
+        key = normalize_url(url)
+        if self.cache.get_entry(f"GET {key}") is not None:
+            cached = self._load('GET', key)
+            if cached is not None:
+                return cached
+        return self._fetch('HEAD', url, session, timeout)
+
+    def _fetch(self, method: str, url: str, session, timeout) -> Optional[CachedResponse]:
+        """读取缓存或发起请求；同一键的并发请求等待第一个请求的结果（读取磁盘缓存时不持有锁）"""
+        key = normalize_url(url)
+        cached = self._load(method, key)
+        if cached is not None:
+            return cached
+
+        with self.lock:
+            flight = self.in_flight.get(f"{method} {key}")
+            is_leader = flight is None
+            if is_leader:
+                flight = self.in_flight[f"{method} {key}"] = Future()
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            return flight.result()
+
+        response = None
+        try:
+            # 上面读取缓存期间，同一键的请求可能刚完成并写入缓存
+            if self.cache.get_entry(f"{method} {key}") is not None:
+                response = self._load(method, key)
+            if response is None:
+                response = self._request(method, key, session or self.session, timeout or self.timeout)
+                if response is not None and is_cacheable_status(response.status_code):
+                    self._store(method, key, response)
+        finally:
+            with self.lock:
+                del self.in_flight[f"{method} {key}"]
+            flight.set_result(response)
+
+        return response
+
+    def _request(self, method: str, url: str, session: requests.Session, timeout: float) -> Optional[CachedResponse]:
+        """发起实际的网络请求"""
+        try:
+            if method == 'HEAD':
+                raw = session.head(url, timeout=timeout, allow_redirects=True)
+                return CachedResponse(raw.url, raw.status_code, dict(raw.headers), b'', raw.encoding)
+
+            with session.get(url, timeout=timeout, stream=True) as raw:
+                content = self._read_limited(raw, url)
+                return CachedResponse(raw.url, raw.status_code, dict(raw.headers), content, raw.encoding)
+        except Exception as e:
+            logger.debug(f"请求失败 {method} {url}: {e}")
+            return None
+
+    def _read_limited(self, raw: requests.Response, url: str) -> bytes:
+        """流式读取正文，超过字节上限时提前停止"""
+        content = bytearray()
+        for chunk in raw.iter_content(chunk_size=64 * 1024):
+            content.extend(chunk)
+            if len(content) >= self.max_bytes:
+                logger.debug(f"页面超过 {self.max_bytes} 字节，截断读取: {url}")
+                return bytes(content[:self.max_bytes])
+        return bytes(content)
+
+    def _body_path(self, cache_key: str) -> str:
+        """持久化正文的文件路径"""
+        return os.path.join(self.body_dir, hashlib.sha1(cache_key.encode('utf-8')).hexdigest())
+
+    def _load(self, method: str, key: str) -> Optional[CachedResponse]:
+        """从缓存读取响应，未命中返回None"""
+        cache_key = f"{method} {key}"
+        meta = self.cache.get(cache_key)
+        if meta is None:
+            return None
+
+        with self.lock:
+            content = self.bodies.get(cache_key)
+            if content is not None:
+                self.bodies.move_to_end(cache_key)
+
+        if content is None and method == 'GET':
+            if not self.persist:
+                return None
+            try:
+                with open(self._body_path(cache_key), 'rb') as f:
+                    content = f.read()
+            except OSError:
+                self.cache.delete(cache_key)
+                return None
+
+        return CachedResponse(meta['url'], meta['status_code'], meta['headers'], content or b'', meta.get('encoding'))
+
+    def _store(self, method: str, key: str, response: CachedResponse):
+        """写入缓存"""
+        cache_key = f"{method} {key}"
+        if method == 'GET':
+            self._remember_body(cache_key, response.content)
+            if self.persist:
+                os.makedirs(self.body_dir, exist_ok=True)
+                with open(self._body_path(cache_key), 'wb') as f:
+                    f.write(response.content)
+
+        self.cache.set(cache_key, {
+            'url': response.url,
+            'status_code': response.status_code,
+            'headers': dict(response.headers),
+            'encoding': response.encoding
+        })
+
+    def _remember_body(self, cache_key: str, content: bytes):
+        """把正文放入内存LRU，超出总字节上限时淘汰最久未使用的正文"""
+        with self.lock:
+            previous = self.bodies.pop(cache_key, None)
+            if previous is not None:
+                self.body_bytes -= len(previous)
+
+            if len(content) <= self.max_memory:
+                self.bodies[cache_key] = content
+                self.body_bytes += len(content)
+
+            while self.body_bytes > self.max_memory:
+                evicted_key, evicted = self.bodies.popitem(last=False)
+                self.body_bytes -= len(evicted)
+                if not self.persist:
+                    # 未持久化的正文淘汰后元数据也失效
+                    self.cache.delete(evicted_key)
+
+    def get_stats(self) -> Dict:
+        """获取缓存命中统计（coalesced为被合并的并发请求数）"""
+        stats = self.cache.get_stats()
+        stats['coalesced'] = self.coalesced
+        return stats
+
+# 全局实例
+page_cache = PageCache()
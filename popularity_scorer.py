@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+AI工具导入系统 - 批量热门度评分器
+一次处理整个工具库：预编译正则匹配知名工具名称，评分/评论数/时间加分以NumPy数组计算，
+结果可复现（随机因子由种子和工具名称决定，与运行次数和工具在列表中的位置无关），重复导入时不会产生无意义的更新
+"""
+
+import argparse
+import json
+import re
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+from config import config
+from logger import logger
+
+# 知名工具的基础分数映射
+FAMOUS_TOOLS_SCORES = {
+    'chatgpt': 95, 'gpt': 90, 'openai': 85,
+    'claude': 80, 'anthropic': 75,
+    'gemini': 82, 'google': 78, 'bard': 75,
+    'midjourney': 85, 'dall-e': 80, 'dalle': 80,
+    'stable diffusion': 75, 'stablediffusion': 75,
+    'copilot': 88, 'github copilot': 90, 'microsoft': 75,
+    'notion': 70, 'figma': 72, 'canva': 68,
+    'adobe': 70, 'photoshop': 72,
+    'visual search': 65, 'character ai': 60,
+    'jasper': 58, 'copy.ai': 55, 'copyai': 55,
+    'grammarly': 70, 'writesonic': 52,
+    'perplexity': 62, 'you.com': 45
+}
+
+# 分类基础分数
+CATEGORY_SCORES = {
+    'AI Writing Assistant': 70, 'AI Chatbot': 75,
+    'AI Image Generator': 80, 'AI Code Assistant': 85,
+    'AI Search Engine': 60, 'AI Video Generator': 65,
+    'AI Audio Generator': 55, 'AI Design Tool': 60,
+    'AI Productivity': 65, 'AI Analysis': 50,
+    'Generative AI': 75, 'Machine Learning': 55
+}
+
+# 所有知名工具名称编译为一个正则（长名称优先，避免"github copilot"被"copilot"截断）
+FAMOUS_TOOLS_PATTERN = re.compile(
+    '|'.join(re.escape(name) for name in sorted(FAMOUS_TOOLS_SCORES, key=len, reverse=True))
+)
+
+# 各随机因子的独立流编号
+STREAM_BASE, STREAM_TIME, STREAM_RANDOM = 1, 2, 3
+
+class PopularityScorer:
+    """批量热门度评分器"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed if seed is not None else config.POPULARITY_SEED
+        self.date_cache = {}
+
+    def _fame_bonus(self, product_name: str) -> int:
+        """
+        知名度加分 (0-45)：知名度超过50的部分，低于50的知名工具不扣分
+
+        >>> scorer = PopularityScorer()
+        >>> scorer._fame_bonus('ChatGPT Plus'), scorer._fame_bonus('You.com'), scorer._fame_bonus('Unknown Tool')
+        (45, 0, 0)
+        """
+        matches = FAMOUS_TOOLS_PATTERN.findall(product_name.lower())
+        if not matches:
+            return 0
+        return max(0, max(FAMOUS_TOOLS_SCORES[match] for match in matches) - 50)
+
+    def _parse_date(self, value) -> np.datetime64:
+        """解析ISO日期（带缓存），无法解析时返回NaT"""
+        if not value or not isinstance(value, str):
+            return np.datetime64('NaT')
+
+        if value not in self.date_cache:
+            try:
+                created = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                self.date_cache[value] = np.datetime64(created.replace(tzinfo=None), 's')
+            except ValueError:
+                self.date_cache[value] = np.datetime64('NaT')
+        return self.date_cache[value]
+
+    def _to_float_array(self, tools: List[Dict], field: str, default: float) -> np.ndarray:
+        """提取数值字段为数组，无效值使用默认值"""
+        values = np.full(len(tools), default, dtype=np.float64)
+        for i, tool in enumerate(tools):
+            try:
+                values[i] = float(tool.get(field, default))
+            except (TypeError, ValueError):
+                pass
+        return values
+
+    def _random_integers(self, keys: np.ndarray, stream: int, low: int, high: int) -> np.ndarray:
+        """生成[low, high]范围的伪随机整数，由(种子, 工具名称, 流编号)哈希得到"""
+        # splitmix64混合，uint64乘法按模2^64回绕
+        x = keys + np.uint64((stream * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x = x ^ (x >> np.uint64(31))
+        return low + (x % np.uint64(high - low + 1)).astype(np.int64)
+
+    def score_batch(self, tools: List[Dict], now: Optional[datetime] = None) -> np.ndarray:
+        """
+        批量计算热门度分数 (25-100)
+        基于工具知名度、分类、评分等因素模拟访问量
+        """
+        count = len(tools)
+        if count == 0:
+            return np.empty(0, dtype=np.int64)
+
+        names = [str(tool.get('product_name', '')) for tool in tools]
+        seed = np.uint64((self.seed or 0) & 0xFFFFFFFF) << np.uint64(32)
+        keys = np.array([zlib.crc32(name.encode('utf-8')) for name in names], dtype=np.uint64) | seed
+
+        # 基础分数 (35-60)
+        base_score = self._random_integers(keys, STREAM_BASE, 35, 60)
+
+        # 知名度加分
+        fame_bonus = np.array([self._fame_bonus(name) for name in names], dtype=np.int64)
+
+        # 分类加分
+        category_bonus = np.array([CATEGORY_SCORES.get(tool.get('category', ''), 45) - 45 for tool in tools], dtype=np.int64)
+
+        # 评分影响 (0-15)：3.5分以上的部分转换为加分
+        average_rating = self._to_float_array(tools, 'average_rating', 4.0)
+        rating_bonus = np.clip(np.trunc((average_rating - 3.5) * 10), 0, 15).astype(np.int64)
+
+        # 用户评分数量影响 (2-10)
+        ratings_count = self._to_float_array(tools, 'user_ratings_count', 100)
+        popularity_bonus = np.select(
+            [ratings_count > 500, ratings_count > 200, ratings_count > 100],
+            [10, 8, 5],
+            default=2
+        )
+
+        # 时间因素 - 模拟新工具的热度，无日期信息时随机 (0-8)
+        created = np.array([self._parse_date(tool.get('date_created')) for tool in tools], dtype='datetime64[s]')
+        current = np.datetime64((now or datetime.now()).replace(tzinfo=None), 's')
+        days_old = (current - created) / np.timedelta64(1, 'D')
+        time_bonus = np.select([days_old < 30, days_old < 90, days_old < 180], [15, 10, 5], default=0)
+        time_bonus = np.where(np.isnat(created), self._random_integers(keys, STREAM_TIME, 0, 8), time_bonus)
+
+        # 随机波动 (-5 到 +8)
+        random_factor = self._random_integers(keys, STREAM_RANDOM, -5, 8)
+
+        final_score = base_score + fame_bonus + category_bonus + rating_bonus + popularity_bonus + time_bonus + random_factor
+        return np.clip(final_score, 25, 100).astype(np.int64)
+
+    def score_missing(self, tools: List[Dict]) -> List[Dict]:
+        """一次批量计算所有缺少popularity_score的工具（已有分数的工具保持不变）"""
+        pending = [tool for tool in tools if not tool.get('popularity_score')]
+        if not pending:
+            return tools
+
+        for tool, score in zip(pending, self.score_batch(pending).tolist()):
+            tool['popularity_score'] = score
+
+        logger.info(f"热门度评分完成: {len(pending)} 个工具")
+        return tools
+
+    def rescore_tools(self, tools: List[Dict]) -> List[Dict]:
+        """重新计算并写回所有工具的popularity_score"""
+        scores = self.score_batch(tools)
+        for tool, score in zip(tools, scores.tolist()):
+            tool['popularity_score'] = score
+
+        logger.info(f"热门度重新评分完成: {len(tools)} 个工具")
+        return tools
+
+# 全局实例
+popularity_scorer = PopularityScorer()
+
+def main():
+    """为已处理的工具数据批量重新评分"""
+    parser = argparse.ArgumentParser(description='批量重新计算工具热门度分数')
+    parser.add_argument('input_file', nargs='?', default=config.OUTPUT_JSON_FILE, help='工具数据JSON文件')
+    parser.add_argument('--seed', type=int, default=config.POPULARITY_SEED, help='随机种子（更换种子得到另一组可复现的分数）')
+    args = parser.parse_args()
+
+    with open(args.input_file, 'r', encoding='utf-8') as f:
+        tools = json.load(f)
+
+    PopularityScorer(seed=args.seed).rescore_tools(tools)
+
+    with open(args.input_file, 'w', encoding='utf-8') as f:
+        json.dump(tools, f, ensure_ascii=False, indent=2)
+    print(f"已更新 {len(tools)} 个工具的热门度分数: {args.input_file}")
+
+if __name__ == "__main__":
+    main()
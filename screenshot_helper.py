@@ -2,17 +2,138 @@
 AI工具导入系统 - 网站截图辅助器
 """
 
-import requests
+import atexit
+import os
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from urllib.parse import urlparse, quote
 from config import config
 from logger import logger
+from json_cache import load_json_file, save_json_file
+from page_cache import page_cache
+
+# 每个服务保留的最近延迟样本数
+LATENCY_SAMPLE_SIZE = 50
+
+class ProviderScoreboard:
+    """截图服务健康记分板（持久化成功率和延迟统计，进程退出时写盘一次）"""
+
+    def __init__(self, filename: str = 'screenshot_providers.json'):
+        self.path = os.path.join(config.CACHE_DIR, filename)
+        self.lock = threading.Lock()
+        self.stats = load_json_file(self.path, {}) or {}
+        self.max_failures = config.SCREENSHOT_PROVIDER_MAX_FAILURES
+        self.probe_interval = config.SCREENSHOT_PROVIDER_PROBE_MINUTES * 60
+        self.dirty = False
+        atexit.register(self.save)
+
+    def _get(self, provider: str) -> dict:
+        """获取服务统计（不存在时初始化）"""
+        return self.stats.setdefault(provider, {
+            'success': 0,
+            'failure': 0,
+            'consecutive_failures': 0,
+            'last_attempt_at': 0,
+            'latencies': []
+        })
+
+    def record(self, provider: str, success: bool, latency: float):
+        """记录一次请求结果"""
+        with self.lock:
+            stats = self._get(provider)
+            stats['last_attempt_at'] = time.time()
+            self.dirty = True
+            if success:
+                stats['success'] += 1
+                stats['consecutive_failures'] = 0
+                stats['latencies'] = (stats['latencies'] + [round(latency, 3)])[-LATENCY_SAMPLE_SIZE:]
+            else:
+                stats['failure'] += 1
+                stats['consecutive_failures'] += 1
+
+    def success_rate(self, provider: str) -> float:
+        """成功率（无记录时视为1.0，让新服务有机会参与）"""
+        stats = self.stats.get(provider)
+        if not stats or stats['success'] + stats['failure'] == 0:
+            return 1.0
+        return stats['success'] / (stats['success'] + stats['failure'])
+
+    def percentile(self, provider: str, percent: float) -> float:
+        """延迟百分位数（秒），无样本时返回0"""
+        latencies = sorted(self.stats.get(provider, {}).get('latencies', []))
+        if not latencies:
+            return 0.0
+        index = min(len(latencies) - 1, int(round(percent / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def is_failing(self, provider: str) -> bool:
+        """连续失败次数达到阈值的服务视为故障"""
+        return self.stats.get(provider, {}).get('consecutive_failures', 0) >= self.max_failures
+
+    def rank(self, providers: list) -> list:
+        """
+        按健康度排序服务：成功率高、p50延迟低的优先；
+        故障服务跳过，但每隔探测间隔放行一次（排在最后）以检测是否恢复
+        """
+        with self.lock:
+            healthy = [p for p in providers if not self.is_failing(p)]
+            probes = [
+                p for p in providers
+                if self.is_failing(p) and time.time() - self.stats[p]['last_attempt_at'] >= self.probe_interval
+            ]
+
+            healthy.sort(key=lambda p: (-round(self.success_rate(p), 1), self.percentile(p, 50)))
+            return healthy + probes
+
+    def summary(self) -> dict:
+        """各服务的成功率和p50/p95延迟"""
+        with self.lock:
+            return {
+                provider: {
+                    'success_rate': self.success_rate(provider),
+                    'p50': self.percentile(provider, 50),
+                    'p95': self.percentile(provider, 95),
+                    'failing': self.is_failing(provider)
+                }
+                for provider in self.stats
+            }
+
+    def save(self):
+        """持久化记分板（无新记录时跳过）"""
+        with self.lock:
+            if not self.dirty:
+                return
+            snapshot = {provider: dict(stats, latencies=list(stats['latencies'])) for provider, stats in self.stats.items()}
+            self.dirty = False
+        save_json_file(self.path, snapshot)
 
 class ScreenshotHelper:
     """网站截图辅助器"""
     
     def __init__(self):
         self.timeout = config.REQUEST_TIMEOUT
+        self.verify_timeout = 10
+        self.hedge_delay = config.SCREENSHOT_HEDGE_DELAY
+        self.scoreboard = ProviderScoreboard()
+
+        # 延迟验证模式：先记录排名最高的服务URL，由后台队列批量验证并修补失败记录
+        self.defer_verify = config.SCREENSHOT_DEFER_VERIFY
+        self.verify_workers = config.SCREENSHOT_VERIFY_WORKERS
+        self.verify_queue = queue.Queue()
+        self.worker_lock = threading.Lock()
+        self.workers = []
+        self.patched_count = 0
+
+        # 截图服务：名称 -> URL构建方法（默认顺序即原有的尝试顺序）
+        self.providers = {
+            'screenshot_machine': self._build_screenshot_machine_url,
+            'website_screenshot_api': self._build_website_screenshot_api_url,
+            'htmlcsstoimage': self._build_htmlcsstoimage_url,
+            'thum_io': self._build_thum_io_url,
+            's_shot': self._build_s_shot_url
+        }
     
     def get_website_screenshot(self, url: str, tool_name: str = "") -> str:
         """获取网站截图URL"""
@@ -29,28 +150,8 @@ class ScreenshotHelper:
                 logger.warning(f"无效的URL: {url}")
                 return ""
             
-            # 方法1: 使用Screenshot Machine API (免费服务)
-            screenshot_url = self._try_screenshot_machine(url)
+            screenshot_url = self._race_providers(url)
             if screenshot_url:
-                logger.debug(f"使用Screenshot Machine获取截图: {screenshot_url}")
-                return screenshot_url
-            
-            # 方法2: 使用Website Screenshot API
-            screenshot_url = self._try_website_screenshot_api(url)
-            if screenshot_url:
-                logger.debug(f"使用Website Screenshot API获取截图: {screenshot_url}")
-                return screenshot_url
-            
-            # 方法3: 使用HTMLCSStoImage API
-            screenshot_url = self._try_htmlcsstoimage(url)
-            if screenshot_url:
-                logger.debug(f"使用HTMLCSStoImage获取截图: {screenshot_url}")
-                return screenshot_url
-            
-            # 方法4: 使用Webpage Screenshot API
-            screenshot_url = self._try_webpage_screenshot(url)
-            if screenshot_url:
-                logger.debug(f"使用Webpage Screenshot获取截图: {screenshot_url}")
                 return screenshot_url
             
             logger.warning(f"无法获取网站截图: {url}")
@@ -60,85 +161,174 @@ class ScreenshotHelper:
             logger.error(f"获取截图异常 {url}: {e}")
             return ""
     
-    def _try_screenshot_machine(self, url: str) -> str:
-        """尝试使用Screenshot Machine服务"""
-        try:
-            # Screenshot Machine - 使用用户提供的API密钥
-            api_key = config.SCREENSHOT_API_KEY or 'demo'
-            encoded_url = quote(url, safe='')
-            screenshot_url = f"https://api.screenshotmachine.com/?key={api_key}&url={encoded_url}&dimension=1920x1080&device=desktop&cacheLimit=0"
-            
-            # 验证截图是否可访问
-            if self._verify_image_url(screenshot_url):
-                return screenshot_url
-            
-            return ""
-        except Exception:
+    def _race_providers(self, url: str) -> str:
+        """
+        对冲请求各截图服务：按健康度顺序启动，前一个服务超过对冲延迟未返回时启动下一个，
+        任一服务验证成功即返回并取消其余请求
+        """
+        ranked = self.scoreboard.rank(list(self.providers))
+        if not ranked:
+            logger.warning("所有截图服务均处于故障状态，跳过截图")
             return ""
     
-    def _try_website_screenshot_api(self, url: str) -> str:
-        """尝试使用Website Screenshot API"""
+        executor = ThreadPoolExecutor(max_workers=len(ranked))
+        pending = {}
+        result = ""
+
         try:
-            # Website Screenshot API - 免费服务
-            encoded_url = quote(url, safe='')
-            screenshot_url = f"https://api.website-screenshot.net/screenshot?url={encoded_url}&width=1920&height=1080&format=png"
+            for i, provider in enumerate(ranked):
+                pending[executor.submit(self._try_provider, provider, url)] = provider
             
-            if self._verify_image_url(screenshot_url):
-                return screenshot_url
+                # 最后一个服务启动后等待全部结果，否则只等待对冲延迟
+                is_last = i == len(ranked) - 1
+                result = self._wait_for_success(pending, None if is_last else self.hedge_delay)
+                if result:
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
             
-            return ""
+        return result
+
+    def _wait_for_success(self, pending: dict, timeout) -> str:
+        """等待进行中的请求，返回第一个成功的截图URL；超时或全部失败返回空字符串"""
+        deadline = None if timeout is None else time.time() + timeout
+
+        while pending:
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                return ""
+
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = pending.pop(future)
+                screenshot_url = future.result()
+                if screenshot_url:
+                    logger.debug(f"使用{provider}获取截图: {screenshot_url}")
+                    return screenshot_url
+
+        return ""
+
+    def _try_provider(self, provider: str, url: str) -> str:
+        """请求单个截图服务并记录结果到记分板"""
+        start = time.time()
+        try:
+            screenshot_url = self.providers[provider](url)
+            success = self._verify_image_url(screenshot_url, self.verify_timeout)
         except Exception:
-            return ""
+            screenshot_url, success = "", False
     
-    def _try_htmlcsstoimage(self, url: str) -> str:
-        """尝试使用HTMLCSStoImage服务"""
-        try:
-            # HTMLCSStoImage - 有免费额度
-            encoded_url = quote(url, safe='')
-            screenshot_url = f"https://hcti.io/v1/image?url={encoded_url}&viewport_width=1920&viewport_height=1080"
+        self.scoreboard.record(provider, success, time.time() - start)
+        return screenshot_url if success else ""
             
-            if self._verify_image_url(screenshot_url):
-                return screenshot_url
+    def _build_screenshot_machine_url(self, url: str) -> str:
+        """Screenshot Machine - 使用用户提供的API密钥"""
+        api_key = config.SCREENSHOT_API_KEY or 'demo'
+        encoded_url = quote(url, safe='')
+        return f"https://api.screenshotmachine.com/?key={api_key}&url={encoded_url}&dimension=1920x1080&device=desktop&cacheLimit=0"
             
-            return ""
-        except Exception:
-            return ""
+    def _build_website_screenshot_api_url(self, url: str) -> str:
+        """Website Screenshot API - 免费服务"""
+        encoded_url = quote(url, safe='')
+        return f"https://api.website-screenshot.net/screenshot?url={encoded_url}&width=1920&height=1080&format=png"
     
-    def _try_webpage_screenshot(self, url: str) -> str:
-        """尝试使用简单的截图服务"""
-        try:
-            # 简单的截图服务
-            parsed_url = urlparse(url)
-            domain = parsed_url.netloc
+    def _build_htmlcsstoimage_url(self, url: str) -> str:
+        """HTMLCSStoImage - 有免费额度"""
+        encoded_url = quote(url, safe='')
+        return f"https://hcti.io/v1/image?url={encoded_url}&viewport_width=1920&viewport_height=1080"
             
-            # 方法1: 使用thumbnail服务
-            screenshot_url = f"https://image.thum.io/get/width/1200/crop/800/noanimate/{url}"
-            if self._verify_image_url(screenshot_url):
-                return screenshot_url
+    def _build_thum_io_url(self, url: str) -> str:
+        """thum.io缩略图服务"""
+        return f"https://image.thum.io/get/width/1200/crop/800/noanimate/{url}"
             
-            # 方法2: 使用另一个截图服务
-            screenshot_url = f"https://mini.s-shot.ru/1920x1080/JPEG/1024/Z100/?{url}"
-            if self._verify_image_url(screenshot_url):
-                return screenshot_url
-            
-            return ""
-        except Exception:
-            return ""
+    def _build_s_shot_url(self, url: str) -> str:
+        """s-shot.ru截图服务"""
+        return f"https://mini.s-shot.ru/1920x1080/JPEG/1024/Z100/?{url}"
     
     def _verify_image_url(self, url: str, timeout: int = 10) -> bool:
         """验证图片URL是否有效"""
         try:
-            response = requests.head(url, timeout=timeout, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
+            # 同一截图URL在竞速和后台验证中共享一次HEAD结果
+            response = page_cache.head(url, timeout=timeout)
             
-            if response.status_code == 200:
+            if response is not None and response.status_code == 200:
                 content_type = response.headers.get('content-type', '')
                 return content_type.startswith('image/') or 'image' in content_type.lower()
             
             return False
         except Exception:
             return False
+
+    def _start_verify_workers(self):
+        """启动后台验证线程（首次入队时启动）"""
+        with self.worker_lock:
+            if self.workers:
+                return
+            for i in range(self.verify_workers):
+                worker = threading.Thread(target=self._verify_worker, name=f"screenshot-verify-{i}", daemon=True)
+                worker.start()
+                self.workers.append(worker)
+
+    def _verify_worker(self):
+        """后台验证线程：验证已记录的截图URL，失败时依次尝试下一个服务"""
+        while True:
+            tool_data, url, providers = self.verify_queue.get()
+            try:
+                self._verify_deferred(tool_data, url, providers)
+            except Exception as e:
+                logger.error(f"延迟验证截图异常 {url}: {e}")
+            finally:
+                self.verify_queue.task_done()
+
+    def _verify_deferred(self, tool_data: dict, url: str, providers: list):
+        """验证一条延迟记录的截图，必要时用下一个服务的结果修补"""
+        product_name = tool_data.get('product_name', '')
+        recorded_url = tool_data.get('overview_img_url', '')
+
+        for provider in providers:
+            screenshot_url = self._try_provider(provider, url)
+            if not screenshot_url:
+                continue
+
+            if screenshot_url != recorded_url:
+                tool_data['overview_img_url'] = screenshot_url
+                with self.worker_lock:
+                    self.patched_count += 1
+                logger.info(f"截图验证失败，已替换为{provider}: {product_name}")
+            return
+
+        tool_data['overview_img_url'] = ""
+        with self.worker_lock:
+            self.patched_count += 1
+        logger.warning(f"延迟验证后仍未能获取截图: {product_name}")
+
+    def _enqueue_screenshot(self, tool_data: dict, url: str) -> str:
+        """记录排名最高的服务URL（不验证）并加入后台验证队列"""
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+
+        ranked = self.scoreboard.rank(list(self.providers))
+        if not ranked or not urlparse(url).netloc:
+            return ""
+
+        screenshot_url = self.providers[ranked[0]](url)
+        tool_data['overview_img_url'] = screenshot_url
+
+        self._start_verify_workers()
+        self.verify_queue.put((tool_data, url, ranked))
+        return screenshot_url
+
+    def wait_for_verifications(self) -> int:
+        """等待后台验证队列处理完毕，返回被修补的记录数"""
+        if self.workers:
+            pending = self.verify_queue.unfinished_tasks
+            if pending:
+                logger.info(f"等待 {pending} 个截图后台验证完成...")
+            self.verify_queue.join()
+        return self.patched_count
+
+    def get_provider_stats(self) -> dict:
+        """获取各截图服务的健康统计"""
+        return self.scoreboard.summary()
     
     def enhance_tool_with_screenshot(self, tool_data: dict) -> dict:
         """为工具数据添加截图"""
@@ -150,6 +340,12 @@ class ScreenshotHelper:
         
         if not product_url:
             return tool_data
+
+        if self.defer_verify:
+            screenshot_url = self._enqueue_screenshot(tool_data, product_url)
+            if screenshot_url:
+                logger.debug(f"记录截图（待后台验证）: {screenshot_url}")
+            return tool_data
         
         logger.debug(f"获取截图: {product_name}")
         screenshot_url = self.get_website_screenshot(product_url, product_name)
@@ -163,4 +359,4 @@ class ScreenshotHelper:
         return tool_data
 
 # 全局实例
-screenshot_helper = ScreenshotHelper() 
\ No newline at end of file
+screenshot_helper = ScreenshotHelper() 
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+AI工具导入系统 - 本地相似度引擎
+基于哈希n-gram的TF-IDF向量（NumPy矩阵）计算工具间相似度，
+为alternative_tools、featured_matches和other_tools提供真实的工具库条目
+"""
+
+import json
+import re
+import sys
+import zlib
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from config import config
+from logger import logger
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# 用于构建向量的文本字段及权重
+TEXT_FIELDS = {
+    'product_name': 3.0,
+    'category': 2.0,
+    'primary_task': 2.0,
+    'short_introduction': 1.0,
+    'features': 1.0,
+    'inputs': 1.0,
+    'outputs': 1.0,
+}
+
+def build_tool_object(tool: Dict) -> Dict:
+    """构建推荐工具对象（与PHP的_build_tool_object_from_post字段一致）"""
+    return {
+        'id': tool.get('id'),
+        'product_name': tool.get('product_name', ''),
+        'product_url': tool.get('product_url', ''),
+        'short_introduction': tool.get('short_introduction', ''),
+        'category': tool.get('category', ''),
+        'logo_img_url': tool.get('logo_img_url', ''),
+        'overview_img_url': tool.get('overview_img_url', ''),
+        'demo_video_url': tool.get('demo_video_url', ''),
+        'general_price_tag': tool.get('general_price_tag', 'Unknown'),
+        'average_rating': tool.get('average_rating', 0),
+        'popularity_score': tool.get('popularity_score', 0)
+    }
+
+class SimilarityIndex:
+    """工具库相似度索引"""
+
+    def __init__(self, n_features: int = None, chunk_size: int = 1024):
+        self.n_features = n_features or config.SIMILARITY_FEATURES
+        self.chunk_size = chunk_size
+        self.tools = []
+        self.matrix = None
+        self.category_ids = None
+
+    def _hash_feature(self, feature: str) -> int:
+        """稳定的特征哈希（不受PYTHONHASHSEED影响）"""
+        return zlib.crc32(feature.encode('utf-8')) % self.n_features
+
+    def _extract_features(self, tool: Dict) -> Dict[int, float]:
+        """提取工具的哈希n-gram特征（词一元、二元和名称字符三元组）"""
+        features = {}
+
+        def add(feature, weight):
+            index = self._hash_feature(feature)
+            features[index] = features.get(index, 0.0) + weight
+
+        for field, weight in TEXT_FIELDS.items():
+            value = tool.get(field)
+            if isinstance(value, list):
+                value = ' '.join(str(item) for item in value if isinstance(item, (str, int, float)))
+            tokens = TOKEN_PATTERN.findall(str(value or '').lower())
+
+            for token in tokens:
+                add(f"w:{token}", weight)
+            for first, second in zip(tokens, tokens[1:]):
+                add(f"b:{first}_{second}", weight)
+
+        name = ''.join(ch for ch in str(tool.get('product_name', '')).lower() if ch.isalnum())
+        for i in range(len(name) - 2):
+            add(f"c:{name[i:i + 3]}", 0.5)
+
+        return features
+
+    def build(self, tools: List[Dict]) -> 'SimilarityIndex':
+        """构建TF-IDF矩阵（行L2归一化）"""
+        self.tools = tools
+        matrix = np.zeros((len(tools), self.n_features), dtype=np.float32)
+
+        for row, tool in enumerate(tools):
+            features = self._extract_features(tool)
+            if features:
+                matrix[row, list(features.keys())] = list(features.values())
+
+        # 次线性TF + 平滑IDF
+        np.log1p(matrix, out=matrix)
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        idf = np.log((1 + len(tools)) / (1 + document_frequency)) + 1
+        matrix *= idf.astype(np.float32)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        matrix /= norms
+        self.matrix = matrix
+
+        categories = [tool.get('category', '') for tool in tools]
+        category_index = {category: i for i, category in enumerate(dict.fromkeys(categories))}
+        self.category_ids = np.array([category_index[category] for category in categories], dtype=np.int32)
+
+        logger.debug(f"相似度索引构建完成: {len(tools)} 个工具, {self.n_features} 维")
+        return self
+
+    def _top_k(self, scores: np.ndarray, k: int) -> np.ndarray:
+        """每行取前k个最高分的列索引（按分数降序，-inf视为无效）"""
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return np.empty((scores.shape[0], 0), dtype=np.int64)
+
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind='stable')
+        return np.take_along_axis(candidates, order, axis=1)
+
+    def compute_relations(self, same_category_k: int = 9, cross_category_k: int = 3) -> List[Dict[str, List[int]]]:
+        """
+        一次向量化计算所有工具的近邻
+        返回每个工具的同类近邻（用于替代工具和其他工具）和跨类近邻（用于推荐搭配）索引
+        """
+        count = len(self.tools)
+        relations = []
+
+        for start in range(0, count, self.chunk_size):
+            stop = min(start + self.chunk_size, count)
+            scores = self.matrix[start:stop] @ self.matrix.T
+            scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+            same_mask = self.category_ids[start:stop, None] == self.category_ids[None, :]
+            same_scores = np.where(same_mask, scores, -np.inf)
+            cross_scores = np.where(same_mask, -np.inf, scores)
+
+            same_top = self._top_k(same_scores, same_category_k)
+            cross_top = self._top_k(cross_scores, cross_category_k)
+            same_valid = np.isfinite(np.take_along_axis(same_scores, same_top, axis=1))
+            cross_valid = np.isfinite(np.take_along_axis(cross_scores, cross_top, axis=1))
+
+            for row in range(stop - start):
+                relations.append({
+                    'same_category': same_top[row][same_valid[row]].tolist(),
+                    'cross_category': cross_top[row][cross_valid[row]].tolist()
+                })
+
+        return relations
+
+class SimilarityEngine:
+    """为工具列表填充基于本地相似度的推荐关系"""
+
+    RELATION_FIELDS = ('alternative_tools', 'featured_matches', 'other_tools')
+    # 每个推荐列表的目标长度（本地候选不足时由分类候选池补足）
+    RELATION_SIZES = {'alternative_tools': 5, 'other_tools': 4, 'featured_matches': 3}
+
+    def __init__(self):
+        self.enabled = config.ENABLE_LOCAL_SIMILARITY
+
+    def is_enabled(self) -> bool:
+        """检查本地相似度引擎是否启用"""
+        return self.enabled
+
+    def apply_relations(self, tools: List[Dict],
+                        pool_provider: Optional[Callable[[Dict], Optional[Dict[str, List[Dict]]]]] = None) -> List[Dict]:
+        """
+        为所有工具填充alternative_tools、featured_matches和other_tools
+        推荐关系以本地工具库为准；pool_provider返回分类候选池派生的列表，用于补足本地候选不足的列表
+        """
+        if not self.is_enabled() or not tools:
+            return tools
+
+        if len(tools) > 1:
+            relations = SimilarityIndex().build(tools).compute_relations()
+        else:
+            relations = [{'same_category': [], 'cross_category': []}]
+
+        pooled_count = 0
+        for tool, relation in zip(tools, relations):
+            same_category = [build_tool_object(tools[i]) for i in relation['same_category']]
+            cross_category = [build_tool_object(tools[i]) for i in relation['cross_category']]
+
+            tool['alternative_tools'] = same_category[:5]
+            tool['other_tools'] = same_category[5:9]
+            tool['featured_matches'] = cross_category
+
+            if pool_provider and self._fill_from_pool(tool, pool_provider):
+                pooled_count += 1
+
+            tool['alternatives_count_text'] = f"See {len(tool['alternative_tools'])} alternatives"
+
+            # 关系已由本地工具库提供，无需LLM回填
+            if tool.get('llm_backfill_fields'):
+                tool['llm_backfill_fields'] = [f for f in tool['llm_backfill_fields'] if f not in self.RELATION_FIELDS]
+
+        logger.success(f"本地相似度推荐完成: {len(tools)} 个工具 (其中 {pooled_count} 个由分类候选池补足)")
+        return tools
+
+    def _fill_from_pool(self, tool: Dict, pool_provider: Callable) -> bool:
+        """用分类候选池补足不足目标长度的推荐列表，返回是否补充了候选"""
+        if all(len(tool[field]) >= size for field, size in self.RELATION_SIZES.items()):
+            return False
+
+        pool_lists = pool_provider(tool)
+        if not pool_lists:
+            return False
+
+        # 本地工具优先，候选池中同名工具（包括工具自身）不重复加入
+        seen = {str(item.get('product_name', '')).lower()
+                for field in self.RELATION_FIELDS for item in tool[field]}
+        seen.add(str(tool.get('product_name', '')).lower())
+        filled = False
+        for field, size in self.RELATION_SIZES.items():
+            for candidate in pool_lists.get(field, []):
+                if len(tool[field]) >= size:
+                    break
+                name = str(candidate.get('product_name', '')).lower()
+                if name and name not in seen:
+                    tool[field].append(candidate)
+                    seen.add(name)
+                    filled = True
+        return filled
+
+# 全局实例
+similarity_engine = SimilarityEngine()
+
+def main(input_file: Optional[str] = None):
+    """为已处理的工具数据重新计算推荐关系"""
+    input_file = input_file or config.OUTPUT_JSON_FILE
+    with open(input_file, 'r', encoding='utf-8') as f:
+        tools = json.load(f)
+
+    similarity_engine.enabled = True
+    tools = similarity_engine.apply_relations(tools)
+
+    with open(input_file, 'w', encoding='utf-8') as f:
+        json.dump(tools, f, ensure_ascii=False, indent=2)
+    print(f"已更新 {len(tools)} 个工具的推荐关系: {input_file}")
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
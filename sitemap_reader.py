@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+AI工具导入系统 - 流式Sitemap读取器
+用iterparse增量解析流式下载的sitemap（支持gzip），跟随robots.txt中的Sitemap声明和嵌套sitemap索引，
+受深度和字节预算限制；只保留关键词得分最高的页面URL，并按域名缓存结果
+"""
+
+import gzip
+import heapq
+import re
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Optional
+from urllib.parse import urlparse
+import requests
+from config import config
+from logger import logger
+from json_cache import JsonFileCache
+from page_cache import page_cache
+
+# 视频相关页面关键词及权重
+SITEMAP_KEYWORD_WEIGHTS = {
+    'demo': 5, 'video': 5, 'product-tour': 4, 'tutorial': 4, 'walkthrough': 4,
+    'overview': 3, 'introduction': 3, 'how-it-works': 3, 'getting-started': 2, 'webinar': 2
+}
+
+SITEMAP_KEYWORD_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in SITEMAP_KEYWORD_WEIGHTS), re.IGNORECASE)
+
+ROBOTS_SITEMAP_PATTERN = re.compile(r'^\s*sitemap\s*:\s*(\S+)', re.IGNORECASE | re.MULTILINE)
+
+class ByteBudgetExceeded(Exception):
+    """sitemap读取超过字节预算"""
+
+class BudgetedStream:
+    """按字节预算读取的流包装器（超出预算时抛出ByteBudgetExceeded）"""
+
+    def __init__(self, stream, budget: int):
+        self.stream = stream
+        self.budget = budget
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size if size and size > 0 else 64 * 1024)
+        self.bytes_read += len(data)
+        if self.bytes_read > self.budget:
+            raise ByteBudgetExceeded()
+        return data
+
+class SitemapReader:
+    """流式Sitemap读取器"""
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or page_cache.session
+        self.max_depth = config.SITEMAP_MAX_DEPTH
+        self.max_bytes = config.SITEMAP_MAX_BYTES
+        self.max_sitemaps = 25
+        self.max_candidates = 20
+        self.timeout = 10
+        self.cache = JsonFileCache('sitemap_cache.json', ttl=config.SITEMAP_CACHE_TTL_HOURS * 3600)
+
+    def score_url(self, url: str) -> int:
+        """按路径中的关键词为URL评分，0表示不相关"""
+        path = urlparse(url).path.lower()
+        score = sum(SITEMAP_KEYWORD_WEIGHTS[match.lower()] for match in set(SITEMAP_KEYWORD_PATTERN.findall(path)))
+        # 路径越浅越可能是主要介绍页面
+        return score * 10 - path.count('/') if score else 0
+
+    def iter_candidates(self, base_url: str) -> Iterator[str]:
+        """按关键词得分从高到低逐个返回可能包含视频的页面URL（按域名缓存）"""
+        parsed = urlparse(base_url if '://' in base_url else f"https://{base_url}")
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+
+        candidates = self.cache.get(parsed.netloc)
+        if candidates is None:
+            candidates = self.collect_candidates(origin)
+            self.cache.set(parsed.netloc, candidates)
+
+        yield from candidates
+
+    def discover_sitemaps(self, origin: str) -> List[str]:
+        """robots.txt中声明的sitemap，加上默认位置"""
+        sitemaps = []
+        response = page_cache.get(f"{origin}/robots.txt", session=self.session, timeout=self.timeout)
+        if response is not None and response.status_code == 200:
+            sitemaps.extend(ROBOTS_SITEMAP_PATTERN.findall(response.text))
+
+        sitemaps.extend([f"{origin}/sitemap.xml", f"{origin}/sitemap_index.xml"])
+        return list(dict.fromkeys(sitemaps))
+
+    def collect_candidates(self, origin: str) -> List[str]:
+        """遍历站点的sitemap（含嵌套索引），返回得分最高的页面URL"""
+        heap = []
+        order = 0
+        budget = self.max_bytes
+        visited = set()
+        # (深度, sitemap URL)，同层中关键词得分高的子sitemap优先
+        queue = [(0, url) for url in self.discover_sitemaps(origin)]
+
+        while queue and budget > 0 and len(visited) < self.max_sitemaps:
+            depth, sitemap_url = queue.pop(0)
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+
+            children = []
+            usage = {'bytes': 0}
+            try:
+                for kind, loc in self._stream_locs(sitemap_url, budget, usage):
+                    if kind == 'sitemap':
+                        if depth < self.max_depth:
+                            children.append(loc)
+                        continue
+
+                    score = self.score_url(loc)
+                    if score <= 0:
+                        continue
+                    order += 1
+                    entry = (score, -order, loc)
+                    if len(heap) < self.max_candidates:
+                        heapq.heappush(heap, entry)
+                    elif entry > heap[0]:
+                        heapq.heapreplace(heap, entry)
+            except ByteBudgetExceeded:
+                logger.debug(f"sitemap字节预算已用尽: {sitemap_url}")
+            except Exception as e:
+                logger.debug(f"读取sitemap失败 {sitemap_url}: {e}")
+
+            budget -= usage['bytes']
+            children.sort(key=self.score_url, reverse=True)
+            queue.extend((depth + 1, child) for child in children)
+
+        candidates = [loc for _, _, loc in sorted(heap, reverse=True)]
+        logger.debug(f"sitemap候选页面: {len(candidates)} 个 ({origin}, 读取 {len(visited)} 个sitemap)")
+        return candidates
+
+    def _stream_locs(self, sitemap_url: str, budget: int, usage: dict):
+        """流式解析sitemap，逐个返回 (类型'url'或'sitemap', loc)；读取的字节数记录到usage"""
+        with self.session.get(sitemap_url, timeout=self.timeout, stream=True) as response:
+            if response.status_code != 200:
+                return
+
+            # 传输层压缩由urllib3解码，.gz文件本身再用gzip解压
+            response.raw.decode_content = True
+            stream = BudgetedStream(response.raw, budget)
+            source = stream
+            if sitemap_url.lower().endswith('.gz') or 'gzip' in response.headers.get('content-type', ''):
+                source = gzip.GzipFile(fileobj=stream)
+
+            try:
+                root = None
+                for event, element in ET.iterparse(source, events=('start', 'end')):
+                    if root is None:
+                        root = element
+                    if event != 'end':
+                        continue
+
+                    tag = element.tag.rsplit('}', 1)[-1]
+                    if tag in ('url', 'sitemap'):
+                        loc = next((child.text for child in element if child.tag.rsplit('}', 1)[-1] == 'loc'), None)
+                        if loc:
+                            yield tag, loc.strip()
+                        # 释放已处理的元素，保持内存占用恒定
+                        root.clear()
+            finally:
+                usage['bytes'] = stream.bytes_read
+
+# 全局实例
+sitemap_reader = SitemapReader()
@@ -0,0 +1,62 @@
+"""
+AI工具导入系统 - URL工具函数
+"""
+
+from urllib.parse import urlparse
+
+# 需要保留三级标签的公共后缀（国家二级域名和托管平台子域名）
+MULTI_LABEL_SUFFIXES = {
+    'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'me.uk',
+    'com.cn', 'net.cn', 'org.cn', 'gov.cn', 'edu.cn',
+    'com.au', 'net.au', 'org.au', 'co.nz', 'co.za',
+    'co.jp', 'ne.jp', 'or.jp', 'co.kr', 'co.in',
+    'com.br', 'com.tw', 'com.hk', 'com.sg', 'com.mx', 'com.tr',
+    'github.io', 'gitlab.io', 'vercel.app', 'netlify.app', 'pages.dev',
+    'herokuapp.com', 'web.app', 'firebaseapp.com', 'streamlit.app',
+    'hf.space', 'replit.app', 'notion.site', 'webflow.io', 'framer.website'
+}
+
+def ensure_scheme(url: str) -> str:
+    """补全URL协议前缀"""
+    url = (url or '').strip()
+    if url and not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return url
+
+def get_hostname(url: str) -> str:
+    """提取小写主机名（不含端口和www前缀）"""
+    hostname = (urlparse(ensure_scheme(url)).hostname or '').lower().rstrip('.')
+    return hostname[4:] if hostname.startswith('www.') else hostname
+
+def get_page_key(url: str) -> str:
+    """页面级缓存键：去掉www的主机名 + 去掉末尾斜杠的路径（忽略协议、查询参数和片段）"""
+    hostname = get_hostname(url)
+    if not hostname:
+        return ''
+    return f"{hostname}{urlparse(ensure_scheme(url)).path.rstrip('/')}"
+
+def get_registrable_domain(url: str) -> str:
+    """提取可注册域名，例如 chat.openai.com -> openai.com, foo.bar.co.uk -> bar.co.uk"""
+    hostname = get_hostname(url)
+    if not hostname:
+        return ''
+
+    labels = hostname.split('.')
+    # IP地址或单标签主机名直接返回
+    if len(labels) <= 2 or all(label.isdigit() for label in labels):
+        return hostname
+
+    if '.'.join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+def normalize_url(url: str) -> str:
+    """规范化URL用作缓存键：小写协议和主机、去除默认端口和片段、空路径补为/"""
+    parsed = urlparse(ensure_scheme(url))
+    scheme = parsed.scheme.lower()
+    netloc = (parsed.hostname or '').lower().rstrip('.')
+    if parsed.port and not (scheme == 'http' and parsed.port == 80 or scheme == 'https' and parsed.port == 443):
+        netloc = f"{netloc}:{parsed.port}"
+    path = parsed.path or '/'
+    query = f"?{parsed.query}" if parsed.query else ''
+    return f"{scheme}://{netloc}{path}{query}"
@@ -4,13 +4,158 @@ AI工具导入系统 - 真实视频URL获取助手
 专注于从AI工具网站提取真实的演示视频、产品介绍视频
 """
 
+import json
 import requests
 import re
-import time
-from bs4 import BeautifulSoup
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from bs4 import NavigableString, Tag
 from urllib.parse import urljoin, urlparse, parse_qs, urlunparse
 from config import config
 from logger import logger
+from json_cache import JsonFileCache, load_json_file
+from page_cache import page_cache
+from sitemap_reader import sitemap_reader
+from url_utils import ensure_scheme, get_hostname, get_page_key
+from html_utils import parse_html, RegionStrainer
+
+# 扩展的视频平台URL模式（视频ID使用命名分组）
+VIDEO_PATTERNS = {
+    'youtube': r'(?:https?:\/\/)?(?:www\.)?(?:youtube\.com\/(?:watch\?v=|embed\/|v\/)|youtu\.be\/)(?P<youtube_id>[a-zA-Z0-9_-]{11})',
+    'vimeo': r'(?:https?:\/\/)?(?:www\.)?vimeo\.com\/(?:video\/)?(?P<vimeo_id>\d+)',
+    'loom': r'(?:https?:\/\/)?(?:www\.)?loom\.com\/share\/(?P<loom_id>[a-zA-Z0-9-]+)',
+    'wistia': r'(?:https?:\/\/)?(?:[\w-]+\.)?wistia\.com\/(?:medias|embed)\/(?P<wistia_id>[a-zA-Z0-9]+)',
+    'streamable': r'(?:https?:\/\/)?streamable\.com\/(?P<streamable_id>[a-zA-Z0-9]+)',
+    'twitch': r'(?:https?:\/\/)?(?:www\.)?twitch\.tv\/videos\/(?P<twitch_id>\d+)',
+    'dailymotion': r'(?:https?:\/\/)?(?:www\.)?dailymotion\.com\/video\/(?P<dailymotion_id>[a-zA-Z0-9]+)',
+    'direct_video': r'https?:\/\/[^\s]+\.(?:mp4|webm|ogg|mov|avi|m4v)(?:\?[^\s]*)?'
+}
+
+# 所有平台合并为一个预编译正则（同一位置按上面的平台顺序匹配）
+VIDEO_URL_PATTERN = re.compile(
+    '|'.join(f"(?P<{platform}>{pattern})" for platform, pattern in VIDEO_PATTERNS.items()),
+    re.IGNORECASE
+)
+
+# 标准化为可嵌入格式的平台
+NORMALIZED_VIDEO_URLS = {
+    'youtube': 'https://www.youtube.com/watch?v={}',
+    'vimeo': 'https://vimeo.com/{}',
+    'loom': 'https://www.loom.com/share/{}'
+}
+
+# 高优先级视频区域（祖先元素的class -> 优先级，数字越小越优先）
+PRIORITY_CONTAINER_CLASSES = {
+    'hero': 0, 'banner': 1, 'intro': 2,
+    'demo': 3, 'product-demo': 4, 'showcase': 5
+}
+
+# 标记为主要视频的元素class和属性
+MAIN_VIDEO_CLASSES = {'main-video', 'primary-video', 'featured-video'}
+MAIN_VIDEO_ATTRIBUTES = ('data-main-video', 'data-featured-video')
+
+# 平台嵌入iframe的优先级
+PRIORITY_EMBEDS = (('youtube.com/embed', 7), ('vimeo.com/video', 8), ('loom.com/embed', 9))
+
+# data-*属性中的视频ID -> 视频URL
+DATA_VIDEO_ATTRIBUTES = {
+    'data-youtube-id': 'https://www.youtube.com/watch?v={}',
+    'data-vimeo-id': 'https://vimeo.com/{}'
+}
+
+# 网站视频搜索策略（默认执行顺序）-> 成功日志
+VIDEO_STRATEGIES = {
+    'homepage': '🎯 提取到真实视频',
+    'common_paths': '🎯 从视频页面提取到真实视频',
+    'sitemap': '🔍 从相关页面找到视频'
+}
+
+VIDEO_ELEMENTS = {'iframe', 'video', 'embed'}
+
+def is_video_region(attrs):
+    """排序需要的页面区域：高优先级容器、class含video的视频容器（保留其中的视频和关键词文本），以及带data-*视频属性的元素"""
+    classes = str(attrs.get('class') or '').lower().split()
+    return (any(name in PRIORITY_CONTAINER_CLASSES or 'video' in name for name in classes)
+            or any(attribute in attrs for attribute in DATA_VIDEO_ATTRIBUTES))
+
+# 视频提取只解析视频相关标签和排序需要的区域（ld+json脚本在扫描时按type筛选）
+VIDEO_STRAINER = RegionStrainer(['iframe', 'video', 'source', 'embed', 'script', 'link', 'meta'], is_video_region)
+SKIPPED_TEXT_PARENTS = {'script', 'style', 'noscript'}
+
+# 模糊匹配时忽略的通用词（避免"AI"等词造成误匹配）
+GENERIC_NAME_TOKENS = {'ai', 'app', 'apps', 'the', 'tool', 'tools', 'io', 'com', 'inc', 'labs', 'hq'}
+
+NAME_TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+class VerifiedVideoIndex:
+    """已验证视频索引：规范化名称精确匹配 + 词元Jaccard相似度模糊匹配"""
+    
+    def __init__(self, data_file, threshold=None):
+        self.threshold = config.VERIFIED_VIDEO_MATCH_THRESHOLD if threshold is None else threshold
+        self.videos = {}
+        self.exact_index = {}
+        self.token_index = {}
+        self.entry_tokens = {}
+        self.load(data_file)
+    
+    def _tokenize(self, name):
+        """名称拆分为小写词元"""
+        return NAME_TOKEN_PATTERN.findall(str(name or '').lower())
+    
+    def _canonical(self, tokens):
+        """规范化名称：去除空格和标点（Character.AI == Character AI）"""
+        return ''.join(tokens)
+    
+    def _significant_tokens(self, tokens):
+        """去除通用词后的词元集合（全部为通用词时保留原词元）"""
+        significant = {token for token in tokens if token not in GENERIC_NAME_TOKENS}
+        return significant or set(tokens)
+    
+    def load(self, data_file):
+        """从数据文件加载并构建索引"""
+        data = load_json_file(data_file, {}) or {}
+        for entry in data.get('videos', []):
+            if entry.get('name') and entry.get('url'):
+                self.add(entry['name'], entry['url'])
+        logger.debug(f"已验证视频索引: {len(self.videos)} 个工具")
+    
+    def add(self, name, url):
+        """添加一个已验证视频"""
+        tokens = self._tokenize(name)
+        if not tokens:
+            return
+        
+        self.videos[name] = url
+        self.exact_index[self._canonical(tokens)] = name
+        self.entry_tokens[name] = self._significant_tokens(tokens)
+        for token in self.entry_tokens[name]:
+            self.token_index.setdefault(token, set()).add(name)
+    
+    def lookup(self, product_name):
+        """查找工具视频，返回 (已验证工具名称, 视频URL, 匹配分数) 或None"""
+        tokens = self._tokenize(product_name)
+        if not tokens:
+            return None
+        
+        # 精确匹配
+        name = self.exact_index.get(self._canonical(tokens))
+        if name:
+            return name, self.videos[name], 1.0
+        
+        # 模糊匹配：只比较至少共享一个有效词元的条目
+        query_tokens = self._significant_tokens(tokens)
+        candidates = set()
+        for token in query_tokens:
+            candidates |= self.token_index.get(token, set())
+        
+        best = None
+        for name in candidates:
+            entry_tokens = self.entry_tokens[name]
+            score = len(query_tokens & entry_tokens) / len(query_tokens | entry_tokens)
+            if score >= self.threshold and (best is None or score > best[2]):
+                best = (name, self.videos[name], score)
+        
+        return best
 
 class VideoHelper:
     """真实视频URL获取助手"""
@@ -23,16 +168,17 @@ class VideoHelper:
         self.timeout = config.REQUEST_TIMEOUT
         
         # 扩展的视频平台URL模式
-        self.video_patterns = {
-            'youtube': r'(?:https?:\/\/)?(?:www\.)?(?:youtube\.com\/(?:watch\?v=|embed\/|v\/)|youtu\.be\/)([a-zA-Z0-9_-]{11})',
-            'vimeo': r'(?:https?:\/\/)?(?:www\.)?vimeo\.com\/(?:video\/)?(\d+)',
-            'loom': r'(?:https?:\/\/)?(?:www\.)?loom\.com\/share\/([a-zA-Z0-9-]+)',
-            'wistia': r'(?:https?:\/\/)?(?:[\w-]+\.)?wistia\.com\/(?:medias|embed)\/([a-zA-Z0-9]+)',
-            'streamable': r'(?:https?:\/\/)?streamable\.com\/([a-zA-Z0-9]+)',
-            'twitch': r'(?:https?:\/\/)?(?:www\.)?twitch\.tv\/videos\/(\d+)',
-            'dailymotion': r'(?:https?:\/\/)?(?:www\.)?dailymotion\.com\/video\/([a-zA-Z0-9]+)',
-            'direct_video': r'https?:\/\/[^\s]+\.(?:mp4|webm|ogg|mov|avi|m4v)(?:\?[^\s]*)?'
-        }
+        self.video_patterns = VIDEO_PATTERNS
+        
+        # 常见的视频页面路径（带/和不带/的变体由重定向处理，只检查一次）
+        self.common_video_paths = [
+            '/demo', '/demos', '/video', '/videos',
+            '/tutorial', '/tutorials', '/overview', '/introduction',
+            '/getting-started', '/how-it-works', '/product-tour'
+        ]
+        self.path_concurrency = config.VIDEO_PATH_CONCURRENCY
+        self.host_semaphores = {}
+        self.host_lock = threading.Lock()
         
         # 常见的视频相关关键词和选择器
         self.video_keywords = [
@@ -41,80 +187,23 @@ class VideoHelper:
             '演示', '教程', '介绍', '预览', '展示', '使用方法'
         ]
         
-        # 视频容器的CSS选择器
-        self.video_selectors = [
-            'iframe[src*="youtube"]', 'iframe[src*="vimeo"]', 'iframe[src*="loom"]',
-            'iframe[src*="wistia"]', 'video', 'embed[src*="youtube"]',
-            '.video-container', '.demo-video', '.product-video', '.hero-video',
-            '[data-video-id]', '[data-youtube-id]', '[data-vimeo-id]'
-        ]
-        
-        # 已验证的真实AI工具视频（定期更新）
-        self.verified_tool_videos = {
-            # === 主流聊天机器人 ===
-            'ChatGPT': 'https://www.youtube.com/watch?v=JTxsNm9IdYU',  # OpenAI官方介绍
-            'Claude': 'https://www.youtube.com/watch?v=3TDJQVo4s1c',   # Anthropic官方演示
-            'Bard': 'https://www.youtube.com/watch?v=yHp3jQriQpk',     # Google Bard演示
-            'Gemini': 'https://www.youtube.com/watch?v=UIZAiXYceBI',   # Google Gemini
-            'Character.AI': 'https://www.youtube.com/watch?v=DWuOW_v7o8Y', # Character AI
-            'Perplexity': 'https://www.youtube.com/watch?v=aF4eJhcD9E8', # Perplexity AI搜索
-            
-            # === 图像生成工具 ===
-            'Midjourney': 'https://www.youtube.com/watch?v=9XKNDdWWJDk', # 官方教程
-            'DALL-E': 'https://www.youtube.com/watch?v=qTgPSKKjfVg',   # OpenAI DALL-E 2演示
-            'DALL-E 2': 'https://www.youtube.com/watch?v=qTgPSKKjfVg', # OpenAI DALL-E 2演示
-            'DALL-E 3': 'https://www.youtube.com/watch?v=3BBLpSj8jjY', # DALL-E 3演示
-            'Stable Diffusion': 'https://www.youtube.com/watch?v=1CIpzeNxIhU', # 官方介绍
-            'Leonardo AI': 'https://www.youtube.com/watch?v=3dGQf2H6RN8', # Leonardo AI教程
-            'Adobe Firefly': 'https://www.youtube.com/watch?v=0gNauWdOw6Q', # Adobe官方
-            'SeaArt': 'https://www.youtube.com/watch?v=kZZi9__p9bM',    # SeaArt演示
-            'Artbreeder': 'https://www.youtube.com/watch?v=u45rP8Ilzfw', # Artbreeder介绍
-            
-            # === 视频生成工具 ===
-            'Runway ML': 'https://www.youtube.com/watch?v=5U8bMQT8ib4',  # RunwayML演示
-            'Pika Labs': 'https://www.youtube.com/watch?v=T_0LFgJKDhA',  # Pika Labs演示
-            'Synthesia': 'https://www.youtube.com/watch?v=8REp1-QO23A',  # Synthesia演示
-            'D-ID': 'https://www.youtube.com/watch?v=R6_JcGRROUo',       # D-ID视频生成
-            
-            # === 写作助手 ===
-            'Jasper': 'https://www.youtube.com/watch?v=VYJtb2YXae8',     # Jasper AI演示
-            'Copy.ai': 'https://www.youtube.com/watch?v=R7XfQvP9Sjk',    # Copy.ai演示
-            'Writesonic': 'https://www.youtube.com/watch?v=q_VsNlYYlmo',  # Writesonic演示
-            'Grammarly': 'https://www.youtube.com/watch?v=qQhiJyWIHTk',   # Grammarly AI功能
-            'Notion AI': 'https://www.youtube.com/watch?v=57Gt1cMWCWk',  # Notion官方
-            'QuillBot': 'https://www.youtube.com/watch?v=t1JVzOVPn9c',   # QuillBot演示
-            
-            # === 代码助手 ===
-            'GitHub Copilot': 'https://www.youtube.com/watch?v=DSHfHT5qnGc', # GitHub官方
-            'CodeWhisperer': 'https://www.youtube.com/watch?v=rQ8wYcUu-B8', # AWS CodeWhisperer
-            'Tabnine': 'https://www.youtube.com/watch?v=TKLkXh_c-Gw',    # Tabnine演示
-            'Codeium': 'https://www.youtube.com/watch?v=lR-0mN0JZo0',    # Codeium演示
-            
-            # === 演示文稿工具 ===
-            'Gamma': 'https://www.youtube.com/watch?v=7OUZ5bZb9P8',      # Gamma演示
-            'Beautiful.AI': 'https://www.youtube.com/watch?v=QHSyA0V4nAE', # Beautiful.AI
-            'Tome': 'https://www.youtube.com/watch?v=lzaODUqSgFc',       # Tome演示
-            
-            # === 设计工具 ===
-            'Canva AI': 'https://www.youtube.com/watch?v=TGXAtGgp7as',   # Canva AI功能
-            'Figma AI': 'https://www.youtube.com/watch?v=HZuk6Wkx_Eg',   # Figma AI功能
-            'Framer AI': 'https://www.youtube.com/watch?v=9gJI_bQ1HQU',  # Framer AI
-            
-            # === 音频/音乐工具 ===
-            'ElevenLabs': 'https://www.youtube.com/watch?v=TQTlCHxyuu8',  # ElevenLabs语音
-            'Murf': 'https://www.youtube.com/watch?v=2O5RDBJhVzA',       # Murf AI配音
-            'AIVA': 'https://www.youtube.com/watch?v=M1eNoOTdRhE',       # AIVA音乐生成
-            'Suno AI': 'https://www.youtube.com/watch?v=xmQWCvGMH0Y',    # Suno AI音乐
-            
-            # === 搜索引擎 ===
-            'Bing Chat': 'https://www.youtube.com/watch?v=SGUCcjHTmGY',  # New Bing演示
-            'You.com': 'https://www.youtube.com/watch?v=JUhN8_pW-YY',    # You.com AI搜索
-            
-            # === 其他工具 ===
-            'Luma AI': 'https://www.youtube.com/watch?v=5ysAHcJ5FKg',    # Luma AI 3D扫描
-            'Descript': 'https://www.youtube.com/watch?v=Bl_Vau09-gw',   # Descript音频编辑
-            'Loom AI': 'https://www.youtube.com/watch?v=J4y50Bg0YXg',    # Loom AI功能
+        # 关键词合并为一个正则，记录每个关键词的优先级
+        self.keyword_pattern = re.compile('|'.join(re.escape(keyword) for keyword in self.video_keywords), re.IGNORECASE)
+        self.keyword_priority = {keyword.lower(): i for i, keyword in enumerate(self.video_keywords)}
+        
+        # 按产品页面（主机名+路径）持久化的视频搜索结果：同一主机下的不同产品各自搜索
+        self.outcome_cache = JsonFileCache('video_page_outcomes.json')
+        # 按主机共享上次成功的搜索策略（不过期），同主机的其他产品优先尝试
+        self.strategy_cache = JsonFileCache('video_host_strategies.json')
+        self.outcome_ttls = {
+            'found': config.VIDEO_OUTCOME_TTL_DAYS * 86400,
+            'not_found': config.VIDEO_NEGATIVE_TTL_HOURS * 3600,
+            'error': config.VIDEO_ERROR_TTL_HOURS * 3600
         }
+        
+        # 已验证的真实AI工具视频（从数据文件加载，定期更新）
+        self.verified_index = VerifiedVideoIndex(config.VERIFIED_VIDEOS_FILE)
+        self.verified_tool_videos = self.verified_index.videos
     
     def enhance_tool_with_video(self, tool_data):
         """为工具数据添加真实的演示视频URL"""
@@ -138,77 +227,108 @@ class VideoHelper:
             logger.success(f"✅ 使用已验证视频: {verified_video}")
             return tool_data
         
-        # 策略2: 深度提取网站真实视频
-        real_video = self.deep_extract_real_video(product_url, product_name)
-        if real_video:
-            tool_data['demo_video_url'] = real_video
-            logger.success(f"🎯 提取到真实视频: {real_video}")
+        # 策略2-4: 网站提取（按产品页面缓存结果，本主机上次成功的策略优先）
+        page_key = get_page_key(product_url)
+        host = get_hostname(product_url)
+        outcome = self.get_cached_outcome(page_key)
+        if outcome and outcome['status'] == 'found':
+            tool_data['demo_video_url'] = outcome['video_url']
+            logger.success(f"♻️ 使用缓存的视频: {outcome['video_url']}")
             return tool_data
-        
-        # 策略3: 搜索相关页面的视频
-        related_video = self.search_related_pages_for_video(product_url, product_name)
-        if related_video:
-            tool_data['demo_video_url'] = related_video
-            logger.success(f"🔍 从相关页面找到视频: {related_video}")
+        if outcome:
+            tool_data['demo_video_url'] = ''
+            logger.debug(f"跳过视频搜索（缓存结果: {outcome['status']}）: {product_name}")
             return tool_data
         
+        strategies = list(VIDEO_STRATEGIES)
+        previous_strategy = self.strategy_cache.get(host) if host else None
+        if previous_strategy in strategies:
+            strategies.remove(previous_strategy)
+            strategies.insert(0, previous_strategy)
+        
+        for strategy in strategies:
+            video_url = self._run_video_strategy(strategy, product_url, product_name)
+            if video_url:
+                tool_data['demo_video_url'] = video_url
+                logger.success(f"{VIDEO_STRATEGIES[strategy]}: {video_url}")
+                self.record_outcome(page_key, 'found', video_url)
+                if host:
+                    self.strategy_cache.set(host, strategy)
+                return tool_data
+        
         # 如果都没找到，不使用默认视频，保持为空
         tool_data['demo_video_url'] = ''
         logger.warning(f"❌ 未找到真实视频: {product_name} - 将尝试其他方式获取")
         
+        homepage = page_cache.get(ensure_scheme(product_url), session=self.session, timeout=self.timeout)
+        status = 'error' if homepage is None or homepage.status_code >= 500 else 'not_found'
+        self.record_outcome(page_key, status)
+        
         return tool_data
     
+    def _run_video_strategy(self, strategy, product_url, product_name):
+        """执行单个视频搜索策略"""
+        if strategy == 'homepage':
+            return self.extract_homepage_video(product_url)
+        if strategy == 'common_paths':
+            return self.check_common_video_paths(ensure_scheme(product_url))
+        return self.search_related_pages_for_video(product_url, product_name)
+    
+    def get_cached_outcome(self, page_key):
+        """获取未过期的产品页面视频搜索结果"""
+        return self.outcome_cache.get(page_key) if page_key else None
+    
+    def record_outcome(self, page_key, status, video_url=''):
+        """记录产品页面视频搜索结果（found/not_found/error，各自有不同的有效期）"""
+        if not page_key:
+            return
+        
+        self.outcome_cache.set(page_key, {'status': status, 'video_url': video_url}, ttl=self.outcome_ttls[status])
+    
     def get_verified_tool_video(self, product_name):
         """获取已验证的真实工具视频"""
-        product_lower = product_name.lower()
-        
-        # 精确匹配
-        for tool_name, video_url in self.verified_tool_videos.items():
-            if tool_name.lower() == product_lower:
-                return video_url
-        
-        # 模糊匹配
-        for tool_name, video_url in self.verified_tool_videos.items():
-            if tool_name.lower() in product_lower or product_lower in tool_name.lower():
-                logger.debug(f"模糊匹配到已验证视频: {tool_name}")
-                return video_url
+        match = self.verified_index.lookup(product_name)
+        if not match:
+            return None
         
-        return None
+        tool_name, video_url, score = match
+        if score < 1.0:
+            logger.debug(f"模糊匹配到已验证视频: {tool_name} (相似度 {score:.2f})")
+        return video_url
     
     def deep_extract_real_video(self, url, tool_name):
         """深度提取网站的真实演示视频"""
+        # 标准化URL
+        url = ensure_scheme(url)
+        
+        video_url = self.extract_homepage_video(url)
+        if video_url:
+            return video_url
+        
+        # 方法4: 检查特定的视频页面路径
+        return self.check_common_video_paths(url)
+    
+    def extract_homepage_video(self, url):
+        """从网站首页提取视频"""
         try:
-            # 标准化URL
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-            
+            url = ensure_scheme(url)
             logger.debug(f"🔎 深度分析网站: {url}")
             
             # 获取网页内容
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 方法1: 查找高优先级的视频元素
-            video_url = self.find_priority_videos(soup, url)
-            if video_url:
-                return video_url
+            response = page_cache.get(url, session=self.session, timeout=self.timeout)
+            if response is None or response.status_code != 200:
+                return None
             
-            # 方法2: 分析JSON-LD结构化数据中的视频
-            video_url = self.extract_video_from_jsonld(soup)
-            if video_url:
-                return video_url
-            
-            # 方法3: 查找带有演示/介绍关键词的视频
-            video_url = self.find_demo_videos_by_context(soup, url)
-            if video_url:
-                return video_url
+            # 单次遍历收集视频元素、JSON-LD和关键词上下文
+            candidates = self.scan_page_videos(response.content, url)
             
-            # 方法4: 检查特定的视频页面路径
-            video_url = self.check_common_video_paths(url)
-            if video_url:
-                return video_url
+            # 方法1: 高优先级的视频元素
+            # 方法2: JSON-LD结构化数据中的视频
+            # 方法3: 带有演示/介绍关键词的视频
+            for group in ('priority', 'jsonld', 'context'):
+                if candidates[group]:
+                    logger.debug(f"视频候选来源: {group}")
+                    return candidates[group][0]
             
             return None
             
@@ -216,57 +336,111 @@ class VideoHelper:
             logger.debug(f"深度视频提取失败 {url}: {e}")
             return None
     
-    def find_priority_videos(self, soup, base_url):
-        """查找高优先级的视频元素"""
-        # 按优先级顺序查找视频
-        priority_selectors = [
-            # 首页英雄区域的视频
-            '.hero video, .hero iframe',
-            '.banner video, .banner iframe',
-            '.intro video, .intro iframe',
-            
-            # 产品演示区域
-            '.demo video, .demo iframe',
-            '.product-demo video, .product-demo iframe',
-            '.showcase video, .showcase iframe',
-            
-            # 标记为主要视频的元素
-            '.main-video, .primary-video, .featured-video',
-            '[data-main-video], [data-featured-video]',
-            
-            # YouTube/Vimeo嵌入
-            'iframe[src*="youtube.com/embed"]',
-            'iframe[src*="vimeo.com/video"]',
-            'iframe[src*="loom.com/embed"]',
-        ]
-        
-        for selector in priority_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                video_url = self.extract_video_url_from_element(element, base_url)
+    def scan_page_videos(self, content, base_url):
+        """
+        解析一次页面：只构建视频相关标签和排序需要的区域（高优先级容器、视频容器连同其中的文本），
+        区域优先级和关键词上下文在保留的区域内计算
+        """
+        return self.scan_video_candidates(parse_html(content, VIDEO_STRAINER), base_url)
+    
+    def scan_video_candidates(self, soup, base_url):
+        """
+        单次遍历DOM，同时收集视频元素、JSON-LD视频和关键词上下文
+        返回按优先级排序的候选URL: {'priority': [...], 'jsonld': [...], 'context': [...], 'elements': [...]}
+        """
+        elements = []
+        jsonld_videos = []
+        # 关键词文本节点向上3层的容器 -> (关键词优先级, 文本顺序, 层级)，越小越优先
+        context_containers = {}
+        text_order = 0
+        
+        for node in soup.descendants:
+            if isinstance(node, Tag):
+                if node.name == 'script':
+                    if node.get('type') == 'application/ld+json' and node.string:
+                        video_url = self._parse_jsonld_video(node.string)
+                        if video_url:
+                            jsonld_videos.append(video_url)
+                    continue
+                
+                video_url = self.extract_video_url_from_element(node, base_url)
                 if video_url:
-                    logger.debug(f"高优先级视频元素找到: {selector}")
-                    return video_url
-        
-        return None
+                    elements.append((node, video_url))
+            
+            elif type(node) is NavigableString and node.parent is not None and node.parent.name not in SKIPPED_TEXT_PARENTS:
+                priority = self._keyword_priority(node)
+                if priority is None:
+                    continue
+                text_order += 1
+                container = node.parent
+                for level in range(3):  # 最多向上查找3层
+                    if container is None:
+                        break
+                    rank = (priority, text_order, level)
+                    if id(container) not in context_containers or rank < context_containers[id(container)]:
+                        context_containers[id(container)] = rank
+                    container = container.parent
+        
+        priority_videos = []
+        context_videos = []
+        for order, (element, video_url) in enumerate(elements):
+            priority, keyword_priority = self._rank_video_element(element, context_containers)
+            if priority is not None:
+                priority_videos.append((priority, order, video_url))
+            if keyword_priority is not None:
+                context_videos.append((keyword_priority, order, video_url))
+        
+        return {
+            'priority': [video_url for _, _, video_url in sorted(priority_videos)],
+            'jsonld': jsonld_videos,
+            'context': [video_url for _, _, video_url in sorted(context_videos)],
+            'elements': [video_url for _, video_url in elements]
+        }
     
-    def extract_video_from_jsonld(self, soup):
-        """从JSON-LD结构化数据提取视频"""
+    def _keyword_priority(self, text):
+        """文本中出现的最高优先级关键词，未出现返回None"""
+        matches = self.keyword_pattern.findall(text)
+        if not matches:
+            return None
+        return min(self.keyword_priority[match.lower()] for match in matches)
+    
+    def _rank_video_element(self, element, context_containers):
+        """沿祖先链一次性计算元素的区域优先级和关键词上下文优先级"""
+        priority = None
+        keyword_priority = None
+        
+        if element.name in VIDEO_ELEMENTS:
+            classes = set(element.get('class') or [])
+            if classes & MAIN_VIDEO_CLASSES or any(element.has_attr(attr) for attr in MAIN_VIDEO_ATTRIBUTES):
+                priority = 6
+            if element.name == 'iframe':
+                src = element.get('src', '')
+                for fragment, embed_priority in PRIORITY_EMBEDS:
+                    if fragment in src and (priority is None or embed_priority < priority):
+                        priority = embed_priority
+        
+        container = element
+        while container is not None:
+            if id(container) in context_containers:
+                container_priority = context_containers[id(container)]
+                if keyword_priority is None or container_priority < keyword_priority:
+                    keyword_priority = container_priority
+            if container is not element and element.name in ('iframe', 'video'):
+                for class_name in container.get('class') or []:
+                    class_priority = PRIORITY_CONTAINER_CLASSES.get(class_name)
+                    if class_priority is not None and (priority is None or class_priority < priority):
+                        priority = class_priority
+            container = container.parent
+        
+        return priority, keyword_priority
+    
+    def _parse_jsonld_video(self, text):
+        """解析JSON-LD脚本并查找视频"""
         try:
-            scripts = soup.find_all('script', type='application/ld+json')
-            for script in scripts:
-                if script.string:
-                    import json
-                    data = json.loads(script.string)
-                    
-                    # 递归查找视频URL
-                    video_url = self.find_video_in_jsonld(data)
-                    if video_url:
-                        return video_url
+            return self.find_video_in_jsonld(json.loads(text))
         except Exception as e:
             logger.debug(f"JSON-LD视频提取失败: {e}")
-        
-        return None
+            return None
     
     def find_video_in_jsonld(self, data):
         """在JSON-LD数据中递归查找视频"""
@@ -292,98 +466,69 @@ class VideoHelper:
         
         return None
     
-    def find_demo_videos_by_context(self, soup, base_url):
-        """通过上下文关键词查找演示视频"""
-        # 查找包含演示关键词的区域
-        for keyword in self.video_keywords:
-            # 查找标题或文本包含关键词的容器
-            containers = soup.find_all(text=re.compile(keyword, re.IGNORECASE))
-            
-            for text_node in containers:
-                # 向上查找包含该文本的容器元素
-                container = text_node.parent
-                for _ in range(3):  # 最多向上查找3层
-                    if container:
-                        # 在容器中查找视频
-                        video_elements = container.find_all(['iframe', 'video', 'embed'])
-                        for element in video_elements:
-                            video_url = self.extract_video_url_from_element(element, base_url)
-                            if video_url:
-                                logger.debug(f"通过关键词'{keyword}'找到视频")
-                                return video_url
-                        container = container.parent
-                    else:
-                        break
-        
-        return None
-    
     def check_common_video_paths(self, base_url):
-        """检查常见的视频页面路径"""
+        """并发检查常见的视频页面路径（同一主机限制并发数），找到视频后取消其余请求"""
         parsed = urlparse(base_url)
-        common_paths = [
-            '/demo', '/demo/', '/demos', '/demos/',
-            '/video', '/video/', '/videos', '/videos/',
-            '/tutorial', '/tutorial/', '/tutorials', '/tutorials/',
-            '/overview', '/overview/', '/introduction', '/introduction/',
-            '/getting-started', '/how-it-works', '/product-tour'
-        ]
-        
-        for path in common_paths:
-            try:
-                video_page_url = f"{parsed.scheme}://{parsed.netloc}{path}"
-                logger.debug(f"检查视频页面: {video_page_url}")
-                
-                response = self.session.get(video_page_url, timeout=10)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # 在这些页面中查找视频
-                    video_elements = soup.find_all(['iframe', 'video'])
-                    for element in video_elements:
-                        video_url = self.extract_video_url_from_element(element, video_page_url)
-                        if video_url:
-                            logger.debug(f"在路径{path}找到视频")
-                            return video_url
-                
-                # 避免过于频繁的请求
-                time.sleep(1)
-                
-            except Exception:
-                continue
-        
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        host_semaphore = self._get_host_semaphore(parsed.netloc)
+        found = threading.Event()
+
+        def probe(path):
+            if found.is_set():
+                return None
+            with host_semaphore:
+                if found.is_set():
+                    return None
+                return self._probe_video_path(f"{origin}{path}")
+
+        executor = ThreadPoolExecutor(max_workers=self.path_concurrency)
+        try:
+            futures = {executor.submit(probe, path): path for path in self.common_video_paths}
+            for future in as_completed(futures):
+                video_url = future.result()
+                if video_url:
+                    found.set()
+                    logger.debug(f"在路径{futures[future]}找到视频")
+                    return video_url
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
         return None
-    
+
+    def _get_host_semaphore(self, host):
+        """获取主机级并发限制（礼貌抓取）"""
+        with self.host_lock:
+            if host not in self.host_semaphores:
+                self.host_semaphores[host] = threading.BoundedSemaphore(self.path_concurrency)
+            return self.host_semaphores[host]
+
+    def _probe_video_path(self, video_page_url):
+        """
+        先用HEAD排除不存在（404/410）或非HTML的页面，再GET解析其中的视频
+        很多CDN和WAF对HEAD返回403/400/501等状态而GET正常，这些状态仍继续GET
+        """
+        logger.debug(f"检查视频页面: {video_page_url}")
+
+        response = page_cache.head(video_page_url, session=self.session, timeout=10)
+        if response is None or response.status_code in (404, 410):
+            return None
+
+        content_type = response.headers.get('content-type', '')
+        if response.status_code == 200 and content_type and 'html' not in content_type.lower():
+            return None
+
+        return self.extract_video_from_page(video_page_url)
+
     def search_related_pages_for_video(self, base_url, tool_name):
         """搜索相关页面的视频"""
         try:
-            parsed = urlparse(base_url)
-            
-            # 尝试从sitemap找到视频页面
-            sitemap_urls = [
-                f"{parsed.scheme}://{parsed.netloc}/sitemap.xml",
-                f"{parsed.scheme}://{parsed.netloc}/sitemap_index.xml",
-                f"{parsed.scheme}://{parsed.netloc}/robots.txt"
-            ]
-            
-            for sitemap_url in sitemap_urls:
-                try:
-                    response = self.session.get(sitemap_url, timeout=10)
-                    if response.status_code == 200:
-                        # 查找可能包含视频的页面URL
-                        video_page_urls = re.findall(
-                            r'https?://[^\s<>"]+(?:demo|video|tutorial|overview|introduction)[^\s<>"]*',
-                            response.text,
-                            re.IGNORECASE
-                        )
-                        
-                        for url in video_page_urls[:3]:  # 限制检查数量
-                            video_url = self.extract_video_from_page(url)
-                            if video_url:
-                                return video_url
-                        
-                        break  # 找到sitemap就不继续了
-                except Exception:
-                    continue
+            # 从sitemap找到视频页面（按关键词得分从高到低）
+            for checked, url in enumerate(sitemap_reader.iter_candidates(base_url)):
+                if checked >= 3:  # 限制检查数量
+                    break
+                video_url = self.extract_video_from_page(url)
+                if video_url:
+                    return video_url
             
         except Exception as e:
             logger.debug(f"搜索相关页面失败: {e}")
@@ -393,16 +538,12 @@ class VideoHelper:
     def extract_video_from_page(self, url):
         """从指定页面提取视频"""
         try:
-            response = self.session.get(url, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # 查找视频元素
-                video_elements = soup.find_all(['iframe', 'video'])
-                for element in video_elements:
-                    video_url = self.extract_video_url_from_element(element, url)
-                    if video_url:
-                        return video_url
+            response = page_cache.get(url, session=self.session, timeout=10)
+            if response is not None and response.status_code == 200:
+                # 查找视频元素（无需优先级排序，只解析视频相关标签）
+                candidates = self.scan_page_videos(response.content, url)
+                if candidates['elements']:
+                    return candidates['elements'][0]
         except Exception:
             pass
         
@@ -439,6 +580,13 @@ class VideoHelper:
                 if self.is_video_url(full_url):
                     return self.normalize_video_url(full_url)
         
+        else:
+            # data-*属性中的视频ID
+            for attribute, template in DATA_VIDEO_ATTRIBUTES.items():
+                video_id = element.get(attribute)
+                if video_id:
+                    return template.format(video_id)
+        
         return None
     
     def is_video_url(self, url):
@@ -446,35 +594,17 @@ class VideoHelper:
         if not url:
             return False
         
-        # 检查各种视频平台
-        for platform, pattern in self.video_patterns.items():
-            if re.search(pattern, url, re.IGNORECASE):
-                return True
-        
-        return False
+        return VIDEO_URL_PATTERN.search(url) is not None
     
     def normalize_video_url(self, url):
         """标准化视频URL为可嵌入的格式"""
         if not url:
             return ""
         
-        # YouTube URL标准化 - 转换为watch格式便于前端处理
-        youtube_match = re.search(self.video_patterns['youtube'], url)
-        if youtube_match:
-            video_id = youtube_match.group(1)
-            return f"https://www.youtube.com/watch?v={video_id}"
-        
-        # Vimeo URL标准化
-        vimeo_match = re.search(self.video_patterns['vimeo'], url)
-        if vimeo_match:
-            video_id = vimeo_match.group(1)
-            return f"https://vimeo.com/{video_id}"
-        
-        # Loom URL标准化
-        loom_match = re.search(self.video_patterns['loom'], url)
-        if loom_match:
-            video_id = loom_match.group(1)
-            return f"https://www.loom.com/share/{video_id}"
+        # YouTube转换为watch格式便于前端处理，Vimeo和Loom转换为标准分享链接
+        match = VIDEO_URL_PATTERN.search(url)
+        if match and match.lastgroup in NORMALIZED_VIDEO_URLS:
+            return NORMALIZED_VIDEO_URLS[match.lastgroup].format(match.group(f"{match.lastgroup}_id"))
         
         # 其他平台保持原样
         return url
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+AI工具导入系统 - 视频链接批量验证器
+通过YouTube、Vimeo和Loom的oEmbed接口并发验证视频链接，按视频ID缓存标题、缩略图和可用状态，标记失效链接
+"""
+
+import argparse
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+import requests
+from config import config
+from logger import logger
+from json_cache import JsonFileCache, load_json_file
+from video_helper import VIDEO_URL_PATTERN, NORMALIZED_VIDEO_URLS
+
+# 各平台的oEmbed接口
+OEMBED_ENDPOINTS = {
+    'youtube': 'https://www.youtube.com/oembed',
+    'vimeo': 'https://vimeo.com/api/oembed.json',
+    'loom': 'https://www.loom.com/v1/oembed'
+}
+
+# oEmbed状态码 -> 验证状态（其余状态码和网络错误视为error，不缓存）
+OEMBED_STATUS = {
+    200: 'ok',
+    401: 'restricted',  # 私有视频或禁止嵌入
+    403: 'restricted',
+    404: 'dead'
+}
+
+class VideoValidator:
+    """视频链接批量验证器"""
+
+    def __init__(self, endpoints: Optional[Dict[str, str]] = None, max_workers: Optional[int] = None):
+        stub_url = config.VIDEO_OEMBED_STUB_URL.rstrip('/')
+        if endpoints is None and stub_url:
+            # 测试时使用本地桩服务: {stub_url}/{platform}
+            endpoints = {platform: f"{stub_url}/{platform}" for platform in OEMBED_ENDPOINTS}
+
+        self.endpoints = endpoints or dict(OEMBED_ENDPOINTS)
+        self.max_workers = max_workers or config.VIDEO_VALIDATION_WORKERS
+        self.timeout = 10
+        self.cache = JsonFileCache('video_validation.json', ttl=config.VIDEO_VALIDATION_TTL_DAYS * 86400)
+        self.local = threading.local()
+
+    def _get_session(self) -> requests.Session:
+        """每个工作线程复用一个会话"""
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def parse_video(self, url: str):
+        """解析视频平台和ID，不支持oEmbed的链接返回None"""
+        match = VIDEO_URL_PATTERN.search(url or '')
+        if not match or match.lastgroup not in self.endpoints:
+            return None
+        return match.lastgroup, match.group(f"{match.lastgroup}_id")
+
+    def check_video(self, platform: str, video_id: str, refresh: bool = False) -> Dict:
+        """通过oEmbed检查单个视频（优先使用缓存）"""
+        cache_key = f"{platform}:{video_id}"
+        if not refresh:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        video_url = NORMALIZED_VIDEO_URLS[platform].format(video_id)
+        try:
+            response = self._get_session().get(
+                self.endpoints[platform],
+                params={'url': video_url, 'format': 'json'},
+                timeout=self.timeout
+            )
+            status = OEMBED_STATUS.get(response.status_code, 'error')
+            result = {'status': status, 'status_code': response.status_code, 'url': video_url}
+            if status == 'ok':
+                data = response.json()
+                result.update({
+                    'title': data.get('title', ''),
+                    'thumbnail_url': data.get('thumbnail_url', ''),
+                    'author_name': data.get('author_name', '')
+                })
+        except Exception as e:
+            logger.debug(f"oEmbed请求失败 {video_url}: {e}")
+            result = {'status': 'error', 'status_code': None, 'url': video_url}
+
+        if result['status'] != 'error':
+            self.cache.set(cache_key, result)
+        return result
+
+    def validate_urls(self, urls: Iterable[str], refresh: bool = False) -> Dict[str, Dict]:
+        """并发验证一批视频链接（同一视频只请求一次），返回 {URL: 验证结果}"""
+        urls = [url for url in dict.fromkeys(urls) if url]
+        videos = {}
+        results = {}
+
+        for url in urls:
+            parsed = self.parse_video(url)
+            if parsed:
+                videos.setdefault(parsed, []).append(url)
+            else:
+                results[url] = {'status': 'unsupported', 'url': url}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            checks = {video: executor.submit(self.check_video, *video, refresh) for video in videos}
+            for video, future in checks.items():
+                for url in videos[video]:
+                    results[url] = future.result()
+
+        dead_count = sum(1 for result in results.values() if result['status'] == 'dead')
+        logger.info(f"视频验证完成: {len(videos)} 个视频, {dead_count} 个失效")
+        return results
+
+    def validate_tools(self, tools: list, refresh: bool = False) -> Dict[str, Dict]:
+        """验证工具的demo_video_url，并把验证状态写入demo_video_status字段"""
+        results = self.validate_urls((tool.get('demo_video_url') for tool in tools), refresh)
+        for tool in tools:
+            result = results.get(tool.get('demo_video_url'))
+            if result:
+                tool['demo_video_status'] = result['status']
+        return results
+
+# 全局实例
+video_validator = VideoValidator()
+
+def main():
+    """批量验证工具数据和已验证视频列表中的视频链接"""
+    parser = argparse.ArgumentParser(description='通过oEmbed批量验证视频链接')
+    parser.add_argument('input_file', nargs='?', default=config.OUTPUT_JSON_FILE, help='工具数据JSON文件')
+    parser.add_argument('--verified', action='store_true', help='同时验证已验证视频列表')
+    parser.add_argument('--refresh', action='store_true', help='忽略缓存重新验证')
+    parser.add_argument('--update', action='store_true', help='把验证状态写回工具数据文件 (demo_video_status)')
+    parser.add_argument('--workers', type=int, default=config.VIDEO_VALIDATION_WORKERS, help='并发请求数')
+    parser.add_argument('--stub', default=config.VIDEO_OEMBED_STUB_URL, help='本地oEmbed桩服务地址（测试用）')
+    args = parser.parse_args()
+
+    endpoints = {platform: f"{args.stub.rstrip('/')}/{platform}" for platform in OEMBED_ENDPOINTS} if args.stub else None
+    validator = VideoValidator(endpoints=endpoints, max_workers=args.workers)
+
+    tools = load_json_file(args.input_file, []) or []
+    results = validator.validate_tools(tools, args.refresh)
+
+    if args.verified:
+        verified = load_json_file(config.VERIFIED_VIDEOS_FILE, {}) or {}
+        verified_urls = {entry['url']: entry['name'] for entry in verified.get('videos', []) if entry.get('url')}
+        for url, result in validator.validate_urls(verified_urls, args.refresh).items():
+            if result['status'] in ('dead', 'restricted'):
+                print(f"已验证视频失效 [{result['status']}]: {verified_urls[url]} - {url}")
+
+    for tool in tools:
+        result = results.get(tool.get('demo_video_url'))
+        if result and result['status'] in ('dead', 'restricted'):
+            print(f"失效视频 [{result['status']}]: {tool.get('product_name', 'Unknown')} - {tool['demo_video_url']}")
+
+    if args.update:
+        with open(args.input_file, 'w', encoding='utf-8') as f:
+            json.dump(tools, f, ensure_ascii=False, indent=2)
+        print(f"已更新 {len(tools)} 个工具的视频状态: {args.input_file}")
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ class AIToolImportAPI_MVP {
     public function __construct() {
         add_action('rest_api_init', array($this, 'register_routes'));
         add_action('rest_api_init', array($this, 'add_cors_support'));
+        add_action('init', array($this, 'register_meta_fields'));
         add_action('admin_menu', array($this, 'add_admin_menu'));
         add_action('admin_enqueue_scripts', array($this, 'enqueue_admin_scripts'));
         add_action('wp_ajax_ai_tools_generate_api_key', array($this, 'ajax_generate_api_key'));
@@ -112,6 +113,40 @@ class AIToolImportAPI_MVP {
         return $response;
     }
     
+    /**
+     * 注册可通过REST API读写的文章meta
+     * 导入器按 _fields=id,title,type,meta 预加载文章，用source_url匹配已有工具；
+     * 6个JSON字段随文章一次写入，并从写入响应的meta中确认是否保存成功；
+     * content_hash/group_hashes记录上次导入的内容哈希，未变化的工具不再重复写入
+     */
+    public function register_meta_fields() {
+        $meta_fields = array(
+            'source_url' => 'esc_url_raw',
+            'basic_info' => null,
+            'media_data' => null,
+            'ratings_data' => null,
+            'ui_text_data' => null,
+            'features_data' => null,
+            'complex_data' => null,
+            'content_hash' => 'sanitize_text_field',
+            'group_hashes' => null
+        );
+        
+        foreach (array('aihub', 'post') as $post_type) {
+            foreach ($meta_fields as $meta_key => $sanitize_callback) {
+                register_post_meta($post_type, $meta_key, array(
+                    'type' => 'string',
+                    'single' => true,
+                    'show_in_rest' => true,
+                    'sanitize_callback' => $sanitize_callback,
+                    'auth_callback' => function() {
+                        return current_user_can('edit_posts');
+                    }
+                ));
+            }
+        }
+    }
+    
     /**
      * 注册API路由
      */
@@ -199,6 +234,16 @@ class AIToolImportAPI_MVP {
             )
         ));
 
+        // 批量导入端点 - 一个请求导入多个工具
+        register_rest_route('ai-tools/v1', '/import-batch', array(
+            'methods' => 'POST',
+            'callback' => array($this, 'import_batch'),
+            'permission_callback' => array($this, 'check_api_key'),
+            'args' => array(
+                'tools' => array('required' => true)
+            )
+        ));
+
         // 测试端点
         register_rest_route('ai-tools/v1', '/test', array(
             'methods' => 'GET',
@@ -647,6 +692,120 @@ class AIToolImportAPI_MVP {
         return $this->set_cors_headers($response);
     }
     
+    /**
+     * 批量导入AI工具 - 每个条目为 {tool_data, post_id(可选), content_hash(可选), group_hashes(可选)}
+     * 写入期间暂停对象缓存失效和分类计数，结束后统一清理缓存、重新计数
+     */
+    public function import_batch($request) {
+        $items = $request->get_param('tools');
+        
+        if (empty($items) || !is_array($items)) {
+            $response = new WP_REST_Response(array(
+                'success' => false,
+                'message' => '工具列表不能为空'
+            ), 400);
+            return $this->set_cors_headers($response);
+        }
+        
+        $results = array();
+        
+        wp_suspend_cache_invalidation(true);
+        wp_defer_term_counting(true);
+        
+        try {
+            foreach (array_values($items) as $index => $item) {
+                $results[] = $this->_import_batch_item($index, $item);
+            }
+        } finally {
+            wp_defer_term_counting(false);
+            wp_suspend_cache_invalidation(false);
+        }
+        
+        // 缓存失效被暂停，逐个清理已写入文章的缓存
+        foreach ($results as $result) {
+            if ($result['success']) {
+                clean_post_cache($result['post_id']);
+            }
+        }
+        
+        $succeeded = count(array_filter($results, function($result) {
+            return $result['success'];
+        }));
+        
+        $response = new WP_REST_Response(array(
+            'success' => true,
+            'total' => count($results),
+            'succeeded' => $succeeded,
+            'failed' => count($results) - $succeeded,
+            'results' => $results
+        ), 200);
+        
+        return $this->set_cors_headers($response);
+    }
+    
+    /**
+     * 导入批量请求中的单个条目，返回该条目的结果
+     */
+    private function _import_batch_item($index, $item) {
+        $tool_data = is_array($item) ? ($item['tool_data'] ?? null) : null;
+        
+        if (empty($tool_data) || !is_array($tool_data)) {
+            return array(
+                'index' => $index,
+                'success' => false,
+                'message' => '工具数据不能为空'
+            );
+        }
+        
+        $product_name = $tool_data['product_name'] ?? 'Unknown Tool';
+        $post_id = absint($item['post_id'] ?? 0);
+        
+        try {
+            // Gemini增强（如果可用）
+            $tool_data = $this->_enhance_tool_data_if_available($tool_data);
+            
+            if ($post_id) {
+                $result = $this->_update_tool_mvp($post_id, $tool_data);
+            } else {
+                $result = $this->_create_tool_mvp($tool_data);
+            }
+            
+            if (!$result['success']) {
+                return array(
+                    'index' => $index,
+                    'success' => false,
+                    'tool_name' => $product_name,
+                    'message' => $result['message'],
+                    'error' => $result['error'] ?? ''
+                );
+            }
+            
+            // 记录导入器的内容哈希，未变化的工具下次直接跳过
+            if (!empty($item['content_hash'])) {
+                update_post_meta($result['post_id'], 'content_hash', sanitize_text_field($item['content_hash']));
+                update_post_meta($result['post_id'], 'group_hashes', (string) ($item['group_hashes'] ?? ''));
+            }
+            
+            return array(
+                'index' => $index,
+                'success' => true,
+                'post_id' => $result['post_id'],
+                'tool_name' => $product_name,
+                'message' => $result['message'],
+                'updated' => (bool) $post_id
+            );
+            
+        } catch (Exception $e) {
+            return array(
+                'index' => $index,
+                'success' => false,
+                'tool_name' => $product_name,
+                'message' => '导入过程中发生错误',
+                'error' => $e->getMessage()
+            );
+        }
+    }
+    
     /**
      * 增强工具数据（如果Gemini可用）
      */
@@ -685,9 +844,17 @@ class AIToolImportAPI_MVP {
         
         // 增强功能特性 - 强制设置，传递当前工具ID避免推荐自己
         $tool_data['features'] = $this->_generate_default_features($category);
-        $tool_data['alternative_tools'] = $this->_generate_alternative_tools_objects($category, $current_tool_id);
-        $tool_data['featured_matches'] = $this->_generate_featured_matches_objects($category, $current_tool_id);
-        $tool_data['other_tools'] = $this->_generate_other_tools_objects($category, $current_tool_id);
+        
+        // 推荐关系 - 导入端已基于本地相似度预计算时直接使用，否则从数据库查询
+        if (empty($tool_data['alternative_tools'])) {
+            $tool_data['alternative_tools'] = $this->_generate_alternative_tools_objects($category, $current_tool_id);
+        }
+        if (empty($tool_data['featured_matches'])) {
+            $tool_data['featured_matches'] = $this->_generate_featured_matches_objects($category, $current_tool_id);
+        }
+        if (empty($tool_data['other_tools'])) {
+            $tool_data['other_tools'] = $this->_generate_other_tools_objects($category, $current_tool_id);
+        }
         
         // 设置alternatives字段（用于旧版本兼容）
         $tool_data['alternatives'] = $tool_data['alternative_tools'];
@@ -1723,6 +1890,11 @@ class AIToolImportAPI_MVP {
             }
         }
         
+        // 来源URL，供导入器查重
+        if (!empty($tool_data['product_url'])) {
+            update_post_meta($post_id, 'source_url', esc_url_raw($tool_data['product_url']));
+        }
+        
         error_log("MVP: ACF字段保存完成");
     }
     
@@ -3,11 +3,72 @@ AI工具导入系统 - WordPress数据导入器
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+import hashlib
+import html
 import json
+import mimetypes
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 from config import config
 from logger import logger
+from url_utils import get_hostname, ensure_scheme
+from json_cache import JsonFileCache
+from asset_store import asset_store, UPLOAD_VARIANTS
+
+# 表示服务器过载、需要退让的状态码
+BACKPRESSURE_STATUS = (429, 503)
+
+class HostThrottle:
+    """单个主机的在途请求限制：429/503或响应过慢时减半（429/503还会暂停），正常响应时逐步恢复"""
+    
+    def __init__(self, max_in_flight):
+        self.max_in_flight = max_in_flight
+        self.limit = float(max_in_flight)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.condition = threading.Condition()
+    
+    def acquire(self):
+        """等待暂停结束且在途请求数低于当前上限"""
+        with self.condition:
+            while True:
+                delay = self.paused_until - time.monotonic()
+                if delay > 0:
+                    self.condition.wait(delay)
+                elif self.in_flight >= int(self.limit):
+                    self.condition.wait()
+                else:
+                    break
+            self.in_flight += 1
+    
+    def release(self, response, latency, timeout):
+        """请求结束，根据状态码和延迟调整上限（超过超时时间1/3视为过慢）"""
+        with self.condition:
+            self.in_flight -= 1
+            if response is not None:
+                if response.status_code in BACKPRESSURE_STATUS:
+                    self.limit = max(1.0, self.limit / 2)
+                    self.paused_until = max(self.paused_until, time.monotonic() + self._retry_after(response))
+                    logger.warning(f"服务器过载 ({response.status_code})，并发上限降为 {int(self.limit)}")
+                elif latency > timeout / 3:
+                    self.limit = max(1.0, self.limit / 2)
+                    logger.debug(f"响应过慢 ({latency:.1f}s)，并发上限降为 {int(self.limit)}")
+                else:
+                    self.limit = min(float(self.max_in_flight), self.limit + 1 / self.limit)
+            self.condition.notify_all()
+    
+    def _retry_after(self, response):
+        """Retry-After秒数（缺失或无法解析时1秒，最多60秒）"""
+        try:
+            return min(max(float(response.headers.get('Retry-After', 1)), 0.0), 60.0)
+        except ValueError:
+            return 1.0
 
 class WordPressImporter:
     """WordPress数据导入器"""
@@ -21,22 +82,320 @@ class WordPressImporter:
         self.timeout = config.REQUEST_TIMEOUT
         self.delay = config.IMPORT_DELAY
         self.use_custom_api = False  # 直接使用WordPress原生API，更可靠
+        self.import_batch_supported = True  # 旧版插件没有/import-batch，首次404后本次运行改为逐个导入
         
         if not all([self.wp_username, self.wp_password, self.wp_api_url]):
             raise ValueError("WordPress配置不完整")
+        
+        self.session = self._create_session()
+        
+        # /batch/v1模式：单次最大请求数在首次批量导入时向服务器查询
+        self.rest_root = self.wp_api_url.replace('/wp/v2', '')
+        self.batch_api_url = f"{self.rest_root}/batch/v1"
+        self.use_batch_api = config.WP_USE_BATCH_API
+        self.batch_limit = None
+        
+        # 分类/标签: 小写名称 -> ID，首次使用时分页预加载
+        self.term_ids = {'categories': {}, 'tags': {}}
+        self.terms_loaded = False
+        self.terms_lock = threading.Lock()
+        
+        # 已有文章索引: 规范化标题/来源URL -> 文章，首次使用时分页预加载
+        self.post_index = {'title': {}, 'url': {}}
+        self.posts_loaded = False
+        self.posts_preload_failed = False  # 预加载失败时本次运行改为逐个搜索查重，避免漏查导致重复创建
+        self.posts_lock = threading.Lock()
+        
+        # 按主机的在途请求限制，以及并发导入的进度计数
+        self.throttles = {}
+        self.throttles_lock = threading.Lock()
+        self.progress_lock = threading.Lock()
+        
+        # 已上传到媒体库的本地图片: 站点 + 本地文件路径 -> 媒体URL（文件按内容哈希存储，路径不变即内容不变）
+        self.media_cache = JsonFileCache('wp_media.json')
+    
+    def _create_session(self):
+        """创建共享会话：连接池复用TCP/TLS连接，所有调用和线程共用"""
+        session = requests.Session()
+        session.auth = HTTPBasicAuth(self.wp_username, self.wp_password)
+        
+        # 连接错误总是重试；状态码重试只用于幂等请求，避免重复创建文章
+        retry = Retry(
+            total=config.WP_MAX_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=config.WP_POOL_SIZE, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def _get_throttle(self, url):
+        """获取主机对应的在途请求限制"""
+        host = urlparse(url).netloc
+        with self.throttles_lock:
+            if host not in self.throttles:
+                self.throttles[host] = HostThrottle(config.WP_MAX_IN_FLIGHT)
+            return self.throttles[host]
+    
+    def _request(self, method, url, **kwargs):
+        """通过共享会话发送请求，受主机在途请求上限约束；POST遇到429/503时等待后重试"""
+        kwargs.setdefault('timeout', self.timeout)
+        throttle = self._get_throttle(url)
+        
+        for attempt in range(config.WP_MAX_RETRIES + 1):
+            throttle.acquire()
+            started = time.monotonic()
+            response = None
+            try:
+                response = self.session.request(method, url, **kwargs)
+            finally:
+                throttle.release(response, time.monotonic() - started, kwargs['timeout'])
+            
+            # GET等幂等请求已由连接池的Retry重试过
+            if method != 'POST' or response.status_code not in BACKPRESSURE_STATUS:
+                break
+            if attempt < config.WP_MAX_RETRIES:
+                logger.debug(f"{response.status_code} 等待后重试 ({attempt + 1}/{config.WP_MAX_RETRIES}): {url}")
+        
+        return response
+    
+    def _is_missing_route(self, response):
+        """响应是否表示路由不存在（404且错误码为rest_no_route或响应体不是JSON）"""
+        if response.status_code != 404:
+            return False
+        try:
+            body = response.json()
+        except ValueError:
+            return True
+        return not isinstance(body, dict) or body.get('code', 'rest_no_route') == 'rest_no_route'
+    
+    def _fetch_all(self, endpoint, params=None):
+        """分页读取集合接口的全部条目（第一页确定总页数后并发读取其余页），任何一页失败都抛出异常"""
+        params = dict(params or {}, per_page=100)
+        url = f"{self.wp_api_url}/{endpoint}"
+        
+        # 端点不存在（如未注册aihub CPT）视为没有条目
+        response = self._request('GET', url, params=dict(params, page=1))
+        if self._is_missing_route(response):
+            return []
+        if response.status_code != 200:
+            raise ValueError(f"读取 {endpoint} 第1页失败: HTTP {response.status_code}")
+        
+        items = response.json()
+        total_pages = int(response.headers.get('X-WP-TotalPages') or 1)
+        if total_pages > 1:
+            def fetch_page(page):
+                page_response = self._request('GET', url, params=dict(params, page=page))
+                if page_response.status_code != 200:
+                    raise ValueError(f"读取 {endpoint} 第{page}页失败: HTTP {page_response.status_code}")
+                return page_response.json()
+            
+            with ThreadPoolExecutor(max_workers=min(total_pages - 1, config.WP_POOL_SIZE)) as executor:
+                for page_items in executor.map(fetch_page, range(2, total_pages + 1)):
+                    items.extend(page_items)
+        
+        return items
+    
+    def preload_terms(self):
+        """分页加载全部分类和标签，建立不区分大小写的名称->ID映射"""
+        with self.terms_lock:
+            if self.terms_loaded:
+                return
+            for taxonomy in self.term_ids:
+                try:
+                    terms = self._fetch_all(taxonomy, {'_fields': 'id,name'})
+                except Exception as e:
+                    # 未加载的分类/标签在创建时由term_exists返回现有ID，不会重复创建
+                    logger.warning(f"预加载{taxonomy}失败，将在创建时查重: {e}")
+                    continue
+                for term in terms:
+                    self.term_ids[taxonomy][html.unescape(term.get('name', '')).strip().lower()] = term['id']
+            self.terms_loaded = True
+        
+        logger.info(f"已加载分类法: {len(self.term_ids['categories'])} 个分类, {len(self.term_ids['tags'])} 个标签")
+    
+    def _ensure_terms(self, taxonomy, names):
+        """返回名称对应的分类/标签ID，缺失的并发创建并写回映射"""
+        self.preload_terms()
+        term_map = self.term_ids[taxonomy]
+        
+        names = [name.strip() for name in names if isinstance(name, str) and name.strip()]
+        missing = {name.lower(): name for name in names if name.lower() not in term_map}
+        if missing:
+            if self.use_batch_api and self.batch_limit:
+                requests_list = [{'method': 'POST', 'path': self._rest_path(f"{self.wp_api_url}/{taxonomy}"), 'body': {'name': name}}
+                                 for name in missing.values()]
+                created = [self._parse_term_response(taxonomy, name, status, body)
+                           for name, (status, body) in zip(missing.values(), self._send_batch(requests_list))]
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(missing), config.WP_POOL_SIZE)) as executor:
+                    created = list(executor.map(lambda name: self._create_term(taxonomy, name), missing.values()))
+            
+            for key, term_id in zip(missing, created):
+                if term_id:
+                    term_map[key] = term_id
+        
+        return list(dict.fromkeys(term_map[name.lower()] for name in names if name.lower() in term_map))
+    
+    def _create_term(self, taxonomy, name):
+        """创建分类/标签，已存在时（term_exists）返回现有ID"""
+        try:
+            response = self._request('POST', f"{self.wp_api_url}/{taxonomy}", json={'name': name})
+            return self._parse_term_response(taxonomy, name, response.status_code, response.json())
+        except Exception as e:
+            logger.debug(f"创建{taxonomy}失败 {name}: {e}")
+        return None
+    
+    def _parse_term_response(self, taxonomy, name, status_code, result):
+        """从创建分类/标签的响应中取得ID，已存在时（term_exists）返回现有ID"""
+        if status_code in [200, 201]:
+            logger.debug(f"创建新{'分类' if taxonomy == 'categories' else '标签'}: {name} (ID: {result.get('id')})")
+            return result.get('id')
+        if isinstance(result, dict) and result.get('code') == 'term_exists':
+            return result.get('data', {}).get('term_id')
+        
+        logger.warning(f"创建{'分类' if taxonomy == 'categories' else '标签'}失败: {name} ({status_code})")
+        return None
+    
+    def preload_posts(self):
+        """
+        分页加载全部aihub/post文章的ID、标题、类型和来源URL，建立查重索引
+        返回索引是否可用；任何一页读取失败时索引不完整，本次运行改为逐个搜索查重
+        """
+        with self.posts_lock:
+            if self.posts_loaded or self.posts_preload_failed:
+                return self.posts_loaded
+            try:
+                posts = [post for endpoint in ('aihub', 'posts')
+                         for post in self._fetch_all(endpoint, {'_fields': 'id,title,type,meta'})]
+            except Exception as e:
+                logger.warning(f"预加载文章索引失败，改为逐个搜索查重: {e}")
+                self.posts_preload_failed = True
+                return False
+            for post in posts:
+                self._index_post(post)
+            self.posts_loaded = True
+        
+        logger.info(f"已加载文章索引: {len(self.post_index['title'])} 个标题, {len(self.post_index['url'])} 个来源URL")
+        return True
+    
+    def _index_post(self, post):
+        """把文章加入查重索引（先加载的aihub优先于post）"""
+        title, source_url, entry = self._make_index_entry(post)
+        self.post_index['title'].setdefault(self._normalize_title(title), entry)
+        if source_url:
+            self.post_index['url'].setdefault(self._normalize_source_url(source_url), entry)
+    
+    def _make_index_entry(self, post):
+        """REST文章 -> (标题, 来源URL, 索引条目)"""
+        title = post.get('title', {})
+        title = title.get('rendered', '') if isinstance(title, dict) else str(title)
+        meta = post.get('meta') or {}
+        source_url = meta.get('source_url', '')
+        try:
+            group_hashes = json.loads(meta.get('group_hashes') or '{}')
+        except ValueError:
+            group_hashes = {}
+        
+        entry = {
+            'id': post['id'],
+            'type': post.get('type', 'post'),
+            'title': {'rendered': title},
+            'content_hash': meta.get('content_hash', ''),
+            'group_hashes': group_hashes
+        }
+        return title, source_url, entry
+    
+    def _normalize_title(self, title):
+        """规范化标题：解码HTML实体、合并空白、忽略大小写"""
+        return ' '.join(html.unescape(title or '').split()).casefold()
+    
+    def _normalize_source_url(self, url):
+        """规范化来源URL：忽略协议、www前缀和末尾斜杠"""
+        path = urlparse(ensure_scheme(url)).path.rstrip('/')
+        return f"{get_hostname(url)}{path}"
+    
+    def _prepare_batch_terms(self, tools_data):
+        """批量导入前一次性确保所有分类和标签存在"""
+        categories = [tool_data.get('category') for tool_data in tools_data]
+        tags = [tag for tool_data in tools_data for tag in self._get_or_create_tags(tool_data)]
+        
+        self._ensure_terms('categories', categories)
+        self._ensure_terms('tags', tags)
+    
+    def _upload_local_assets(self, tools_data):
+        """把资源库生成的本地图片上传到媒体库（每个文件只上传一次），并用媒体URL替换工具的图片字段"""
+        uploads = {}
+        for tool_data in tools_data:
+            for field in UPLOAD_VARIANTS:
+                path = asset_store.get_upload_path(tool_data, field)
+                if path:
+                    uploads.setdefault(path, []).append((tool_data, field))
+        
+        if not uploads:
+            return
+        
+        with ThreadPoolExecutor(max_workers=max(1, config.WP_IMPORT_WORKERS)) as executor:
+            media_urls = dict(zip(uploads, executor.map(self._upload_media, uploads)))
+        
+        replaced_count = 0
+        for path, targets in uploads.items():
+            if media_urls[path]:
+                for tool_data, field in targets:
+                    tool_data[field] = media_urls[path]
+                    replaced_count += 1
+        logger.info(f"本地图片上传到媒体库: {sum(1 for url in media_urls.values() if url)}/{len(uploads)} 个文件, 替换 {replaced_count} 个图片字段")
+    
+    def _upload_media(self, path):
+        """上传单个本地文件到媒体库，返回媒体URL（失败返回None，保留原图片URL）"""
+        cache_key = f"{get_hostname(self.wp_api_url)} {path}"
+        media_url = self.media_cache.get(cache_key)
+        if media_url:
+            return media_url
+        
+        # 文件名带内容哈希，避免不同图片的同名缩略图相互覆盖
+        content_hash = os.path.basename(os.path.dirname(path))
+        filename = f"{content_hash[:16]}-{os.path.basename(path)}"
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+            
+            response = self._request(
+                'POST',
+                f"{self.wp_api_url}/media",
+                data=content,
+                headers={
+                    'Content-Type': mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                    'Content-Disposition': f'attachment; filename="{filename}"'
+                }
+            )
+            if response.status_code not in (200, 201):
+                logger.warning(f"上传图片失败 {filename}: HTTP {response.status_code} {response.text[:200]}")
+                return None
+            
+            media_url = response.json().get('source_url')
+        except Exception as e:
+            logger.warning(f"上传图片异常 {filename}: {e}")
+            return None
+        
+        if media_url:
+            self.media_cache.set(cache_key, media_url)
+        return media_url
     
     def test_connection(self):
         """测试WordPress连接"""
         try:
             # 测试基础API
-            response = requests.get(f"{self.wp_api_url}/", timeout=self.timeout)
+            response = self._request('GET', f"{self.wp_api_url}/")
             if response.status_code != 200:
                 logger.error("WordPress基础API连接失败")
                 return False
             
             # 测试认证API
-            auth = HTTPBasicAuth(self.wp_username, self.wp_password)
-            response = requests.get(f"{self.wp_api_url}/users/me", auth=auth, timeout=self.timeout)
+            response = self._request('GET', f"{self.wp_api_url}/users/me")
             if response.status_code != 200:
                 logger.error("WordPress认证失败")
                 return False
@@ -55,7 +414,7 @@ class WordPressImporter:
                 else:
                     logger.warning("未配置自定义API Key，将尝试无认证访问")
                 
-                response = requests.get(f"{self.custom_api_url}/test", headers=custom_headers, timeout=self.timeout)
+                response = self._request('GET', f"{self.custom_api_url}/test", headers=custom_headers)
                 logger.debug(f"自定义API响应状态: {response.status_code}")
                 
                 if response.status_code == 200:
@@ -94,9 +453,12 @@ class WordPressImporter:
             logger.debug(f"正在导入: {tool_name}")
             
             # 首先检查是否已存在同名产品
-            existing_post = self._check_existing_product(tool_name)
+            existing_post = self._check_existing_product(tool_data)
             
             if existing_post:
+                skipped = self._skip_if_unchanged(existing_post, tool_data)
+                if skipped:
+                    return skipped
                 logger.info(f"🔄 检测到重复产品: {tool_name} (ID: {existing_post['id']})，将更新内容")
                 return self._update_existing_product(existing_post, tool_data)
             else:
@@ -118,104 +480,97 @@ class WordPressImporter:
                 'error': error_msg
             }
     
-    def _check_existing_product(self, product_name):
-        """检查是否已存在同名产品"""
-        try:
-            auth = HTTPBasicAuth(self.wp_username, self.wp_password)
-            
-            # 首先尝试在aihub CPT中搜索
-            search_urls = [
-                f"{self.wp_api_url}/aihub?search={requests.utils.quote(product_name)}&per_page=5",
-                f"{self.wp_api_url}/posts?search={requests.utils.quote(product_name)}&per_page=5"
-            ]
-            
-            for search_url in search_urls:
-                try:
-                    logger.debug(f"搜索URL: {search_url}")
-                    response = requests.get(search_url, auth=auth, timeout=30)
-                    if response.status_code == 200:
-                        posts = response.json()
-                        logger.debug(f"搜索到 {len(posts)} 个结果")
-                        for post in posts:
-                            # 精确匹配标题
-                            post_title = post.get('title', {}).get('rendered', '').strip() if isinstance(post.get('title'), dict) else str(post.get('title', '')).strip()
-                            if post_title == product_name.strip():
-                                # 确保返回的post包含type信息
-                                if 'type' not in post:
-                                    # 如果搜索结果中没有type字段，根据搜索URL推断
-                                    if '/aihub?' in search_url:
-                                        post['type'] = 'aihub'
-                                    else:
-                                        post['type'] = 'post'
-                                
-                                logger.debug(f"找到重复产品: {product_name} (ID: {post['id']}, 类型: {post.get('type', 'unknown')})")
-                                return post
-                except Exception as e:
-                    logger.debug(f"搜索失败 {search_url}: {e}")
-                    continue
-            
+    def _skip_if_unchanged(self, existing_post, tool_data):
+        """已有文章的内容哈希与当前数据一致时返回跳过结果，否则返回None"""
+        if existing_post.get('content_hash') != self._compute_content_hashes(tool_data)[0]:
             return None
-            
+        
+        tool_name = tool_data.get('product_name', 'Unknown')
+        logger.info(f"⏭️ 内容未变化，跳过: {tool_name} (ID: {existing_post['id']})")
+        return {
+            'success': True,
+            'post_id': existing_post['id'],
+            'tool_name': tool_name,
+            'message': '内容未变化，跳过更新',
+            'updated': False,
+            'skipped': True
+        }
+    
+    def _check_existing_product(self, tool_data):
+        """检查是否已存在同一产品（先按来源URL，再按标题查索引；索引不可用时逐个搜索）"""
+        if not self.preload_posts():
+            return self._search_existing_product(tool_data)
+        
+        product_url = tool_data.get('product_url', '')
+        if product_url:
+            post = self.post_index['url'].get(self._normalize_source_url(product_url))
+            if post:
+                logger.debug(f"按来源URL找到重复产品: {product_url} (ID: {post['id']}, 类型: {post['type']})")
+                return post
+        
+        post = self.post_index['title'].get(self._normalize_title(tool_data.get('product_name', '')))
+        if post:
+            logger.debug(f"按标题找到重复产品: {tool_data.get('product_name')} (ID: {post['id']}, 类型: {post['type']})")
+        return post
+    
+    def _check_existing_product_or_fail(self, index, tool_data, results):
+        """批量导入中查重；查重请求失败时记录失败结果并返回False（宁可本次不导入，也不重复创建）"""
+        try:
+            return self._check_existing_product(tool_data)
         except Exception as e:
-            logger.warning(f"检查重复产品失败: {e}")
-            return None
+            tool_name = tool_data.get('product_name', 'Unknown')
+            logger.error(f"查重失败: {tool_name} - {e}")
+            results[index] = {'success': False, 'tool_name': tool_name, 'error': str(e)}
+            return False
+    
+    def _search_existing_product(self, tool_data):
+        """按产品名称搜索aihub和post文章，来源URL或标题一致即视为同一产品（搜索失败时抛出异常，避免重复创建）"""
+        product_url = tool_data.get('product_url', '')
+        url_key = self._normalize_source_url(product_url) if product_url else None
+        title_key = self._normalize_title(tool_data.get('product_name', ''))
+        
+        title_match = None
+        for endpoint in ('aihub', 'posts'):
+            response = self._request('GET', f"{self.wp_api_url}/{endpoint}",
+                                     params={'search': tool_data.get('product_name', ''), '_fields': 'id,title,type,meta', 'per_page': 20})
+            if self._is_missing_route(response):
+                continue
+            if response.status_code != 200:
+                raise ValueError(f"搜索 {endpoint} 失败: HTTP {response.status_code}")
+            for post in response.json():
+                title, source_url, entry = self._make_index_entry(post)
+                if url_key and source_url and self._normalize_source_url(source_url) == url_key:
+                    logger.debug(f"按来源URL搜索到重复产品: {product_url} (ID: {entry['id']}, 类型: {entry['type']})")
+                    return entry
+                if title_match is None and self._normalize_title(title) == title_key:
+                    title_match = entry
+        
+        if title_match:
+            logger.debug(f"按标题搜索到重复产品: {tool_data.get('product_name')} (ID: {title_match['id']}, 类型: {title_match['type']})")
+        return title_match
     
     def _update_existing_product(self, existing_post, tool_data):
         """更新已存在的产品"""
         try:
-            auth = HTTPBasicAuth(self.wp_username, self.wp_password)
-            headers = {"Content-Type": "application/json"}
-            
             tool_name = tool_data.get('product_name', 'Unknown')
             post_id = existing_post['id']
             post_type = existing_post.get('type', 'post')
             
-            # 准备更新数据
-            update_data = {
-                'title': tool_name,
-                'content': tool_data.get('description', f"{tool_name} is an {tool_data.get('category', 'AI')} tool."),
-                'excerpt': tool_data.get('short_introduction', ''),
-                'status': 'publish'
-            }
+            update_data, changed = self._build_update_data(existing_post, tool_data)
             
             # 根据实际的文章类型选择正确的API端点
-            if post_type == 'aihub':
-                endpoint = f"{self.wp_api_url}/aihub/{post_id}"
-                logger.debug(f"使用aihub端点更新: {endpoint}")
-            else:
-                endpoint = f"{self.wp_api_url}/posts/{post_id}"
-                logger.debug(f"使用posts端点更新: {endpoint}")
-            
-            # 添加ACF字段到更新数据
-            acf_fields = self._prepare_acf_fields(tool_data)
-            if acf_fields:
-                update_data['acf'] = acf_fields
-            
-            # 添加分类和标签
-            update_data['categories'] = self._get_or_create_categories(tool_data)
-            update_data['tags'] = self._get_or_create_tag_ids(tool_data)
+            collection = f"{self.wp_api_url}/{'aihub' if post_type == 'aihub' else 'posts'}"
+            logger.debug(f"使用{post_type}端点更新: {collection}/{post_id}")
             
             logger.debug(f"更新数据: {json.dumps(update_data, ensure_ascii=False)[:200]}...")
             
-            response = requests.post(
-                endpoint,
-                headers=headers,
-                auth=auth,
-                json=update_data,
-                timeout=60
-            )
+            response = self._save_post(collection, update_data, post_id)
             
             logger.debug(f"更新响应状态: {response.status_code}")
             
             if response.status_code == 200:
-                result = response.json()
-                logger.success(f"🔄 更新成功: {tool_name} (ID: {post_id}, 类型: {post_type})")
-                
-                # 强制保存ACF字段
-                self._save_acf_fields_via_api(post_id, tool_data)
-                
-                # 再次确保ACF字段已保存（有时需要单独更新）
-                self._update_acf_fields_separately(post_id, tool_data)
+                logger.success(f"🔄 更新成功: {tool_name} (ID: {post_id}, 类型: {post_type}, 变化分组: {len(changed)})")
+                self._mark_synced(existing_post, tool_data)
                 
                 return {
                     'success': True,
@@ -231,21 +586,11 @@ class WordPressImporter:
                 # 如果aihub端点失败，尝试使用posts端点作为备用
                 if post_type == 'aihub' and response.status_code == 404:
                     logger.warning(f"aihub端点失败，尝试使用posts端点作为备用...")
-                    fallback_endpoint = f"{self.wp_api_url}/posts/{post_id}"
-                    
-                    fallback_response = requests.post(
-                        fallback_endpoint,
-                        headers=headers,
-                        auth=auth,
-                        json=update_data,
-                        timeout=60
-                    )
+                    fallback_response = self._save_post(f"{self.wp_api_url}/posts", update_data, post_id)
                     
                     if fallback_response.status_code == 200:
-                        result = fallback_response.json()
                         logger.success(f"🔄 备用更新成功: {tool_name} (ID: {post_id})")
-                        self._save_acf_fields_via_api(post_id, tool_data)
-                        self._update_acf_fields_separately(post_id, tool_data)
+                        self._mark_synced(existing_post, tool_data)
                         return {
                             'success': True,
                             'post_id': post_id,
@@ -273,6 +618,75 @@ class WordPressImporter:
                 'updated': False
             }
     
+    def _build_update_data(self, existing_post, tool_data):
+        """对比已存储的分组哈希，构建只包含变化分组的更新数据（旧文章没有哈希时全部发送），返回 (更新数据, 变化的分组)"""
+        tool_name = tool_data.get('product_name', 'Unknown')
+        content_hash, group_hashes = self._compute_content_hashes(tool_data)
+        stored_hashes = existing_post.get('group_hashes') or {}
+        changed = {group for group, value in group_hashes.items() if stored_hashes.get(group) != value}
+        logger.debug(f"变化的分组: {', '.join(sorted(changed))}")
+        
+        # 准备更新数据
+        update_data = {
+            'meta': {'content_hash': content_hash, 'group_hashes': json.dumps(group_hashes, sort_keys=True)}
+        }
+        if 'post' in changed:
+            update_data.update({
+                'title': tool_name,
+                'content': tool_data.get('description', f"{tool_name} is an {tool_data.get('category', 'AI')} tool."),
+                'excerpt': tool_data.get('short_introduction', ''),
+                'status': 'publish'
+            })
+            update_data['meta']['source_url'] = tool_data.get('product_url', '')
+        
+        # 添加变化的ACF字段到更新数据（同时作为meta发送）
+        acf_fields = {name: value for name, value in self._prepare_acf_fields(tool_data).items() if name in changed}
+        if acf_fields:
+            update_data['acf'] = acf_fields
+            update_data['meta'].update(acf_fields)
+        
+        # 添加分类和标签
+        if 'terms' in changed:
+            update_data['categories'] = self._get_or_create_categories(tool_data)
+            update_data['tags'] = self._get_or_create_tag_ids(tool_data)
+        
+        return update_data, changed
+    
+    def _build_post_data(self, tool_data):
+        """构建新建文章的数据（文章字段、6个JSON字段、内容哈希、分类和标签）"""
+        tool_name = tool_data.get('product_name', 'Unknown')
+        
+        # 创建基础文章数据
+        post_data = {
+            'title': tool_name,
+            'content': tool_data.get('product_story', tool_data.get('short_introduction', f"{tool_name} is an {tool_data.get('category', 'AI')} tool.")),
+            'status': 'publish',
+            'type': 'aihub',
+            'excerpt': tool_data.get('short_introduction', ''),
+            'meta': {'source_url': tool_data.get('product_url', '')},
+        }
+        
+        # 内容哈希，下次导入时用于跳过未变化的文章
+        content_hash, group_hashes = self._compute_content_hashes(tool_data)
+        post_data['meta'].update({'content_hash': content_hash, 'group_hashes': json.dumps(group_hashes, sort_keys=True)})
+        
+        # 添加ACF字段（同时作为meta发送）
+        acf_fields = self._prepare_acf_fields(tool_data)
+        if acf_fields:
+            post_data['acf'] = acf_fields
+            post_data['meta'].update(acf_fields)
+        
+        # 添加分类和标签
+        post_data['categories'] = self._get_or_create_categories(tool_data)
+        post_data['tags'] = self._get_or_create_tag_ids(tool_data)
+        
+        return post_data
+    
+    def _mark_synced(self, existing_post, tool_data):
+        """写入成功后更新索引中的内容哈希，本批后续重复条目可直接跳过"""
+        content_hash, group_hashes = self._compute_content_hashes(tool_data)
+        existing_post.update({'content_hash': content_hash, 'group_hashes': group_hashes})
+    
     def _import_via_custom_api(self, tool_data):
         """通过自定义API导入"""
         headers = {"Content-Type": "application/json"}
@@ -285,7 +699,8 @@ class WordPressImporter:
         
         tool_name = tool_data.get('product_name', 'Unknown')
         
-        response = requests.post(
+        response = self._request(
+            'POST',
             f"{self.custom_api_url}/import",
             headers=headers,
             json=payload,
@@ -296,6 +711,9 @@ class WordPressImporter:
             result = response.json()
             if result.get('success'):
                 logger.success(f"导入成功: {tool_name}")
+                if result.get('post_id'):
+                    self._index_post({'id': result['post_id'], 'type': 'aihub', 'title': tool_name,
+                                      'meta': {'source_url': tool_data.get('product_url', '')}})
                 
                 # 记录分类和标签创建信息
                 self._log_taxonomy_info(tool_data, tool_name)
@@ -325,69 +743,28 @@ class WordPressImporter:
     
     def _import_via_standard_api(self, tool_data):
         """通过标准WordPress API导入（降级模式）"""
-        auth = HTTPBasicAuth(self.wp_username, self.wp_password)
-        headers = {"Content-Type": "application/json"}
-        
         tool_name = tool_data.get('product_name', 'Unknown')
-        
-        # 创建基础文章数据
-        post_data = {
-            'title': tool_name,
-            'content': tool_data.get('product_story', tool_data.get('short_introduction', f"{tool_name} is an {tool_data.get('category', 'AI')} tool.")),
-            'status': 'publish',
-            'type': 'post',  # 如果aihub CPT不存在，使用标准post类型
-            'excerpt': tool_data.get('short_introduction', ''),
-        }
-        
-        # 添加ACF字段
-        acf_fields = self._prepare_acf_fields(tool_data)
-        if acf_fields:
-            post_data['acf'] = acf_fields
-        
-        # 添加分类和标签
-        post_data['categories'] = self._get_or_create_categories(tool_data)
-        post_data['tags'] = self._get_or_create_tag_ids(tool_data)
+        post_data = self._build_post_data(tool_data)
         
         # 尝试使用aihub CPT，如果失败则使用post
         try:
-            post_data['type'] = 'aihub'
-            response = requests.post(
-                f"{self.wp_api_url}/aihub",
-                headers=headers,
-                auth=auth,
-                json=post_data,
-                timeout=60
-            )
+            response = self._save_post(f"{self.wp_api_url}/aihub", post_data)
             
             if response.status_code not in [200, 201]:
                 # aihub CPT不存在，使用标准post
                 post_data['type'] = 'post'
-                response = requests.post(
-                    f"{self.wp_api_url}/posts",
-                    headers=headers,
-                    auth=auth,
-                    json=post_data,
-                    timeout=60
-                )
+                response = self._save_post(f"{self.wp_api_url}/posts", post_data)
         except Exception:
             # 如果aihub失败，使用标准post
             post_data['type'] = 'post'
-            response = requests.post(
-                f"{self.wp_api_url}/posts",
-                headers=headers,
-                auth=auth,
-                json=post_data,
-                timeout=60
-            )
+            response = self._save_post(f"{self.wp_api_url}/posts", post_data)
         
         if response.status_code in [200, 201]:
             result = response.json()
             post_id = result.get('id')
             
             logger.success(f"导入成功: {tool_name} (ID: {post_id})")
-            
-            # 确保ACF字段已保存（有时需要单独更新）
-            self._update_acf_fields_separately(post_id, tool_data)
+            self._index_post({'id': post_id, 'type': post_data['type'], 'title': tool_name, 'meta': post_data['meta']})
             
             # 记录分类和标签创建信息
             self._log_taxonomy_info(tool_data, tool_name)
@@ -491,37 +868,36 @@ class WordPressImporter:
         
         return acf_fields
     
+    def _compute_content_hashes(self, tool_data):
+        """计算规范化工具数据的内容哈希和各写入分组（文章字段、6个JSON字段、分类法）的哈希"""
+        groups = {
+            'post': {
+                'product_name': tool_data.get('product_name', ''),
+                'product_url': tool_data.get('product_url', ''),
+                'description': tool_data.get('description', ''),
+                'product_story': tool_data.get('product_story', ''),
+                'short_introduction': tool_data.get('short_introduction', ''),
+                'category': tool_data.get('category', '')
+            },
+            'terms': {
+                'category': tool_data.get('category', ''),
+                'tags': sorted(self._get_or_create_tags(tool_data))
+            }
+        }
+        groups.update(self._prepare_acf_fields(tool_data))
+        
+        group_hashes = {
+            group: hashlib.sha256(json.dumps(value, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+            for group, value in groups.items()
+        }
+        content_hash = hashlib.sha256(json.dumps(group_hashes, sort_keys=True).encode('utf-8')).hexdigest()
+        return content_hash, group_hashes
+    
     def _get_or_create_categories(self, tool_data):
         """获取或创建分类"""
-        categories = []
-        if 'category' in tool_data and tool_data['category']:
-            try:
-                auth = HTTPBasicAuth(self.wp_username, self.wp_password)
-                
-                # 搜索现有分类
-                search_url = f"{self.wp_api_url}/categories?search={requests.utils.quote(tool_data['category'])}"
-                response = requests.get(search_url, auth=auth, timeout=30)
-                
-                if response.status_code == 200:
-                    existing_cats = response.json()
-                    for cat in existing_cats:
-                        if cat['name'].lower() == tool_data['category'].lower():
-                            categories.append(cat['id'])
-                            return categories
-                
-                # 如果不存在，创建新分类
-                create_url = f"{self.wp_api_url}/categories"
-                create_data = {'name': tool_data['category']}
-                response = requests.post(create_url, auth=auth, json=create_data, timeout=30)
-                
-                if response.status_code == 201:
-                    new_cat = response.json()
-                    categories.append(new_cat['id'])
-                    
-            except Exception as e:
-                logger.debug(f"处理分类失败: {e}")
-                
-        return categories
+        if tool_data.get('category'):
+            return self._ensure_terms('categories', [tool_data['category']])
+        return []
     
     def _get_or_create_tags(self, tool_data):
         """获取或创建标签 - 返回tag names列表（用于自定义API）"""
@@ -562,8 +938,8 @@ class WordPressImporter:
             if company and len(company.split()) <= 2:  # 简短的公司名
                 auto_tags.add(company)
             
-            # 转换为列表并限制数量
-            tags = list(auto_tags)[:8]  # 最多8个标签
+            # 转换为列表并限制数量（排序保证每次运行结果一致，内容哈希才稳定）
+            tags = sorted(auto_tags)[:8]  # 最多8个标签
             
             # 过滤掉空白和太长的标签
             tags = [tag for tag in tags if tag and len(tag) <= 30]
@@ -572,98 +948,47 @@ class WordPressImporter:
 
     def _get_or_create_tag_ids(self, tool_data):
         """获取或创建标签IDs - 用于WordPress REST API"""
-        tags = self._get_or_create_tags(tool_data)
-        tag_ids = []
+        return self._ensure_terms('tags', self._get_or_create_tags(tool_data))
+    
+    def _save_post(self, collection, post_data, post_id=None):
+        """一次请求写入文章字段、meta和分类法，按响应确认JSON字段，只对缺失的字段逐个补写"""
+        endpoint = f"{collection}/{post_id}" if post_id else collection
+        response = self._request('POST', endpoint, json=post_data, timeout=60)
         
-        if not tags:
-            return tag_ids
+        if response.status_code in [200, 201] and post_data.get('acf'):
+            result = response.json()
+            missing = self._find_missing_fields(result, post_data['acf'])
+            if missing:
+                logger.warning(f"响应中缺少 {len(missing)} 个字段，逐个补写: {', '.join(missing)}")
+                self._write_fields_separately(f"{collection}/{result.get('id', post_id)}", missing)
         
-        try:
-            auth = HTTPBasicAuth(self.wp_username, self.wp_password)
-            
-            for tag_name in tags:
-                # 搜索现有标签
-                search_response = requests.get(
-                    f"{self.wp_api_url}/tags",
-                    auth=auth,
-                    params={'search': tag_name, 'per_page': 10},
-                    timeout=10
-                )
+        return response
+    
+    def _find_missing_fields(self, result, fields):
+        """对比写入响应中的acf/meta，返回未持久化的字段"""
+        acf = result.get('acf') if isinstance(result.get('acf'), dict) else {}
+        meta = result.get('meta') if isinstance(result.get('meta'), dict) else {}
+        return {name: value for name, value in fields.items() if acf.get(name) != value and meta.get(name) != value}
+    
+    def _write_fields_separately(self, endpoint, fields):
+        """逐个写入字段（备用方法）"""
+        success_count = 0
+        for field_name, field_value in fields.items():
+            try:
+                field_data = {'acf': {field_name: field_value}, 'meta': {field_name: field_value}}
+                response = self._request('POST', endpoint, json=field_data, timeout=30)
                 
-                if search_response.status_code == 200:
-                    existing_tags = search_response.json()
-                    
-                    # 查找完全匹配的标签
-                    tag_id = None
-                    for tag in existing_tags:
-                        if tag.get('name', '').lower() == tag_name.lower():
-                            tag_id = tag.get('id')
-                            break
-                    
-                    # 如果没找到，创建新标签
-                    if not tag_id:
-                        create_response = requests.post(
-                            f"{self.wp_api_url}/tags",
-                            auth=auth,
-                            json={'name': tag_name},
-                            timeout=10
-                        )
-                        
-                        if create_response.status_code in [200, 201]:
-                            new_tag = create_response.json()
-                            tag_id = new_tag.get('id')
-                            logger.debug(f"创建新标签: {tag_name} (ID: {tag_id})")
-                        else:
-                            logger.warning(f"创建标签失败: {tag_name}")
-                            continue
-                    else:
-                        logger.debug(f"使用现有标签: {tag_name} (ID: {tag_id})")
+                if response.status_code in [200, 201] and not self._find_missing_fields(response.json(), {field_name: field_value}):
+                    success_count += 1
+                    logger.debug(f"✓ {field_name} 字段补写成功")
+                else:
+                    logger.warning(f"✗ {field_name} 字段补写失败: {response.status_code}")
                     
-                    if tag_id:
-                        tag_ids.append(tag_id)
-                
-                # 避免请求过快
-                time.sleep(0.1)
-                
-        except Exception as e:
-            logger.warning(f"处理标签时发生错误: {e}")
+            except Exception as e:
+                logger.debug(f"字段 {field_name} 补写异常: {e}")
         
-        return tag_ids
-    
-    def _update_acf_fields_separately(self, post_id, tool_data):
-        """单独更新ACF字段（备用方法）- MVP简化版本：6个JSON字段"""
-        try:
-            auth = HTTPBasicAuth(self.wp_username, self.wp_password)
-            
-            # 使用简化的6个JSON字段方法
-            acf_fields = self._prepare_acf_fields(tool_data)
-            
-            # 逐个更新6个JSON字段
-            success_count = 0
-            for field_name, field_value in acf_fields.items():
-                try:
-                    # 使用meta字段更新
-                    meta_url = f"{self.wp_api_url}/aihub/{post_id}"
-                    meta_data = {'meta': {field_name: field_value}}
-                    response = requests.post(meta_url, auth=auth, json=meta_data, timeout=30)
-                    
-                    if response.status_code in [200, 201]:
-                        success_count += 1
-                        logger.debug(f"✓ {field_name} 字段更新成功")
-                    else:
-                        logger.warning(f"✗ {field_name} 字段更新失败: {response.status_code}")
-                    
-                    time.sleep(0.2)  # 避免请求过快
-                    
-                except Exception as e:
-                    logger.debug(f"字段 {field_name} 更新异常: {e}")
-                        
-            logger.info(f"ACF字段单独更新完成: {success_count}/6 成功")
-            return success_count > 0
-                        
-        except Exception as e:
-            logger.debug(f"单独更新ACF字段失败: {e}")
-            return False
+        logger.info(f"字段单独补写完成: {success_count}/{len(fields)} 成功")
+        return success_count == len(fields)
 
     def _log_taxonomy_info(self, tool_data, tool_name):
         """记录分类和标签信息"""
@@ -712,35 +1037,365 @@ class WordPressImporter:
         # 统计分类和标签信息
         self._log_batch_taxonomy_summary(tools_data)
         
+        # 资源库生成的本地图片先上传到媒体库
+        self._upload_local_assets(tools_data)
+        
+        # 标准API模式下预先准备全部分类和标签，导入时只需查表
+        if not self.use_custom_api:
+            if self.use_batch_api and self.batch_limit is None:
+                self.batch_limit = self._discover_batch_limit()
+                self.use_batch_api = self.batch_limit is not None
+            self._prepare_batch_terms(tools_data)
+        
+        if self.use_custom_api:
+            # 自定义API模式按块批量导入
+            results = self._import_batch_via_custom_api(tools_data)
+        elif self.use_batch_api:
+            # 标准API的/batch/v1模式：分类法、文章、缺失字段分波次写入
+            results = self._import_batch_via_batch_api(tools_data)
+        elif config.WP_IMPORT_WORKERS > 1:
+            results = self._import_batch_concurrently(tools_data)
+        else:
+            for i, tool_data in enumerate(tools_data, 1):
+                tool_name = tool_data.get('product_name', 'Unknown')
+                logger.info(f"[{i}/{total}] 导入: {tool_name}")
+                
+                results.append(self.import_single_tool(tool_data))
+                
+                # 添加延迟
+                if i < total:
+                    time.sleep(self.delay)
+        
+        # 统计创建和更新数量
         created_count = 0
         updated_count = 0
-        
-        for i, tool_data in enumerate(tools_data, 1):
-            tool_name = tool_data.get('product_name', 'Unknown')
-            logger.info(f"[{i}/{total}] 导入: {tool_name}")
-            
-            result = self.import_single_tool(tool_data)
-            results.append(result)
-            
-            # 统计创建和更新数量
+        skipped_count = 0
+        for result in results:
             if result.get('success'):
-                if result.get('updated'):
+                if result.get('skipped'):
+                    skipped_count += 1
+                elif result.get('updated'):
                     updated_count += 1
                 else:
                     created_count += 1
-            
-            # 添加延迟
-            if i < total:
-                time.sleep(self.delay)
         
         success_count = sum(1 for r in results if r.get('success', False))
         logger.info(f"批量导入完成: {success_count}/{total} 成功")
         logger.info(f"  📝 新创建: {created_count} 个")
         logger.info(f"  🔄 更新: {updated_count} 个")
+        logger.info(f"  ⏭️ 未变化跳过: {skipped_count} 个")
         logger.info(f"  ❌ 失败: {total - success_count} 个")
         
         return results
     
+    def _import_batch_via_custom_api(self, tools_data):
+        """通过自定义API的/import-batch按块导入，每块一个请求，返回与输入顺序一致的结果"""
+        results = [None] * len(tools_data)
+        remaining = list(enumerate(tools_data))
+        
+        while remaining:
+            pending = []
+            wave, remaining = self._split_duplicate_products(remaining)
+            
+            for index, tool_data in wave:
+                existing_post = self._check_existing_product_or_fail(index, tool_data, results)
+                if existing_post is False:
+                    continue
+                if existing_post:
+                    skipped = self._skip_if_unchanged(existing_post, tool_data)
+                    if skipped:
+                        results[index] = skipped
+                        continue
+                    if existing_post.get('type') != 'aihub':
+                        # 自定义API只能更新aihub文章，其余类型走标准API
+                        results[index] = self._update_existing_product(existing_post, tool_data)
+                        continue
+                pending.append((index, tool_data, existing_post))
+            
+            chunk_size = max(1, config.WP_IMPORT_CHUNK_SIZE)
+            chunks = [pending[start:start + chunk_size] for start in range(0, len(pending), chunk_size)]
+            if chunks:
+                logger.info(f"批量导入 {len(pending)} 个工具，共 {len(chunks)} 块")
+            
+            # 各块并发发送，按块顺序写回结果
+            with ThreadPoolExecutor(max_workers=max(1, config.WP_IMPORT_WORKERS)) as executor:
+                for chunk, chunk_results in zip(chunks, executor.map(self._send_import_chunk, chunks)):
+                    for (index, _, _), result in zip(chunk, chunk_results):
+                        results[index] = result
+        
+        return results
+    
+    def _import_batch_concurrently(self, tools_data):
+        """多线程逐个导入，结果按输入顺序返回；同一产品的重复条目放到下一轮"""
+        results = [None] * len(tools_data)
+        remaining = list(enumerate(tools_data))
+        total = len(tools_data)
+        progress = {'done': 0, 'failed': 0}
+        
+        def import_one(item):
+            index, tool_data = item
+            result = self.import_single_tool(tool_data)
+            results[index] = result
+            
+            with self.progress_lock:
+                progress['done'] += 1
+                if not result.get('success'):
+                    progress['failed'] += 1
+                logger.info(f"[{progress['done']}/{total}] 已完成: {tool_data.get('product_name', 'Unknown')} (失败 {progress['failed']})")
+        
+        with ThreadPoolExecutor(max_workers=config.WP_IMPORT_WORKERS) as executor:
+            while remaining:
+                wave, remaining = self._split_duplicate_products(remaining)
+                list(executor.map(import_one, wave))
+        
+        return results
+    
+    def _rest_path(self, url):
+        """完整API地址 -> /batch/v1请求中使用的路由路径（如 /wp/v2/aihub）"""
+        return url[len(self.rest_root):]
+    
+    def _discover_batch_limit(self):
+        """查询/batch/v1单次允许的最大请求数，服务器不支持时返回None"""
+        try:
+            response = self._request('OPTIONS', self.batch_api_url)
+            if response.status_code == 200:
+                endpoints = response.json().get('endpoints') or [{}]
+                max_items = endpoints[0].get('args', {}).get('requests', {}).get('maxItems')
+                logger.info(f"批量API可用，单次最多 {max_items or 25} 个请求")
+                return int(max_items or 25)
+            logger.warning(f"服务器不支持/batch/v1 ({response.status_code})，改用逐个请求")
+        except Exception as e:
+            logger.warning(f"查询/batch/v1失败，改用逐个请求: {e}")
+        return None
+    
+    def _send_batch(self, requests_list):
+        """按服务器上限分组发送/batch/v1请求，返回与请求顺序一致的 (状态码, 响应体) 列表"""
+        def send_chunk(chunk):
+            try:
+                response = self._request('POST', self.batch_api_url, json={'requests': chunk}, timeout=max(60, 5 * len(chunk)))
+                if response.status_code not in [200, 207]:
+                    raise ValueError(f"HTTP {response.status_code}: {response.text[:200]}")
+                items = response.json().get('responses', [])
+                return [(item.get('status', 0), item.get('body') or {})
+                        for item in (items[position] if position < len(items) else {} for position in range(len(chunk)))]
+            except Exception as e:
+                logger.error(f"批量请求失败: {e}")
+                return [(0, {'message': str(e)})] * len(chunk)
+        
+        # 同一波次内各组互不依赖，并发发送后按顺序拼接
+        chunks = [requests_list[start:start + self.batch_limit] for start in range(0, len(requests_list), self.batch_limit)]
+        responses = []
+        with ThreadPoolExecutor(max_workers=max(1, config.WP_IMPORT_WORKERS)) as executor:
+            for chunk_responses in executor.map(send_chunk, chunks):
+                responses.extend(chunk_responses)
+        return responses
+    
+    def _import_batch_via_batch_api(self, tools_data):
+        """通过/batch/v1批量写入文章，返回与输入顺序一致的结果"""
+        results = [None] * len(tools_data)
+        remaining = list(enumerate(tools_data))
+        
+        while remaining:
+            writes = []
+            wave, remaining = self._split_duplicate_products(remaining)
+            
+            for index, tool_data in wave:
+                existing_post = self._check_existing_product_or_fail(index, tool_data, results)
+                if existing_post is False:
+                    continue
+                if existing_post:
+                    skipped = self._skip_if_unchanged(existing_post, tool_data)
+                    if skipped:
+                        results[index] = skipped
+                        continue
+                    collection = f"{self.wp_api_url}/{'aihub' if existing_post.get('type') == 'aihub' else 'posts'}"
+                    data, _ = self._build_update_data(existing_post, tool_data)
+                else:
+                    collection = f"{self.wp_api_url}/aihub"
+                    data = self._build_post_data(tool_data)
+                writes.append({'index': index, 'tool_data': tool_data, 'existing_post': existing_post,
+                               'collection': collection, 'data': data})
+            
+            if writes:
+                logger.info(f"批量写入 {len(writes)} 篇文章")
+                self._write_posts_via_batch(writes, results)
+        
+        return results
+    
+    def _write_posts_via_batch(self, writes, results):
+        """批量发送文章写入并逐条记录结果；aihub端点不存在时改用posts重试，响应中缺失的字段再批量补写"""
+        requests_list = []
+        for write in writes:
+            existing_post = write['existing_post']
+            url = f"{write['collection']}/{existing_post['id']}" if existing_post else write['collection']
+            requests_list.append({'method': 'POST', 'path': self._rest_path(url), 'body': write['data']})
+        
+        retries = []
+        field_requests = []
+        for write, (status, body) in zip(writes, self._send_batch(requests_list)):
+            tool_data = write['tool_data']
+            existing_post = write['existing_post']
+            tool_name = tool_data.get('product_name', 'Unknown')
+            
+            if status in [200, 201]:
+                post_id = body.get('id') or (existing_post or {}).get('id')
+                missing = self._find_missing_fields(body, write['data'].get('acf', {}))
+                field_requests.extend(
+                    {'method': 'POST', 'path': self._rest_path(f"{write['collection']}/{post_id}"),
+                     'body': {'acf': {name: value}, 'meta': {name: value}}}
+                    for name, value in missing.items()
+                )
+                
+                if existing_post:
+                    self._mark_synced(existing_post, tool_data)
+                    logger.success(f"🔄 更新成功: {tool_name} (ID: {post_id})")
+                    results[write['index']] = {
+                        'success': True,
+                        'post_id': post_id,
+                        'tool_name': tool_name,
+                        'message': '通过批量API更新成功',
+                        'updated': True
+                    }
+                else:
+                    post_type = body.get('type', 'aihub' if write['collection'].endswith('/aihub') else 'post')
+                    self._index_post({'id': post_id, 'type': post_type, 'title': tool_name, 'meta': write['data']['meta']})
+                    logger.success(f"导入成功: {tool_name} (ID: {post_id})")
+                    results[write['index']] = {
+                        'success': True,
+                        'post_id': post_id,
+                        'tool_name': tool_name,
+                        'message': f'通过批量API导入成功 (类型: {post_type})'
+                    }
+            elif status == 404 and write['collection'].endswith('/aihub'):
+                # aihub CPT不存在，使用标准post
+                retries.append(dict(write, collection=f"{self.wp_api_url}/posts", data=dict(write['data'], type='post')))
+            else:
+                message = body.get('message', '') if isinstance(body, dict) else str(body)
+                error_msg = f"HTTP {status}: {message[:200]}"
+                logger.error(f"导入失败: {tool_name} - {error_msg}")
+                results[write['index']] = {
+                    'success': False,
+                    'tool_name': tool_name,
+                    'error': error_msg,
+                    'updated': False
+                }
+        
+        if retries:
+            logger.warning(f"aihub端点不可用，{len(retries)} 篇文章改用posts端点")
+            self._write_posts_via_batch(retries, results)
+        
+        if field_requests:
+            logger.warning(f"响应中缺少 {len(field_requests)} 个字段，批量补写")
+            saved = sum(1 for status, _ in self._send_batch(field_requests) if status in [200, 201])
+            logger.info(f"字段补写完成: {saved}/{len(field_requests)} 成功")
+    
+    def _split_duplicate_products(self, items):
+        """把 (序号, 工具) 列表拆成本轮和推迟的条目：同一产品在本批中重复出现时推迟到下一轮，届时已能查到前一次创建的文章"""
+        wave = []
+        deferred = []
+        seen_keys = set()
+        
+        for index, tool_data in items:
+            keys = {self._normalize_title(tool_data.get('product_name', ''))}
+            if tool_data.get('product_url'):
+                keys.add(self._normalize_source_url(tool_data['product_url']))
+            if keys & seen_keys:
+                deferred.append((index, tool_data))
+            else:
+                seen_keys.update(keys)
+                wave.append((index, tool_data))
+        
+        return wave, deferred
+    
+    def _send_import_chunk(self, chunk):
+        """发送一块工具到/import-batch，按条目返回结果；服务器没有该路由时逐个导入"""
+        if not self.import_batch_supported:
+            return self._import_chunk_individually(chunk)
+        
+        headers = {}
+        if self.custom_api_key:
+            headers['X-API-Key'] = self.custom_api_key
+        
+        items = []
+        for _, tool_data, existing_post in chunk:
+            content_hash, group_hashes = self._compute_content_hashes(tool_data)
+            items.append({
+                'tool_data': tool_data,
+                'post_id': existing_post['id'] if existing_post else None,
+                'content_hash': content_hash,
+                'group_hashes': json.dumps(group_hashes, sort_keys=True)
+            })
+        
+        item_results = {}
+        error_msg = '响应中缺少该条目'
+        try:
+            response = self._request(
+                'POST',
+                f"{self.custom_api_url}/import-batch",
+                headers=headers,
+                json={'tools': items},
+                timeout=max(60, 10 * len(items))  # 整块导入需要更长时间
+            )
+            if self._is_missing_route(response):
+                if self.import_batch_supported:
+                    self.import_batch_supported = False
+                    logger.warning("自定义API不支持/import-batch（旧版插件），本次运行改为逐个导入")
+                return self._import_chunk_individually(chunk)
+            if response.status_code != 200:
+                raise ValueError(f"HTTP {response.status_code}: {response.text[:200]}")
+            item_results = {item.get('index'): item for item in response.json().get('results', [])}
+        except Exception as e:
+            logger.error(f"批量导入请求失败: {e}")
+            error_msg = str(e)
+        
+        results = []
+        for position, (_, tool_data, existing_post) in enumerate(chunk):
+            tool_name = tool_data.get('product_name', 'Unknown')
+            item = item_results.get(position)
+            
+            if not item or not item.get('success'):
+                error = item.get('message', 'Unknown error') if item else error_msg
+                logger.error(f"导入失败: {tool_name} - {error}")
+                results.append({'success': False, 'tool_name': tool_name, 'error': error})
+                continue
+            
+            post_id = item.get('post_id')
+            content_hash, group_hashes = self._compute_content_hashes(tool_data)
+            if existing_post:
+                self._mark_synced(existing_post, tool_data)
+            elif post_id:
+                self._index_post({'id': post_id, 'type': 'aihub', 'title': tool_name, 'meta': {
+                    'source_url': tool_data.get('product_url', ''),
+                    'content_hash': content_hash,
+                    'group_hashes': json.dumps(group_hashes, sort_keys=True)
+                }})
+            
+            logger.success(f"{'🔄 更新' if existing_post else '导入'}成功: {tool_name} (ID: {post_id})")
+            results.append({
+                'success': True,
+                'post_id': post_id,
+                'tool_name': tool_name,
+                'message': item.get('message', '导入成功'),
+                'updated': bool(existing_post)
+            })
+        
+        return results
+    
+    def _import_chunk_individually(self, chunk):
+        """逐个导入一块工具：新产品走自定义API的/import，已有文章走标准API更新"""
+        results = []
+        for _, tool_data, existing_post in chunk:
+            tool_name = tool_data.get('product_name', 'Unknown')
+            try:
+                if existing_post:
+                    results.append(self._update_existing_product(existing_post, tool_data))
+                else:
+                    results.append(self._import_via_custom_api(tool_data))
+            except Exception as e:
+                logger.error(f"导入异常: {tool_name} - {e}")
+                results.append({'success': False, 'tool_name': tool_name, 'error': str(e)})
+        return results
+    
     def _log_batch_taxonomy_summary(self, tools_data):
         """记录批量导入的分类法摘要"""
         try:
@@ -791,8 +1446,6 @@ class WordPressImporter:
     def diagnose_post_status(self, post_id):
         """诊断特定文章ID的状态"""
         try:
-            auth = HTTPBasicAuth(self.wp_username, self.wp_password)
-            
             logger.info(f"诊断文章ID: {post_id}")
             
             # 尝试不同的端点
@@ -806,7 +1459,7 @@ class WordPressImporter:
             for endpoint in endpoints:
                 try:
                     logger.debug(f"测试端点: {endpoint}")
-                    response = requests.get(endpoint, auth=auth, timeout=30)
+                    response = self._request('GET', endpoint, timeout=30)
                     logger.debug(f"响应状态: {response.status_code}")
                     
                     if response.status_code == 200:
@@ -833,53 +1486,3 @@ class WordPressImporter:
         except Exception as e:
             logger.error(f"诊断失败: {e}")
             return False
-
-    def _save_acf_fields_via_api(self, post_id, tool_data):
-        """通过WordPress REST API保存ACF字段 - MVP简化版本：6个JSON字段"""
-        try:
-            auth = HTTPBasicAuth(self.wp_username, self.wp_password)
-            
-            # 准备6个JSON字段数据
-            acf_fields = self._prepare_acf_fields(tool_data)
-            
-            logger.debug(f"准备保存6个JSON字段到文章 {post_id}")
-            
-            # 确定正确的端点
-            endpoint = f"{self.wp_api_url}/aihub/{post_id}"
-            
-            # 批量更新6个meta字段
-            update_data = {'meta': acf_fields}
-            
-            response = requests.post(endpoint, auth=auth, json=update_data, timeout=30)
-            
-            if response.status_code in [200, 201]:
-                logger.success(f"✓ 6个JSON字段保存成功")
-                return True
-            else:
-                logger.warning(f"JSON字段保存失败: {response.status_code}")
-                logger.debug(f"响应: {response.text[:200]}")
-                
-                # 尝试逐个保存6个字段
-                success_count = 0
-                for field_name, field_value in acf_fields.items():
-                    try:
-                        single_data = {'meta': {field_name: field_value}}
-                        single_response = requests.post(endpoint, auth=auth, json=single_data, timeout=15)
-                        
-                        if single_response.status_code in [200, 201]:
-                            success_count += 1
-                            logger.debug(f"✓ {field_name} 保存成功")
-                        else:
-                            logger.warning(f"✗ {field_name} 保存失败: {single_response.status_code}")
-                        
-                        time.sleep(0.2)  # 避免请求过快
-                        
-                    except Exception as e:
-                        logger.debug(f"字段 {field_name} 保存异常: {e}")
-                
-                logger.info(f"逐个字段保存完成: {success_count}/6 成功")
-                return success_count > 0
-            
-        except Exception as e:
-            logger.error(f"ACF字段保存失败: {e}")
-            return False 
\ No newline at end of file